@@ -1,36 +1,99 @@
+import time
+IMPORT_STARTED_AT = time.time()  # Reference point for the import -> first frame report
+
 from flask import Flask, jsonify, render_template, Response, request
 import numpy as np
 import cv2
 import mediapipe as mp
-import random
-import threading
-import time
 import atexit
 import math
+import os
+import threading
+
+from frame_hub import FrameHub
+from stream_broadcaster import MjpegBroadcaster
+from hand_tracker import HandTracker
+from game_session import GameSession, SessionRegistry, SessionScheduler
+from gesture_features import DIRECTION_NAMES, landmarks_to_array, classify_hand
+from gesture_smoother import GestureSmoother
+from recording import LandmarkRecorder, ReplayCapture, ReplayHands
+from hands_manager import HandsManager
+from roi_inference import RoiInference
+from latency_metrics import LatencyMetrics
+from overlay import OverlayRenderer
+from camera_discovery import CameraDiscovery, LazyCamera, default_cache_path
+from frame_buffers import BufferPool, FramePreparer
+from state_codec import CONTENT_TYPE as BINARY_STATE_TYPE
+from player_input import MultiPlayerInput
+from game_log import GameLogReader, GameLogWriter
 
 app = Flask(__name__)
 
-# Game state
-snake_position = [[250, 250], [240, 250], [230, 250]]
-apple_position = [random.randrange(1, 50) * 10, random.randrange(1, 50) * 10]
-score = 0
-button_direction = 1  # 0: Left, 1: Right, 2: Up, 3: Down
-snake_head = [250, 250]
-game_over = False
+# Board geometry (pixels); the snake moves one cell per tick
+CELL_SIZE = int(os.environ.get('CELL_SIZE', 10))
+BOARD_WIDTH = int(os.environ.get('BOARD_WIDTH', 500)) // CELL_SIZE * CELL_SIZE
+BOARD_HEIGHT = int(os.environ.get('BOARD_HEIGHT', 500)) // CELL_SIZE * CELL_SIZE
+GRID_COLS = BOARD_WIDTH // CELL_SIZE
+GRID_ROWS = BOARD_HEIGHT // CELL_SIZE
+# Optional apple placement seed for reproducible runs (also accepted by /reset)
+GAME_SEED = int(os.environ['GAME_SEED']) if os.environ.get('GAME_SEED') else None
+# Upper bound on concurrent game sessions hosted by this process
+MAX_SESSIONS = int(os.environ.get('MAX_SESSIONS', 1000))
+# The session steered by the camera (gestures); others take /direction input
+CAMERA_SESSION_ID = 'default'
+# Upper bound for /players: snakes on the camera board, one tracked hand each
+MAX_PLAYERS = int(os.environ.get('MAX_PLAYERS', 4))
+
+# Gesture classifier state (camera-bound, shared by the tracker thread)
 current_direction = "None"
 prev_index_pos = None  # Track previous index finger position
-reset_flag = False  # Flag to signal game loop restart
-game_active = False  # Flag to control whether the game loop updates state
-game_thread = None  # Reference to the background game loop thread
+landmark_buffer = np.empty((21, 3), dtype=np.float64)  # Reused per processed hand
+# Multi-player mode (set by /players): per-player hand assignment and gesture state;
+# None = the single-player path above
+player_input = None
+
+# Gesture-to-move latency per pipeline stage, exported on /metrics:
+# capture = frame age when inference starts, gating = result age when the
+# scheduler picks it up, tick = direction applied -> step done, push = state
+# published -> written to an SSE client, end_to_end = capture -> turn pushed
+LATENCY_STAGES = ('capture', 'preprocess', 'inference', 'classification', 'gating', 'tick', 'push', 'end_to_end')
+latency = LatencyMetrics('snake_stage_latency_seconds', LATENCY_STAGES,
+                         "Gesture-to-move latency per pipeline stage")
+# Per-frame cost of the video stream's HUD overlay, also on /metrics
+video_latency = LatencyMetrics('snake_video_stage_seconds', ('overlay',), "Video stream per-frame stage cost")
+pending_turn = None  # (captured_at, applied_at) of an applied gesture until its tick has run
+turn_marker = None   # (stream seq, captured_at) of the delta that carries the last turn
+
+# Recorded landmark stream to replay instead of a live camera (headless/CI runs)
+REPLAY_PATH = os.environ.get('REPLAY_PATH')
+# Directory that /recording writes landmark recordings into
+RECORDINGS_DIR = os.environ.get('RECORDINGS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings'))
+landmark_recorder = None  # Active LandmarkRecorder, fed by the tracker thread
+# Directory of per-game tick logs (see game_log.py); logging is off unless it is set.
+# GAME_LOG_KEEP caps how many logs are kept there (oldest deleted first, 0 = keep all)
+GAME_LOG_DIR = os.environ.get('GAME_LOG_DIR')
+game_logs = GameLogWriter(GAME_LOG_DIR, keyframe_interval=int(os.environ.get('GAME_LOG_KEYFRAMES', 256)),
+                          max_logs=int(os.environ.get('GAME_LOG_KEEP', 500))) if GAME_LOG_DIR else None
 
 # Enhanced MediaPipe setup
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=1,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.5
-)
+replay_hands = ReplayHands(REPLAY_PATH, loop=True) if REPLAY_PATH else None
+
+def build_hands(detection_confidence, tracking_confidence, max_hands=1):
+    """MediaPipe Hands factory used by the HandsManager (replays keep one reader)"""
+    if replay_hands is not None:
+        return replay_hands
+    return mp_hands.Hands(
+        static_image_mode=False,
+        max_num_hands=max_hands,
+        min_detection_confidence=detection_confidence,
+        min_tracking_confidence=tracking_confidence
+    )
+
+# Rebuilt in the background when confidences change, swapped between frames
+hands = HandsManager(build_hands, detection_confidence=0.7, tracking_confidence=0.5)
+# Optional downscaled detection / cropped tracking in front of MediaPipe
+roi_inference = RoiInference(hands)
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
@@ -38,7 +101,6 @@ mp_drawing_styles = mp.solutions.drawing_styles
 GESTURE_THRESHOLD = 0.1  # Minimum movement threshold
 GESTURE_COOLDOWN = 0.3   # Cooldown between gesture detections
 FINGER_THRESHOLD = 0.08  # Finger extension threshold
-last_gesture_time = 0
 
 # Calibration settings
 calibration_settings = {
@@ -47,96 +109,105 @@ calibration_settings = {
     'finger_threshold': FINGER_THRESHOLD,
     'detection_confidence': 0.7,
     'tracking_confidence': 0.5,
-    'tick_interval': 0.03
+    'tick_interval': 0.03,
+    'inference_scale': 1.0,  # Detection input scale (e.g. 0.5); 1.0 = full resolution
+    'roi_padding': 0.0,      # Crop padding around the tracked hand (e.g. 0.25); 0 = no cropping
+    'smoothing_tau': 0.0,    # EMA time constant of the gesture smoother (s, e.g. 0.08); 0 = per-frame + cooldown
+    'smoothing_confidence': 0.6,  # EMA share a direction needs before it is applied
+    'index_window': 0.15     # Time span over which index-finger pointing movement is measured (s)
+}
+# (min, max) each numeric setting accepted by POST /calibration is clamped to; None = unbounded
+CALIBRATION_RANGES = {
+    'gesture_threshold': (None, None),
+    'gesture_cooldown': (None, None),
+    'finger_threshold': (None, None),
+    'detection_confidence': (None, None),
+    'tracking_confidence': (None, None),
+    'tick_interval': (0.005, None),
+    'inference_scale': (0.1, 1.0),
+    'roi_padding': (0.0, None),
+    'smoothing_tau': (0.0, None),
+    'smoothing_confidence': (0.05, 1.0),
+    'index_window': (0.01, None),
 }
 
-# Initialize webcam with enhanced retry and release
+def parse_calibration(data):
+    """Validated, clamped calibration values from a JSON body; raises ValueError on bad input"""
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    values = {}
+    for key, (low, high) in CALIBRATION_RANGES.items():
+        if key not in data:
+            continue
+        try:
+            value = float(data[key])
+        except (TypeError, ValueError):
+            value = math.nan
+        if not math.isfinite(value):
+            raise ValueError(f"{key} must be a number")
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(high, value)
+        values[key] = value
+    return values
+
+# Streaming gesture filter (replaces the fixed cooldown while smoothing_tau > 0)
+gesture_smoother = GestureSmoother(
+    calibration_settings['finger_threshold'],
+    calibration_settings['gesture_threshold'],
+    tau=calibration_settings['smoothing_tau'],
+    confidence=calibration_settings['smoothing_confidence'],
+    index_window=calibration_settings['index_window']
+)
+
+# Camera discovery: cached device first, then all candidates in parallel with
+# the platform's capture backend. Nothing is opened at import time.
+CAMERA_PROBE_TIMEOUT = float(os.environ.get('CAMERA_PROBE_TIMEOUT', 3.0))
+camera_discovery = CameraDiscovery(default_cache_path(), timeout=CAMERA_PROBE_TIMEOUT)
 cap = None
 def initialize_camera():
     global cap
-    print("=== Enhanced Camera Initialization ===")
-    
-    # Try different camera indices with better error handling
-    for i in range(10):  # Try indices 0-9
-        print(f"Attempting to open camera index {i}...")
-        cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)  # Use DirectShow backend on Windows
-        
-        if cap.isOpened():
-            print(f"✓ Successfully opened camera index {i}")
-            
-            # Set camera properties for better performance/latency
-            # Start with 640x480 for higher FPS; we'll try 1280x720 if stable
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            cap.set(cv2.CAP_PROP_FPS, 30)
-            cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
-            cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)  # 0.75 -> auto exposure on many Windows drivers
-            cap.set(cv2.CAP_PROP_AUTO_WB, 1)
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            
-            # Get and display camera properties
-            width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-            height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            print(f"Camera properties: {width}x{height} @ {fps} FPS")
-            
-            # Test if we can actually read multiple frames
-            frame_count = 0
-            test_frame = None
-            for _ in range(10):  # Test 10 frames
-                ret, frm = cap.read()
-                if ret:
-                    test_frame = frm
-                    frame_count += 1
-                else:
-                    break
-
-            # If low FPS or unstable at 640x480, try 1280x720 once more
-            if frame_count >= 6:
-                print(f"✓ Camera is working! Successfully read {frame_count}/10 test frames")
-                if test_frame is not None:
-                    print(f"Frame shape: {test_frame.shape}")
-                return True
-            else:
-                print("⚠ Low stability/FPS at 640x480, trying 1280x720...")
-                cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-                frame_count = 0
-                for _ in range(10):
-                    ret, frm = cap.read()
-                    if ret:
-                        test_frame = frm
-                        frame_count += 1
-                    else:
-                        break
-                if frame_count >= 6:
-                    print(f"✓ Camera is stable at 1280x720 with {frame_count}/10 frames")
-                    if test_frame is not None:
-                        print(f"Frame shape: {test_frame.shape}")
-                    return True
-                else:
-                    print(f"✗ Camera opened but cannot read frames consistently from index {i}")
-                    cap.release()
-        else:
-            print(f"✗ Failed to open camera index {i}")
-            if cap:
-                cap.release()
-    
-    print("✗ No working camera found after trying all indices")
+    print("=== Camera Discovery ===")
+
+    if REPLAY_PATH:
+        cap = ReplayCapture(REPLAY_PATH, realtime=True, loop=True)
+        print(f"✓ Replaying recorded input from {REPLAY_PATH}")
+        return True
+
+    cap = camera_discovery.discover()
+    info = camera_discovery.info
+    if cap is not None:
+        print(f"✓ Camera index {info['index']} ({info['backend']}) at {info['frame_size']} "
+              f"in {info['probe_time']}s{' (cached)' if info['cache_hit'] else ''}")
+        return True
+
+    print(f"✗ No working camera found ({info['probed']} devices probed in {info['probe_time']}s)")
     print("Possible issues:")
     print("- Camera not connected")
     print("- Camera in use by another application")
     print("- Missing camera drivers")
     print("- Permission issues")
     print("- Try running as administrator")
-    cap = None
     return False
 
-# Initialize camera
-camera_initialized = initialize_camera()
+# Single capture thread; the game loop and every video stream read from it.
+# Each frame is mirrored/converted at most once into pooled buffers and the
+# result is shared by the tracker and the video encoder.
+frame_preparer = FramePreparer()
+frame_hub = FrameHub(preparer=frame_preparer)
+
+# Probed lazily on the first /start or /video_feed
+camera_initialized = False
 
 def create_placeholder_frame():
     frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    if lazy_camera.probing:
+        cv2.putText(frame, "Searching for camera...", (50, 200),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+        cv2.putText(frame, "Camera Status: Searching", (50, 250),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2, cv2.LINE_AA)
+        return frame
     cv2.putText(frame, "Webcam Failed - Check Connection", (50, 200), 
                 cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
     cv2.putText(frame, "Camera Status: " + ("Connected" if camera_initialized else "Not Found"), (50, 250), 
@@ -187,272 +258,440 @@ def test_camera_feed():
     print(f"Camera test completed. Processed {frame_count} frames in {elapsed_time:.2f} seconds")
     print(f"Average FPS: {frame_count/elapsed_time:.1f}")
 
-def collision_with_apple(apple_position, score):
-    apple_position = [random.randrange(1, 50) * 10, random.randrange(1, 50) * 10]
-    score += 1
-    return apple_position, score
-
-def collision_with_boundaries(snake_head):
-    # No longer used for game over; kept for compatibility
-    return False
-
-def collision_with_self(snake_position):
-    return snake_head in snake_position[1:]
-
 def get_hand_direction(landmarks, frame_shape):
     """Enhanced gesture detection using finger positions and movement analysis"""
-    global last_gesture_time, prev_index_pos, current_direction
+    global prev_index_pos, current_direction
     
+    # Vectorized features on a (21, 3) landmark array; see gesture_features.py
+    # for the rules (multi-finger centroid vector / index-finger movement)
+    points = landmarks_to_array(landmarks, out=landmark_buffer)
+    direction, prev_index_pos = classify_hand(
+        points,
+        prev_index_pos,
+        calibration_settings['finger_threshold'],
+        calibration_settings['gesture_threshold']
+    )
+    current_direction = DIRECTION_NAMES[direction]
+    return direction
+
+def smooth_direction(result, captured_at):
+    """Feed the first hand to the streaming smoother; returns its stable direction (-1 while none is)
+
+    The stable direction is returned on every frame, not just the one where it
+    became stable: the scheduler only sees the newest tracker result, so a
+    one-frame event could be overwritten before the next tick and lost.
+    """
+    global current_direction
+    points = None
+    if result.multi_hand_landmarks:
+        points = landmarks_to_array(result.multi_hand_landmarks[0].landmark, out=landmark_buffer)
+    gesture_smoother.update(captured_at, points)
+    current_direction = DIRECTION_NAMES[gesture_smoother.stable]
+    return gesture_smoother.stable
+
+def apply_player_gestures(session, players, gesture, current_time):
+    """Multi-player: steer each snake from its own hand, with a per-player cooldown"""
+    global pending_turn
+    cooldown = 0 if calibration_settings['smoothing_tau'] > 0 else calibration_settings['gesture_cooldown']
+    for player, (direction, state) in enumerate(zip(gesture.direction, players.inputs)):
+        if direction == -1 or direction == session.engine.snakes[player].direction:
+            continue
+        if state.accept(current_time, cooldown):
+            session.set_direction(direction, player)
+            pending_turn = pending_turn or (gesture.captured_at, current_time)
+
+def apply_camera_gesture(session):
+    """Apply the newest tracker result to the camera session (scheduler thread, before each step)"""
+    global last_result_seq, pending_turn
+    if session.id != CAMERA_SESSION_ID:
+        return
+    players = player_input
+    multi = players is not None and players.players == session.players
+    if multi:
+        for player, label in enumerate(players.labels()):
+            session.set_gesture(player, label)
+    else:
+        session.current_direction = current_direction
+    # Never wait for vision here; just take the latest published result
+    gesture = hand_tracker.poll(last_result_seq)
+    if gesture is None:
+        return
+    last_result_seq = gesture.seq
     current_time = time.time()
+    latency.observe('gating', current_time - gesture.processed_at)
+    if isinstance(gesture.direction, tuple):
+        # Results from before a /players change don't match the board; drop them
+        if multi and len(gesture.direction) == session.players:
+            apply_player_gestures(session, players, gesture, current_time)
+        return
+    if session.players > 1:
+        return
+    # Add cooldown to prevent rapid direction changes (the smoother's hysteresis does that job when enabled)
+    cooldown = 0 if calibration_settings['smoothing_tau'] > 0 else calibration_settings['gesture_cooldown']
+    if current_time - session.last_gesture_time > cooldown:
+        if gesture.direction != -1 and gesture.direction != session.button_direction:
+            session.set_direction(gesture.direction)
+            session.last_gesture_time = current_time
+            pending_turn = (gesture.captured_at, current_time)
+            print(f"Direction changed to: {current_direction}")
+
+def record_camera_tick(session):
+    """Time the step that applied a gesture and mark its delta (scheduler thread, after each step)"""
+    global pending_turn, turn_marker
+    if session.id != CAMERA_SESSION_ID or pending_turn is None:
+        return
+    captured_at, applied_at = pending_turn
+    pending_turn = None
+    latency.observe('tick', time.time() - applied_at)
+    turn_marker = (session.broadcaster.seq, captured_at)
+
+def record_push(seq, published_at):
+    latency.observe('push', time.time() - published_at)
+
+def record_camera_push(seq, published_at):
+    """Push latency, plus end-to-end latency when the first client receives a turn"""
+    global turn_marker
+    now = time.time()
+    latency.observe('push', now - published_at)
+    marker = turn_marker
+    if marker is not None and seq >= marker[0]:
+        turn_marker = None
+        latency.observe('end_to_end', now - marker[1])
+
+def infer_direction(packet):
+    """Run hand inference on one hub frame and classify it (runs on the tracker thread)"""
+    global current_direction
+    raw_frame, captured_at = packet.frame, packet.timestamp
+    latency.observe('capture', time.time() - captured_at)
+    players = player_input
+    # Landmarks come back normalized to the full mirrored frame whatever the input size.
+    # Cropping follows one hand, so with several players every frame is searched whole.
+    result = roi_inference.process(
+        packet.prepared,
+        calibration_settings['inference_scale'],
+        calibration_settings['roi_padding'] if players is None else 0.0
+    )
+    latency.observe('preprocess', roi_inference.last_prepare_time)
+    latency.observe('inference', roi_inference.last_process_time)
+
+    recorder = landmark_recorder
+    if recorder is not None:
+        recorder.write(captured_at, result, frame=raw_frame)
+
+    classify_started = time.perf_counter()
+    if players is not None:
+        # One MediaPipe pass above covered every hand; classify each player's own
+        directions = players.update(captured_at, result)
+        current_direction = players.summary()
+        latency.observe('classification', time.perf_counter() - classify_started)
+        return directions
+    direction = -1
+    if calibration_settings['smoothing_tau'] > 0:
+        direction = smooth_direction(result, captured_at)
+    elif result.multi_hand_landmarks:
+        for hand_landmarks in result.multi_hand_landmarks:
+            direction = get_hand_direction(hand_landmarks.landmark, raw_frame.shape)
+            if direction != -1:
+                break
+    latency.observe('classification', time.perf_counter() - classify_started)
+    return direction
+
+# Hand inference runs on its own thread over the newest frame; the scheduler
+# steps sessions on fixed-rate clocks and only polls the latest result
+hand_tracker = HandTracker(frame_hub, infer_direction)
+last_result_seq = 0
+
+def session_tick_interval(session):
+    return session.tick_interval or float(calibration_settings.get('tick_interval', 0.03))
+
+# Every game lives in a GameSession; one scheduler thread advances all of them
+sessions = SessionRegistry(
+    lambda session_id, seed=GAME_SEED: GameSession(session_id, GRID_COLS, GRID_ROWS, CELL_SIZE, seed=seed,
+                                                   on_deliver=record_push, logs=game_logs),
+    max_sessions=MAX_SESSIONS
+)
+camera_session = sessions.create(CAMERA_SESSION_ID)
+camera_session.broadcaster.on_deliver = record_camera_push
+scheduler = SessionScheduler(sessions, session_tick_interval, before_step=apply_camera_gesture,
+                             after_step=record_camera_tick)
+
+def get_session():
+    """Session named by the `session` query parameter (defaults to the camera session)"""
+    return sessions.get(request.args.get('session', CAMERA_SESSION_ID))
+
+def unknown_session():
+    return jsonify({"status": "error", "message": "Unknown session"}), 404
+
+def request_seed():
+    """`?seed=` as an int (GAME_SEED when absent); raises ValueError for anything else"""
+    if 'seed' not in request.args:
+        return GAME_SEED
+    seed = request.args.get('seed', type=int)
+    if seed is None:
+        raise ValueError("seed must be an integer")
+    return seed
+
+def reopen_camera():
+    """Capture thread lost the camera: release it and open it again (cached device first)"""
+    global camera_initialized
+    if cap is not None:
+        cap.release()
+    camera_initialized = initialize_camera()
+    return cap if camera_initialized else None
+
+def start_capture_pipeline():
+    """Start the capture thread and the tracker that consumes it"""
+    if not frame_hub.running:
+        frame_hub.start(cap, reopen=reopen_camera)
+    hand_tracker.start()
+
+def open_camera_pipeline():
+    """Discover/open the camera if needed and start capturing (run via lazy_camera)"""
+    global camera_initialized
+    if cap is None or not cap.isOpened():
+        camera_initialized = initialize_camera()
+    if not camera_initialized:
+        return
+    first_frame = frame_hub.first_frame_at is None
+    start_capture_pipeline()
+    if first_frame and frame_hub.wait_next(0, timeout=2.0) is not None:
+        print(f"First camera frame {frame_hub.first_frame_at - IMPORT_STARTED_AT:.2f}s after import")
+
+# Runs open_camera_pipeline once per request burst, blocking (/start) or in the background (/video_feed)
+# A blocking wait covers the cached device, the full probe and the first frame
+lazy_camera = LazyCamera(open_camera_pipeline, timeout=2 * CAMERA_PROBE_TIMEOUT + 2.0)
+
+def stop_capture_pipeline():
+    """Stop the tracker and capture thread before the camera is released"""
+    hand_tracker.stop()
+    frame_hub.stop()
+
+# HUD text is pre-rendered and only redrawn when direction/score/status change
+overlay_renderer = OverlayRenderer()
+# Annotated frames: reused once the encoders are done with them
+annotate_buffers = BufferPool()
+
+def annotate_frame(packet):
+    """Draw the gesture/score overlay onto a copy of the shared mirrored frame"""
+    # The mirrored frame is shared with the tracker, so draw on a pooled copy
+    mirrored = packet.prepared.mirrored
+    frame = annotate_buffers.take(mirrored.shape)
+    np.copyto(frame, mirrored)
     
-    # Get key landmarks
-    wrist = landmarks[0]
-    thumb_tip = landmarks[4]
-    index_tip = landmarks[8]
-    middle_tip = landmarks[12]
-    ring_tip = landmarks[16]
-    pinky_tip = landmarks[20]
-    
-    # Calculate finger distances from wrist
-    thumb_dist = math.sqrt((thumb_tip.x - wrist.x)**2 + (thumb_tip.y - wrist.y)**2)
-    index_dist = math.sqrt((index_tip.x - wrist.x)**2 + (index_tip.y - wrist.y)**2)
-    middle_dist = math.sqrt((middle_tip.x - wrist.x)**2 + (middle_tip.y - wrist.y)**2)
-    ring_dist = math.sqrt((ring_tip.x - wrist.x)**2 + (ring_tip.y - wrist.y)**2)
-    pinky_dist = math.sqrt((pinky_tip.x - wrist.x)**2 + (pinky_tip.y - wrist.y)**2)
-    
-    # Check if fingers are extended (distance > threshold)
-    finger_threshold = calibration_settings['finger_threshold']
-    fingers_extended = [
-        thumb_dist > finger_threshold,
-        index_dist > finger_threshold,
-        middle_dist > finger_threshold,
-        ring_dist > finger_threshold,
-        pinky_dist > finger_threshold
-    ]
-    
-    # Count extended fingers
-    extended_count = sum(fingers_extended)
-    
-    # Gesture detection based on finger positions and movement
-    if extended_count >= 3:  # Multiple fingers extended - check direction
-        # Calculate center of extended fingers
-        extended_fingers = []
-        if fingers_extended[0]: extended_fingers.append(thumb_tip)
-        if fingers_extended[1]: extended_fingers.append(index_tip)
-        if fingers_extended[2]: extended_fingers.append(middle_tip)
-        if fingers_extended[3]: extended_fingers.append(ring_tip)
-        if fingers_extended[4]: extended_fingers.append(pinky_tip)
-        
-        if extended_fingers:
-            # Calculate average position of extended fingers
-            avg_x = sum(f.x for f in extended_fingers) / len(extended_fingers)
-            avg_y = sum(f.y for f in extended_fingers) / len(extended_fingers)
-            
-            # Calculate movement from wrist to finger center
-            dx = avg_x - wrist.x
-            dy = avg_y - wrist.y
-            
-            # Determine direction based on movement vector
-            threshold = calibration_settings['gesture_threshold']
-            if abs(dx) > abs(dy):  # Horizontal movement
-                if dx > threshold:
-                    current_direction = "Right"
-                    return 1
-                elif dx < -threshold:
-                    current_direction = "Left"
-                    return 0
-            else:  # Vertical movement
-                if dy > threshold:
-                    current_direction = "Down"
-                    return 3
-                elif dy < -threshold:
-                    current_direction = "Up"
-                    return 2
-    
-    # Single finger gesture (index finger pointing)
-    elif fingers_extended[1] and not any(fingers_extended[i] for i in [0, 2, 3, 4]):
-        # Use index finger movement for direction
-        if prev_index_pos is not None:
-            dx = index_tip.x - prev_index_pos[0]
-            dy = index_tip.y - prev_index_pos[1]
-            
-            # Check for significant movement
-            threshold = calibration_settings['gesture_threshold']
-            if abs(dx) > threshold or abs(dy) > threshold:
-                if abs(dx) > abs(dy):  # Horizontal movement
-                    if dx > threshold:
-                        current_direction = "Right"
-                        return 1
-                    elif dx < -threshold:
-                        current_direction = "Left"
-                        return 0
-                else:  # Vertical movement
-                    if dy > threshold:
-                        current_direction = "Down"
-                        return 3
-                    elif dy < -threshold:
-                        current_direction = "Up"
-                        return 2
-        
-        # Update previous position
-        prev_index_pos = (index_tip.x, index_tip.y)
+    # Important: do NOT call hands.process() here.
+    # Hand detection runs in the game loop; duplicating it from another
+    # thread causes MediaPipe timestamp mismatches and freezes.
     
-    # No clear gesture detected
-    current_direction = "None"
-    return -1
-
-def update_game():
-    global snake_position, apple_position, score, snake_head, button_direction, game_over, reset_flag, last_gesture_time, game_active, cap
-    while cap is None or cap.isOpened():
-        # If game is not active, idle briefly and continue
-        if not game_active:
-            time.sleep(0.05)
-            continue
-        if reset_flag:  # Check if reset was triggered
-            reset_flag = False
-            print("Game loop restarted after reset")
-            continue
-
-        if game_over:
-            time.sleep(0.1)
-            continue
+    # Darken the status box and copy in the cached text layers (in place)
+    overlay_renderer.draw(frame, current_direction, camera_session.score, camera_session.game_over)
+    video_latency.observe('overlay', overlay_renderer.last_time)
+    return frame
 
-        success, frame = cap.read() if cap else (False, None)
-        if not success and cap:
-            print("Failed to grab frame. Retrying...")
-            time.sleep(0.2)
-            continue
-        elif cap:
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            result = hands.process(rgb_frame)
-
-            if result.multi_hand_landmarks:
-                for hand_landmarks in result.multi_hand_landmarks:
-                    current_time = time.time()
-                    # Add cooldown to prevent rapid direction changes
-                    if current_time - last_gesture_time > calibration_settings['gesture_cooldown']:
-                        direction = get_hand_direction(hand_landmarks.landmark, frame.shape)
-                        if direction != -1 and direction != button_direction:
-                            button_direction = direction
-                            last_gesture_time = current_time
-                            print(f"Direction changed to: {current_direction}")
-
-        # Update snake position based on current direction
-        if button_direction == 1: snake_head[0] += 10  # Right
-        elif button_direction == 0: snake_head[0] -= 10  # Left
-        elif button_direction == 2: snake_head[1] -= 10  # Up (fixed coordinate system)
-        elif button_direction == 3: snake_head[1] += 10  # Down (fixed coordinate system)
-
-        # Wrap around edges so opposite edges are connected (toroidal board)
-        if snake_head[0] >= 500: snake_head[0] = 0
-        elif snake_head[0] < 0: snake_head[0] = 500 - 10
-        if snake_head[1] >= 500: snake_head[1] = 0
-        elif snake_head[1] < 0: snake_head[1] = 500 - 10
-
-        if snake_head == apple_position:
-            apple_position, score = collision_with_apple(apple_position, score)
-            snake_position.insert(0, list(snake_head))
-        else:
-            snake_position.insert(0, list(snake_head))
-            snake_position.pop()
-
-        # Only self-collision ends the game; boundaries wrap
-        if collision_with_self(snake_position):
-            game_over = True
-        # Use configurable tick interval for game speed
-        time.sleep(float(calibration_settings.get('tick_interval', 0.03)))
-
-def gen_frames():
-    """Generate camera frames (no hand processing here to avoid conflicts)"""
-    placeholder = create_placeholder_frame()
-    frame_count = 0
-    
-    while True:
-        if cap and cap.isOpened():
-            success, frame = cap.read()
-            if not success:
-                print("Failed to grab frame. Retrying...")
-                time.sleep(0.2)
-                frame = placeholder
-            else:
-                # Flip the frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
-                
-                # Important: do NOT call hands.process() here.
-                # Hand detection runs in the game loop; duplicating it from another
-                # thread causes MediaPipe timestamp mismatches and freezes.
-                
-                # Add UI overlay with gesture information
-                frame_height, frame_width = frame.shape[:2]
-                
-                # Draw semi-transparent overlay
-                overlay = frame.copy()
-                cv2.rectangle(overlay, (10, 10), (300, 120), (0, 0, 0), -1)
-                cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
-                
-                # Add text information
-                cv2.putText(frame, f"Direction: {current_direction}", (20, 35), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                cv2.putText(frame, f"Score: {score}", (20, 60), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-                cv2.putText(frame, f"Game Status: {'OVER' if game_over else 'PLAYING'}", (20, 85), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255) if game_over else (0, 255, 0), 2)
-                
-                # Add gesture instructions
-                cv2.putText(frame, "Gestures:", (20, frame_height - 80), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                cv2.putText(frame, "Multiple fingers = Direction", (20, frame_height - 60), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                cv2.putText(frame, "Index finger = Point direction", (20, frame_height - 40), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                cv2.putText(frame, "Make clear gestures!", (20, frame_height - 20), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-                
-                frame_count += 1
-        else:
-            frame = placeholder
-            print("Webcam unavailable. Using placeholder.")
+# Annotates each frame once; JPEGs are encoded once per (width, quality) and shared
+video_broadcaster = MjpegBroadcaster(frame_hub, annotate_frame, create_placeholder_frame, quality=85)
 
-        try:
-            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])  # Optimized JPEG quality
-            if not ret:
+def gen_frames(width=None, quality=None, max_fps=None):
+    """Yield the MJPEG stream for one client, adapting quality/pacing to how fast it drains"""
+    subscriber = video_broadcaster.subscribe(width, quality, max_fps)
+    try:
+        while True:
+            frame_bytes = video_broadcaster.next_frame(subscriber, timeout=1.0)
+            if frame_bytes is None:
                 continue
-            frame_bytes = buffer.tobytes()
+            started = time.perf_counter()
             yield (b'--frame\r\n'
                    b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        except Exception as encode_err:
-            print(f"Video stream encode error: {encode_err}")
-            time.sleep(0.01)
+            # Resumed once the server has written the chunk: that's the drain time
+            video_broadcaster.record_send(subscriber, time.perf_counter() - started)
+    finally:
+        video_broadcaster.unsubscribe(subscriber)
 
 def ensure_game_thread_running():
-    global game_thread
-    if game_thread is None or not game_thread.is_alive():
-        game_thread = threading.Thread(target=update_game, daemon=True)
-        game_thread.start()
+    scheduler.start()
 
-# Start background thread in idle state so it's ready when activated
-ensure_game_thread_running()
+def start_services():
+    """Start the game loop in idle state; the camera pipeline starts on first use.
 
-@atexit.register
-def cleanup():
+    Called by the entry point (`python app.py` or the ASGI lifespan in
+    asgi.py), never at import.
+    """
+    ensure_game_thread_running()
+
+def stop_services():
+    """Stop the game loop and camera pipeline and release the camera (safe to call twice)"""
+    global cap
+    scheduler.stop()
+    if game_logs is not None:
+        game_logs.stop()
+    stop_capture_pipeline()
     if cap:
         cap.release()
+        cap = None
         print("Camera released.")
 
+@atexit.register
+def cleanup():
+    stop_services()
+    hands.close()
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/game_state')
 def game_state():
+    """Full game state as JSON, or packed with ?format=binary (see state_codec.py).
+
+    Responses carry an ETag that only changes with the tick (or a reset or
+    turn), so polling a paused or finished game gets 304 without serializing.
+    """
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    binary = request.args.get('format') == 'binary'
+    # Taken before the snapshot: a tick in between only costs the client one extra refresh
+    etag = session.state_tag() + ('.bin' if binary else '')
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif binary:
+        try:
+            response = Response(session.packed(), mimetype=BINARY_STATE_TYPE)
+        except ValueError as codec_err:
+            return jsonify({"status": "error", "message": str(codec_err)}), 400
+    else:
+        response = jsonify(session.snapshot())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/game_stream')
+def game_stream():
+    """Server-Sent Events: a snapshot on connect, then one delta per game tick"""
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    return Response(session.broadcaster.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/sessions', methods=['GET', 'POST'])
+def list_or_create_sessions():
+    """List hosted sessions, or create a new one (optional JSON: id, seed, tick_interval)"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
+        # Validate everything before the session is registered
+        session_id = data.get('id')
+        if session_id is not None and not isinstance(session_id, str):
+            return jsonify({"status": "error", "message": "id must be a string"}), 400
+        seed = data.get('seed', GAME_SEED)
+        if seed is not None and type(seed) is not int:
+            return jsonify({"status": "error", "message": "seed must be an integer"}), 400
+        tick_interval = data.get('tick_interval')
+        if tick_interval is not None:
+            try:
+                tick_interval = float(tick_interval)
+            except (TypeError, ValueError):
+                tick_interval = math.nan
+            if not math.isfinite(tick_interval):
+                return jsonify({"status": "error", "message": "tick_interval must be a number"}), 400
+        try:
+            session = sessions.create(session_id, seed=seed)
+        except ValueError as create_err:
+            return jsonify({"status": "error", "message": str(create_err)}), 409
+        if tick_interval is not None:
+            session.tick_interval = max(0.005, tick_interval)
+        return jsonify({"status": "Session created", "session": session.info()}), 201
     return jsonify({
-        'snake': snake_position,
-        'apple': apple_position,
-        'score': score,
-        'game_over': game_over,
-        'current_direction': current_direction,
-        'button_direction': button_direction
+        'sessions': [s.info() for s in sessions.sessions()],
+        'scheduler': scheduler.stats()
+    })
+
+@app.route('/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    if session_id == CAMERA_SESSION_ID:
+        return jsonify({"status": "error", "message": "The camera session cannot be deleted"}), 400
+    session = sessions.remove(session_id)
+    if session is None:
+        return unknown_session()
+    session.close()
+    return jsonify({"status": "Session deleted"})
+
+@app.route('/game_log')
+def game_log():
+    """The current game's tick log: summary, the board after ?tick=N, or ?audit=1 to verify scores"""
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    log = session.log
+    if log is None:
+        return jsonify({"status": "error", "message": "Game logging is disabled"}), 404
+    game_logs.sync()
+    if not os.path.exists(log.path):
+        return jsonify({"status": "error", "message": "No ticks logged for this game yet"}), 404
+    try:
+        reader = GameLogReader(log.path)
+        info = reader.info()
+        if request.args.get('tick') is not None:
+            info['state'] = reader.snapshot_at(int(request.args['tick']))
+        if request.args.get('audit'):
+            info['audit'] = reader.audit()
+    except (OSError, ValueError) as log_err:
+        return jsonify({"status": "error", "message": str(log_err)}), 400
+    info['writer'] = game_logs.stats()
+    return jsonify(info)
+
+@app.route('/direction', methods=['POST'])
+def set_direction():
+    """Steer a session from the keyboard or a gesture replay (JSON: direction 0-3)"""
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    data = request.get_json(silent=True) or {}
+    try:
+        player = int(data.get('player', 0))
+    except (TypeError, ValueError):
+        player = -1
+    if not 0 <= player < session.players:
+        return jsonify({"status": "error", "message": f"player must be 0-{session.players - 1}"}), 400
+    try:
+        session.set_direction(int(data.get('direction')), player)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "direction must be 0 (Left), 1 (Right), 2 (Up) or 3 (Down)"}), 400
+    return jsonify({"status": "Direction set", "button_direction": session.button_direction})
+
+@app.route('/players', methods=['GET', 'POST'])
+def players():
+    """Read or set how many hands steer snakes on the camera board (JSON: players, assign)"""
+    global player_input, current_direction
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            count = int(data.get('players', camera_session.players))
+        except (TypeError, ValueError):
+            count = 0
+        if not 1 <= count <= MAX_PLAYERS:
+            return jsonify({"status": "error", "message": f"players must be 1-{MAX_PLAYERS}"}), 400
+        mode = data.get('assign', player_input.mode if player_input is not None else 'region')
+        try:
+            new_input = MultiPlayerInput(count, mode, calibration_settings) if count > 1 else None
+            camera_session.reset(request_seed(), players=count)
+        except ValueError as players_err:
+            return jsonify({"status": "error", "message": str(players_err)}), 400
+        player_input = new_input
+        current_direction = "None"
+        gesture_smoother.reset()
+        roi_inference.reset()
+        # One MediaPipe pass per frame returns up to `count` hands; rebuilt in the background
+        hands.configure(calibration_settings['detection_confidence'],
+                        calibration_settings['tracking_confidence'], max_hands=count)
+    current = player_input
+    return jsonify({
+        'players': camera_session.players,
+        'max_players': MAX_PLAYERS,
+        'assign': current.mode if current is not None else None,
+        'input': current.stats() if current is not None else None,
+        'hands': hands.stats()
     })
 
 @app.route('/gesture_info')
@@ -460,107 +699,136 @@ def gesture_info():
     """Endpoint to get current gesture detection information"""
     return jsonify({
         'current_direction': current_direction,
-        'button_direction': button_direction,
+        'button_direction': camera_session.button_direction,
         'gesture_threshold': calibration_settings['gesture_threshold'],
         'gesture_cooldown': calibration_settings['gesture_cooldown'],
         'finger_threshold': calibration_settings['finger_threshold'],
-        'last_gesture_time': last_gesture_time,
+        'last_gesture_time': camera_session.last_gesture_time,
+        'smoothing': calibration_settings['smoothing_tau'] > 0,
+        'gesture_confidence': round(gesture_smoother.score, 3),
+        'players': player_input.stats() if player_input is not None else None,
         'camera_initialized': camera_initialized
     })
 
 @app.route('/calibration', methods=['GET', 'POST'])
 def calibration():
     """Endpoint to get or update calibration settings"""
-    global calibration_settings, hands
-    
     if request.method == 'POST':
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
-        # Update calibration settings
-        if 'gesture_threshold' in data:
-            calibration_settings['gesture_threshold'] = float(data['gesture_threshold'])
-        if 'gesture_cooldown' in data:
-            calibration_settings['gesture_cooldown'] = float(data['gesture_cooldown'])
-        if 'finger_threshold' in data:
-            calibration_settings['finger_threshold'] = float(data['finger_threshold'])
-        if 'detection_confidence' in data:
-            calibration_settings['detection_confidence'] = float(data['detection_confidence'])
-        if 'tracking_confidence' in data:
-            calibration_settings['tracking_confidence'] = float(data['tracking_confidence'])
-        if 'tick_interval' in data:
-            calibration_settings['tick_interval'] = max(0.005, float(data['tick_interval']))
+        # Validate everything first so a bad value leaves the settings untouched
+        try:
+            values = parse_calibration(data)
+        except ValueError as settings_err:
+            return jsonify({"status": "error", "message": str(settings_err)}), 400
+        calibration_settings.update(values)
+        gesture_smoother.configure(
+            finger_threshold=calibration_settings['finger_threshold'],
+            gesture_threshold=calibration_settings['gesture_threshold'],
+            tau=calibration_settings['smoothing_tau'],
+            confidence=calibration_settings['smoothing_confidence'],
+            index_window=calibration_settings['index_window']
+        )
+        if player_input is not None:
+            player_input.configure()
         
-        # Reinitialize MediaPipe hands with new confidence settings
-        hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=calibration_settings['detection_confidence'],
-            min_tracking_confidence=calibration_settings['tracking_confidence']
+        # Rebuild MediaPipe hands only if a confidence changed; the new graph is
+        # built in the background and swapped in by the tracker between frames
+        rebuilding = hands.configure(
+            calibration_settings['detection_confidence'],
+            calibration_settings['tracking_confidence']
         )
         
         return jsonify({
             'status': 'success',
             'message': 'Calibration settings updated',
-            'settings': calibration_settings
+            'settings': calibration_settings,
+            'rebuilding': rebuilding,
+            'hands': hands.stats()
         })
     
     return jsonify({
         'settings': calibration_settings,
+        'hands': hands.stats(),
         'current_direction': current_direction,
         'camera_initialized': camera_initialized
     })
 
 @app.route('/camera_status')
 def camera_status():
-    """Simple endpoint to check camera status"""
+    """Camera status, discovery result, startup time and live capture health (fps, drops, frame age)"""
+    startup = {
+        "capture": frame_hub.stats(),
+        "probing": lazy_camera.probing,
+        "discovery": camera_discovery.info,
+        "import_to_first_frame": round(frame_hub.first_frame_at - IMPORT_STARTED_AT, 3)
+        if frame_hub.first_frame_at is not None else None
+    }
     if cap and cap.isOpened():
         return jsonify({
             "camera_available": True,
             "camera_initialized": camera_initialized,
             "frame_size": f"{cap.get(cv2.CAP_PROP_FRAME_WIDTH)}x{cap.get(cv2.CAP_PROP_FRAME_HEIGHT)}",
-            "fps": cap.get(cv2.CAP_PROP_FPS)
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            **startup
         })
     else:
         return jsonify({
             "camera_available": False,
             "camera_initialized": camera_initialized,
-            "error": "Camera not available"
+            "error": "Camera not available",
+            **startup
         })
 
 @app.route('/reset')
 def reset_game():
-    global snake_position, apple_position, score, button_direction, snake_head, game_over, prev_index_pos, current_direction, reset_flag, last_gesture_time
-    snake_position = [[250, 250], [240, 250], [230, 250]]
-    apple_position = [random.randrange(1, 50) * 10, random.randrange(1, 50) * 10]
-    score = 0
-    button_direction = 1
-    snake_head = [250, 250]
-    game_over = False
-    prev_index_pos = None
-    current_direction = "None"
-    last_gesture_time = 0
-    reset_flag = True
+    global prev_index_pos, current_direction
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    try:
+        seed = request_seed()
+    except ValueError as seed_err:
+        return jsonify({"status": "error", "message": str(seed_err)}), 400
+    session.reset(seed)
+    if session is camera_session:
+        prev_index_pos = None
+        current_direction = "None"
+        gesture_smoother.reset()
+        if player_input is not None:
+            player_input.reset()
     return jsonify({"status": "Game reset"})
 
 @app.route('/start', methods=['POST', 'GET'])
 def start_game():
-    """Activate the game loop and reset the game state."""
-    global game_active
-    # Reinitialize camera if needed
-    global cap, camera_initialized
-    if cap is None or not (cap and cap.isOpened()):
-        camera_initialized = initialize_camera()
+    """Activate the session's game loop and reset the game state."""
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    # Discover/reopen the camera if needed (only the camera session uses it)
+    if session is camera_session and not lazy_camera.ensure(block=True):
+        print("Camera discovery still running; starting without a camera")
     ensure_game_thread_running()
     # Reset on start to present a fresh game
-    _ = reset_game()
-    game_active = True
+    response = reset_game()
+    if isinstance(response, tuple):
+        return response  # Bad ?seed=
+    session.active = True
+    scheduler.wake()
     return jsonify({"status": "Game started"})
 
 @app.route('/stop', methods=['POST', 'GET'])
 def stop_game():
-    """Deactivate the game loop updates (keeps server alive)."""
-    global game_active, cap
-    game_active = False
+    """Deactivate the session's game loop updates (keeps server alive)."""
+    global cap
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    session.active = False
+    if session is not camera_session:
+        return jsonify({"status": "Game stopped"})
+    # Stop the tracker and capture thread before releasing the device they read from
+    stop_capture_pipeline()
     # Fully release camera so hardware light turns off
     try:
         if cap:
@@ -569,16 +837,112 @@ def stop_game():
         cap = None
     return jsonify({"status": "Game stopped"})
 
+def video_params(args):
+    """(width, quality, max_fps) of a /video_feed request; raises ValueError on bad values"""
+    width = args.get('width', type=int)
+    quality = args.get('quality', type=int)
+    max_fps = args.get('fps', type=float)
+    if width is not None and width < 64:
+        raise ValueError("width must be at least 64")
+    if quality is not None and not 10 <= quality <= 95:
+        raise ValueError("quality must be between 10 and 95")
+    if max_fps is not None and max_fps <= 0:
+        raise ValueError("fps must be positive")
+    # Quality snaps to the adaptive step so clients share encoded variants
+    if quality is not None:
+        quality = max(10, round(quality / 10) * 10)
+    return width, quality, max_fps
+
+def ensure_camera_for_viewer():
+    """First viewer starts camera discovery; the placeholder is streamed meanwhile"""
+    if not frame_hub.running:
+        lazy_camera.ensure(block=False)
+
 @app.route('/video_feed')
 def video_feed():
-    # If camera is not available, do not hold hardware
-    if cap is None or not cap.isOpened():
-        return Response(gen_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
-    return Response(gen_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    """MJPEG stream; optional query parameters: width (px), quality (10-95), fps (max)"""
+    try:
+        width, quality, max_fps = video_params(request.args)
+    except ValueError as param_err:
+        return jsonify({"status": "error", "message": str(param_err)}), 400
+    ensure_camera_for_viewer()
+    return Response(gen_frames(width, quality, max_fps), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/stream_stats')
+def stream_stats():
+    """Subscriber count, per-client drop counters, overlay cost and frame buffer reuse"""
+    stats = video_broadcaster.stats()
+    stats['overlay'] = overlay_renderer.stats()
+    # Process-wide: grows with open streams on the dev server, flat on asgi.py
+    stats['threads'] = threading.active_count()
+    # Allocation counters stay flat once every pool has seen the frame size
+    stats['buffers'] = {
+        'capture': frame_hub.buffers.stats(),
+        'prepare': frame_preparer.stats(),
+        'annotate': annotate_buffers.stats(),
+        'inference': roi_inference.buffers.stats()
+    }
+    return jsonify(stats)
+
+@app.route('/loop_stats')
+def loop_stats():
+    """Game tick cadence (interval, jitter, late ticks), scheduler load and tracker throughput"""
+    session = get_session()
+    if session is None:
+        return unknown_session()
+    return jsonify({
+        'game_loop': session.clock.stats(),
+        'scheduler': scheduler.stats(),
+        'hand_tracker': hand_tracker.stats(),
+        'inference': roi_inference.stats(),
+        'latency': latency.summary()
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Per-stage latency and video overlay histograms in the Prometheus text format"""
+    return Response(latency.render() + video_latency.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/recording', methods=['GET', 'POST'])
+def recording():
+    """Start/stop recording landmarks (JSON: action 'start'|'stop', name, frames)"""
+    global landmark_recorder
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        action = data.get('action')
+        if action == 'start':
+            if landmark_recorder is not None:
+                return jsonify({"status": "error", "message": "Already recording"}), 409
+            # Only a bare file name; recordings always land in RECORDINGS_DIR
+            name = os.path.basename(str(data.get('name') or time.strftime('session-%Y%m%d-%H%M%S')))
+            os.makedirs(RECORDINGS_DIR, exist_ok=True)
+            path = os.path.join(RECORDINGS_DIR, name if name.endswith('.lmk') else name + '.lmk')
+            frame_shape = None
+            if data.get('frames'):
+                packet = frame_hub.latest()
+                if packet is None:
+                    return jsonify({"status": "error", "message": "No camera frames to size the recording"}), 409
+                frame_shape = packet.frame.shape
+            landmark_recorder = LandmarkRecorder(path, max_hands=camera_session.players, frame_shape=frame_shape)
+            return jsonify({"status": "Recording started", "path": path})
+        if action == 'stop':
+            recorder, landmark_recorder = landmark_recorder, None
+            if recorder is None:
+                return jsonify({"status": "error", "message": "Not recording"}), 409
+            recorder.close()  # Waits for a write in progress on the tracker thread
+            return jsonify({"status": "Recording stopped", "path": recorder.path, "frames": recorder.frames_written})
+        return jsonify({"status": "error", "message": "action must be 'start' or 'stop'"}), 400
+    return jsonify({
+        "recording": landmark_recorder is not None,
+        "path": landmark_recorder.path if landmark_recorder else None,
+        "frames": landmark_recorder.frames_written if landmark_recorder else 0
+    })
 
 @app.route('/test_camera')
 def test_camera():
     """Route to test camera functionality"""
+    if not camera_initialized:
+        lazy_camera.ensure(block=True)
     if camera_initialized:
         return jsonify({
             "status": "success",
@@ -600,18 +964,20 @@ def test_camera():
         })
 
 if __name__ == '__main__':
-    import os
     print("=== Snake Game with Hand Gesture Control ===")
-    print(f"Camera Status: {'✓ Connected' if camera_initialized else '✗ Not Found'}")
+    print("Camera: discovered on the first /start or /video_feed request")
     
     port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('FLASK_ENV') != 'production'
+    # The Werkzeug debugger executes code from the browser: opt-in only
+    debug = os.environ.get('FLASK_DEBUG') == '1'
     
-    print("Starting Flask application...")
+    print("Starting Flask development server (one thread per connection)...")
+    print("For production use the async server: python asgi.py")
     print(f"Access the game at: http://localhost:{port}")
     print(f"Test camera at: http://localhost:{port}/test_camera")
     print(f"Video feed at: http://localhost:{port}/video_feed")
 
+    start_services()
     # Important: do not block the server with interactive camera test
     # Use /video_feed or /test_camera endpoints instead
-    app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=False, threaded=True)
\ No newline at end of file
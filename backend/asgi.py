@@ -0,0 +1,171 @@
+"""Production ASGI entry point: async streaming endpoints, everything else through Flask.
+
+`/video_feed` and `/game_stream` are served by coroutines that wait on the
+event loop, so an open stream costs a coroutine instead of a thread. JPEG
+encoding borrows a thread from a small pool only on a variant cache miss.
+All other routes run the Flask app on a fixed WSGI thread pool (a2wsgi).
+The ASGI lifespan starts and stops the game loop and camera pipeline.
+
+    python asgi.py                      # or: uvicorn asgi:application --port 5000
+
+Run a single worker process: the camera, tracker and game sessions live in
+this process.
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.datastructures import MultiDict
+
+import app as backend
+
+# Encodes JPEG variants on cache misses (cv2 releases the GIL while encoding)
+encode_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('ENCODE_THREADS', 4)),
+                                 thread_name_prefix='jpeg-encode')
+# Short request/response routes; streams never occupy these threads
+flask_app = WSGIMiddleware(backend.app, workers=int(os.environ.get('WSGI_THREADS', 16)))
+# Set once the server starts shutting down; open streams finish their response and return
+closing = asyncio.Event()
+event_loop = None
+
+
+def query_args(scope):
+    return MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+
+
+async def send_json(send, status, body):
+    payload = json.dumps(body).encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(payload)).encode())]})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+async def stream_response(receive, send, content_type, produce, headers=()):
+    """Start a streaming response and run `produce(write)` until the client disconnects."""
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', content_type), *headers]})
+
+    async def write(chunk):
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    producer = asyncio.ensure_future(produce(write))
+    watcher = asyncio.ensure_future(disconnected())
+    closed = asyncio.ensure_future(closing.wait())
+    tasks = (producer, watcher, closed)
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        # Cut by the server after its grace period (plain `uvicorn` CLI); end quietly
+        for task in tasks:
+            task.cancel()
+        return
+    for task in tasks:
+        task.cancel()
+    error = (await asyncio.gather(*tasks, return_exceptions=True))[0]
+    if isinstance(error, Exception) and not isinstance(error, OSError):
+        print(f"Stream error: {error!r}")
+    if watcher not in done:
+        # Server shutdown or producer error: finish the chunked body so the client sees a clean end
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+def close_streams():
+    """End every open stream; safe to call from signal handlers and other threads."""
+    if event_loop is not None:
+        event_loop.call_soon_threadsafe(closing.set)
+
+
+async def video_feed(scope, receive, send):
+    """MJPEG stream with the same query parameters as the Flask route"""
+    try:
+        width, quality, max_fps = backend.video_params(query_args(scope))
+    except ValueError as param_err:
+        await send_json(send, 400, {"status": "error", "message": str(param_err)})
+        return
+    backend.ensure_camera_for_viewer()
+    broadcaster = backend.video_broadcaster
+    subscriber = broadcaster.subscribe(width, quality, max_fps)
+
+    async def produce(write):
+        while True:
+            frame_bytes = await broadcaster.next_frame_async(subscriber, timeout=1.0, executor=encode_pool)
+            if frame_bytes is None:
+                continue
+            started = time.perf_counter()
+            await write(b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+            # send() returns once the transport has drained below its high-water mark
+            broadcaster.record_send(subscriber, time.perf_counter() - started)
+
+    try:
+        await stream_response(receive, send, b'multipart/x-mixed-replace; boundary=frame', produce)
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+async def game_stream(scope, receive, send):
+    """Server-Sent Events: a snapshot on connect, then one delta per game tick"""
+    session = backend.sessions.get(query_args(scope).get('session', backend.CAMERA_SESSION_ID))
+    if session is None:
+        await send_json(send, 404, {"status": "error", "message": "Unknown session"})
+        return
+    await stream_response(receive, send, b'text/event-stream', session.broadcaster.stream_async,
+                          headers=[(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')])
+
+
+STREAMS = {'/video_feed': video_feed, '/game_stream': game_stream}
+
+
+async def lifespan(receive, send):
+    global event_loop
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            event_loop = asyncio.get_running_loop()
+            backend.start_services()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # Joins the scheduler/capture threads, so keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, backend.stop_services)
+            encode_pool.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    handler = STREAMS.get(scope['path']) if scope['type'] == 'http' and scope['method'] == 'GET' else None
+    if handler is not None:
+        await handler(scope, receive, send)
+        return
+    await flask_app(scope, receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    class Server(uvicorn.Server):
+        def handle_exit(self, sig, frame):
+            # Streams never finish on their own: end them now instead of after the grace period
+            close_streams()
+            super().handle_exit(sig, frame)
+
+    port = int(os.environ.get('PORT', 5000))
+    print("=== Snake Game with Hand Gesture Control (ASGI) ===")
+    print(f"Access the game at: http://localhost:{port}")
+    server = Server(uvicorn.Config(application, host='0.0.0.0', port=port, lifespan='on',
+                                   timeout_graceful_shutdown=3, log_level=os.environ.get('LOG_LEVEL', 'info')))
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass  # uvicorn re-raises the signal after a clean shutdown
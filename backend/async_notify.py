@@ -0,0 +1,60 @@
+"""Wake asyncio coroutines from the threads that publish frames and game state."""
+import asyncio
+import threading
+
+
+def _resolve(futures):
+    for future in futures:
+        if not future.done():
+            future.set_result(None)
+
+
+class ThreadNotifier:
+    """One-shot wakeups for coroutines, triggered by `notify()` from any thread.
+
+    A coroutine takes a `waiter()` *before* checking for new data and then
+    awaits it with `wait()`, so a publish between the check and the await
+    still wakes it. `notify()` costs one `call_soon_threadsafe` per event
+    loop with waiters, however many coroutines are waiting.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}  # future -> its event loop
+
+    def waiter(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._waiters[future] = loop
+        return future
+
+    def notify(self):
+        with self._lock:
+            if not self._waiters:
+                return
+            waiters, self._waiters = self._waiters, {}
+        by_loop = {}
+        for future, loop in waiters.items():
+            by_loop.setdefault(loop, []).append(future)
+        for loop, futures in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_resolve, futures)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def discard(self, future):
+        with self._lock:
+            self._waiters.pop(future, None)
+
+    async def wait(self, future, timeout):
+        """Await a waiter; returns False on timeout."""
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            # Timed out or cancelled: wait_for cancelled the future, drop it from the list
+            if future.cancelled() or not future.done():
+                self.discard(future)
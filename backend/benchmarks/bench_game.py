@@ -0,0 +1,134 @@
+"""Game tick cost (one or N snakes, with or without the tick log), /game_state serialization
+(JSON vs binary, 304) as the snake grows, and game-log seeks (keyframe vs replay from tick 0)."""
+import json
+
+import pytest
+
+from conftest import long_snake_engine
+from game_log import GameLogReader, GameLogWriter
+from game_session import GameSession
+from state_codec import unpack_state
+
+LENGTHS = [3, 101, 1001, 2001]
+STEPS = 10
+
+
+@pytest.fixture
+def camera_session(app_module):
+    """The app's camera session; its engine is restored afterwards so boards don't leak between benchmarks."""
+    session = app_module.camera_session
+    engine = session.engine
+    yield session
+    session.engine = engine
+
+
+@pytest.mark.parametrize('length', LENGTHS)
+def test_game_tick(benchmark, length):
+    def setup():
+        return (long_snake_engine(length),), {}
+
+    def run(engine):
+        for _ in range(STEPS):
+            engine.step()
+        assert not engine.game_over
+
+    benchmark.extra_info['steps_per_round'] = STEPS
+    benchmark.pedantic(run, setup=setup, rounds=200)
+
+
+@pytest.mark.parametrize('length', LENGTHS)
+def test_game_state_json(benchmark, app_module, camera_session, length):
+    camera_session.engine = long_snake_engine(length)
+    client = app_module.app.test_client()
+    response = benchmark(client.get, '/game_state')
+    assert len(response.get_json()['snake']) == length
+    benchmark.extra_info['payload_bytes'] = len(response.data)
+
+
+@pytest.mark.parametrize('length', LENGTHS)
+def test_game_state_binary(benchmark, app_module, camera_session, length):
+    camera_session.engine = long_snake_engine(length)
+    client = app_module.app.test_client()
+    response = benchmark(client.get, '/game_state?format=binary')
+    assert unpack_state(response.data) == client.get('/game_state').get_json()
+    benchmark.extra_info['payload_bytes'] = len(response.data)
+
+
+@pytest.mark.parametrize('length', LENGTHS)
+def test_game_state_not_modified(benchmark, app_module, camera_session, length):
+    """Polling an unchanged game with its ETag: no snapshot is built."""
+    camera_session.engine = long_snake_engine(length)
+    client = app_module.app.test_client()
+    etag = client.get('/game_state').headers['ETag']
+    response = benchmark(client.get, '/game_state', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    benchmark.extra_info['payload_bytes'] = len(response.data)
+
+
+@pytest.mark.parametrize('length', LENGTHS)
+@pytest.mark.parametrize('encoding', ['json', 'binary'])
+def test_state_serialize(benchmark, camera_session, encoding, length):
+    """Serialization alone, without the Flask request overhead."""
+    camera_session.engine = long_snake_engine(length)
+    if encoding == 'json':
+        payload = benchmark(lambda: json.dumps(camera_session.snapshot()).encode())
+    else:
+        payload = benchmark(camera_session.packed)
+    benchmark.extra_info['payload_bytes'] = len(payload)
+
+
+@pytest.mark.parametrize('players', [1, 2, 4, 8])
+def test_multi_snake_step(benchmark, players):
+    """One session tick with N snakes on a 50x50 board, delta built and published."""
+    def setup():
+        return (GameSession('bench', 50, 50, 10, seed=0, players=players),), {}
+
+    def run(session):
+        for _ in range(STEPS):
+            session.step()
+        assert not session.game_over
+
+    benchmark.extra_info['steps_per_round'] = STEPS
+    benchmark.pedantic(run, setup=setup, rounds=200)
+
+
+@pytest.mark.parametrize('logging', ['off', 'on'])
+def test_session_step_logged(benchmark, tmp_path, logging):
+    """Tick-thread cost of the game log: packing the record and queueing it."""
+    logs = GameLogWriter(str(tmp_path)) if logging == 'on' else None
+
+    def setup():
+        return (GameSession('bench', 50, 50, 10, seed=0, logs=logs),), {}
+
+    def run(session):
+        for _ in range(STEPS):
+            session.step()
+        assert not session.game_over
+
+    benchmark.extra_info['steps_per_round'] = STEPS
+    benchmark.pedantic(run, setup=setup, rounds=200)
+    if logs is not None:
+        logs.stop()
+        benchmark.extra_info['bytes_per_tick'] = logs.bytes_written / max(logs.records, 1)
+
+
+@pytest.fixture(scope='module')
+def long_game_log(tmp_path_factory):
+    """Log of a 20,000-tick single-snake game with a keyframe every 256 ticks."""
+    logs = GameLogWriter(str(tmp_path_factory.mktemp('game_logs')), keyframe_interval=256)
+    session = GameSession('bench', 50, 50, 10, seed=0, logs=logs)
+    for tick in range(20000):
+        # Sweep the board row by row: right along a row, one step down at its end
+        session.set_direction(3 if tick % 50 == 49 else 1)
+        session.step()
+    assert not session.game_over
+    logs.stop()
+    return GameLogReader(session.log.path)
+
+
+@pytest.mark.parametrize('seek', ['keyframe', 'from_zero'])
+def test_game_log_seek(benchmark, long_game_log, seek):
+    """Rebuild the board at tick 19,999 from the nearest keyframe vs replaying all of it."""
+    engine = benchmark(long_game_log.engine_at, 19999, use_keyframes=seek == 'keyframe')
+    assert engine.tick == 19999
+    benchmark.extra_info['log_bytes'] = long_game_log.records.nbytes
@@ -0,0 +1,28 @@
+"""Per-call cost of the live gesture classifier, single- and multi-player."""
+import pytest
+
+from conftest import as_landmarks, hands_result, open_hand
+from player_input import MultiPlayerInput
+
+PLAYERS = [1, 2, 4, 8]
+
+
+@pytest.mark.parametrize('pose', ['open_hand', 'no_gesture'])
+def test_get_hand_direction(benchmark, app_module, pose):
+    points = open_hand() if pose == 'open_hand' else open_hand(0.01, 0.01)
+    landmarks = as_landmarks(points)
+    direction = benchmark(app_module.get_hand_direction, landmarks, (480, 640, 3))
+    assert direction == (1 if pose == 'open_hand' else -1)
+
+
+@pytest.mark.parametrize('smoothing', ['cooldown', 'smoothed'])
+@pytest.mark.parametrize('players', PLAYERS)
+def test_multi_player_classify(benchmark, app_module, players, smoothing):
+    """Assign N hands from one MediaPipe result and classify each (per frame)."""
+    settings = dict(app_module.calibration_settings, smoothing_tau=0.0 if smoothing == 'cooldown' else 0.08)
+    player_input = MultiPlayerInput(players, 'region', settings)
+    result = hands_result(players)
+    clock = iter(range(10 ** 9))
+    benchmark(lambda: player_input.update(next(clock) / 30, result))
+    assert player_input.labels() == ['Right'] * players
+    assert player_input.assigner.conflicts == 0
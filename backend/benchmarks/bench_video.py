@@ -0,0 +1,104 @@
+"""MJPEG encoding throughput and fan-out to concurrent /video_feed clients."""
+import itertools
+import threading
+
+import pytest
+
+from conftest import synthetic_frame
+from frame_buffers import BufferPool, FramePreparer, copy_path, measure_allocations, pooled_path
+from frame_hub import FrameHub, FramePacket
+from recording import ReplayCapture
+from stream_broadcaster import MjpegBroadcaster
+
+FRAMES_PER_ROUND = 30
+
+
+def fresh_packet(preparer, frame):
+    """A hub packet whose mirrored/RGB versions are not computed yet."""
+    return FramePacket(1, 0.0, frame, preparer.prepare(frame))
+
+
+def test_annotate_frame(benchmark, app_module, frame):
+    """Mirror + HUD overlay of one 640x480 frame (cached text layers)."""
+    preparer = FramePreparer()
+    annotated = benchmark(lambda: app_module.annotate_frame(fresh_packet(preparer, frame)))
+    assert annotated.shape == frame.shape
+    benchmark.extra_info['overlay_mean_time'] = app_module.overlay_renderer.stats()['mean_time']
+
+
+def test_encode_frame(benchmark, app_module, frame):
+    """Overlay + JPEG encode of one 640x480 frame: the encoder thread's per-frame work."""
+    broadcaster = app_module.video_broadcaster
+    preparer = FramePreparer()
+
+    def encode():
+        return broadcaster._encode(app_module.annotate_frame(fresh_packet(preparer, frame)))
+
+    jpeg = benchmark(encode)
+    benchmark.extra_info['jpeg_bytes'] = len(jpeg)
+
+
+@pytest.mark.parametrize('path', ['copy', 'pooled'])
+def test_frame_path(benchmark, path):
+    """Mirror + RGB for the tracker and a mirrored frame for the overlay, per 640x480 frame.
+
+    Cycles through distinct frames like a camera does; repeating one frame
+    keeps the copying path's fresh arrays unrealistically cache-hot.
+    """
+    frames = [synthetic_frame(seed=seed) for seed in range(8)]
+    step = copy_path if path == 'copy' else pooled_path(FramePreparer(), BufferPool())
+    cycle = itertools.cycle(frames)
+    benchmark(lambda: step(next(cycle)))
+    allocations = measure_allocations(step, frames * 14)
+    benchmark.extra_info['mean_peak_bytes'] = allocations['mean_peak_bytes']
+    benchmark.extra_info['max_peak_bytes'] = allocations['max_peak_bytes']
+
+
+PROFILES = {
+    'full': [(None, 85)],
+    'mixed': [(None, 85), (320, 60)],
+    'all_distinct': [(None, 85), (640, 70), (480, 60), (320, 50)],
+}
+
+
+def run_clients(benchmark, app_module, frames_recording, clients, profiles):
+    hub = FrameHub(preparer=FramePreparer())
+    hub.start(ReplayCapture(frames_recording, loop=True))
+    broadcaster = MjpegBroadcaster(hub, app_module.annotate_frame, app_module.create_placeholder_frame)
+    subscribers = [broadcaster.subscribe(*profiles[i % len(profiles)]) for i in range(clients)]
+
+    def client(subscriber, done):
+        while subscriber.sent < done:
+            broadcaster.next_frame(subscriber, timeout=1.0)
+
+    def run():
+        threads = [threading.Thread(target=client, args=(s, s.sent + FRAMES_PER_ROUND)) for s in subscribers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    try:
+        benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+    finally:
+        for subscriber in subscribers:
+            broadcaster.unsubscribe(subscriber)
+        hub.stop()
+    benchmark.extra_info['clients'] = clients
+    benchmark.extra_info['frames_per_client'] = FRAMES_PER_ROUND
+    if benchmark.stats is not None:  # None under --benchmark-disable
+        benchmark.extra_info['client_fps'] = round(FRAMES_PER_ROUND / benchmark.stats.stats.mean, 1)
+    benchmark.extra_info['dropped'] = sum(s.dropped for s in subscribers)
+    benchmark.extra_info['encodes_per_frame'] = round(broadcaster.encoded_frames / broadcaster.annotated_frames, 2)
+
+
+@pytest.mark.parametrize('clients', [1, 4, 16, 64])
+def test_video_clients(benchmark, app_module, frames_recording, clients):
+    """Time to deliver FRAMES_PER_ROUND frames to every client (capture runs unthrottled)."""
+    run_clients(benchmark, app_module, frames_recording, clients, PROFILES['full'])
+
+
+@pytest.mark.parametrize('profiles', list(PROFILES))
+def test_video_profiles(benchmark, app_module, frames_recording, profiles):
+    """16 clients spread over 1, 2 or 4 (width, quality) profiles: one encode per profile and frame."""
+    run_clients(benchmark, app_module, frames_recording, 16, PROFILES[profiles])
@@ -0,0 +1,107 @@
+"""Shared fixtures for the headless backend benchmarks.
+
+The app is imported against a synthetic landmark recording (REPLAY_PATH),
+so no webcam is needed; its capture pipeline and scheduler are stopped
+right after import so background threads don't skew the timings.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from game_logic import SnakeBody  # noqa: E402
+from recording import LandmarkRecorder  # noqa: E402
+from snake_engine import SnakeEngine  # noqa: E402
+
+FRAME_SHAPE = (480, 640, 3)
+
+
+def synthetic_frame(shape=FRAME_SHAPE, seed=0):
+    """Smooth noise: compresses roughly like a camera image, unlike flat or white-noise frames."""
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, shape, dtype=np.uint8), (31, 31), 0)
+
+
+def open_hand(dx=0.25, dy=0.0):
+    """(21, 3) landmarks of an open hand pointing along (dx, dy) from a centred wrist."""
+    points = np.full((21, 3), [0.5, 0.5, 0.0])
+    for finger, tip in enumerate((4, 8, 12, 16, 20)):
+        spread = (finger - 2) * 0.03
+        points[tip, :2] = 0.5 + dx - spread * dy, 0.5 + dy + spread * dx
+    return points
+
+
+def as_landmarks(points):
+    return [SimpleNamespace(x=x, y=y, z=z) for x, y, z in points.tolist()]
+
+
+def hands_result(count):
+    """A `hands.process`-style result with `count` open hands spread across the frame.
+
+    Wrists sit in the middle of `count` equal vertical strips (one per
+    player in region assignment); all hands point right.
+    """
+    hands = []
+    for i in range(count):
+        points = open_hand()
+        points[:, 0] += (i + 0.5) / count - 0.5
+        hands.append(SimpleNamespace(landmark=as_landmarks(points)))
+    labels = [SimpleNamespace(classification=[SimpleNamespace(label=('Left', 'Right')[i % 2], score=1.0)])
+              for i in range(count)]
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=labels)
+
+
+def long_snake_engine(length, cols=50, rows=50, cell_size=10):
+    """Engine whose snake fills the board row by row (serpentine) up to `length` cells.
+
+    The head ends in column 0 of an even row heading right, so the next
+    `cols - 1` steps run into free cells. The apple is removed so every
+    step costs the same.
+    """
+    engine = SnakeEngine(cols, rows, cell_size, seed=0)
+    cells = []
+    for k in range(length):
+        row, col = divmod(k, cols)
+        cells.append(row * cols + (col if row % 2 == 0 else cols - 1 - col))
+    free_cells = engine.spawner.free_cells
+    for index in engine.body.positions():
+        free_cells.add(engine.body.index(*index))
+    engine.body = SnakeBody([engine.body.position(i) for i in reversed(cells)], cols, rows, cell_size,
+                            free_cells=free_cells)
+    engine.head = engine.body.position(engine.body.head)
+    engine.direction = 1
+    engine.apple = None
+    return engine
+
+
+@pytest.fixture(scope='session')
+def frame():
+    return synthetic_frame()
+
+
+@pytest.fixture(scope='session')
+def frames_recording(tmp_path_factory):
+    """Landmark recording with 30 raw frames, for capture/broadcast benchmarks."""
+    path = str(tmp_path_factory.mktemp('recordings') / 'frames.lmk')
+    recorder = LandmarkRecorder(path, frame_shape=FRAME_SHAPE)
+    base = synthetic_frame()
+    for i in range(30):
+        recorder.write(i / 30, None, np.roll(base, i * 4, axis=1))
+    recorder.close()
+    return path
+
+
+@pytest.fixture(scope='session')
+def app_module(frames_recording, tmp_path_factory):
+    os.environ['REPLAY_PATH'] = frames_recording
+    os.environ['GAME_LOG_DIR'] = str(tmp_path_factory.mktemp('game_logs'))
+    import app
+    app.scheduler.stop()
+    app.stop_capture_pipeline()
+    return app
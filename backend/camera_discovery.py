@@ -0,0 +1,222 @@
+"""Parallel, cached webcam discovery with the right capture backend per platform."""
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import cv2
+
+# (width, height) modes tried in order; 640x480 first for higher FPS
+MODES = [(640, 480), (1280, 720)]
+CACHE_KEYS = ('index', 'backend', 'width', 'height')
+
+
+def platform_backend():
+    """V4L2 on Linux, DirectShow on Windows, AVFoundation on macOS."""
+    if sys.platform.startswith('linux'):
+        return cv2.CAP_V4L2
+    if sys.platform.startswith('win'):
+        return cv2.CAP_DSHOW
+    if sys.platform == 'darwin':
+        return cv2.CAP_AVFOUNDATION
+    return cv2.CAP_ANY
+
+
+def backend_name(backend):
+    return {cv2.CAP_V4L2: 'V4L2', cv2.CAP_DSHOW: 'DSHOW', cv2.CAP_AVFOUNDATION: 'AVFOUNDATION',
+            cv2.CAP_ANY: 'ANY'}.get(backend, str(backend))
+
+
+def candidate_indices(max_index=10):
+    """Device indices worth probing: the existing /dev/video* nodes on Linux, else 0..max_index-1."""
+    if sys.platform.startswith('linux'):
+        indices = sorted(int(m.group(1)) for m in
+                         (re.match(r'/dev/video(\d+)$', path) for path in glob.glob('/dev/video*')) if m)
+        return [i for i in indices if i < max_index]
+    return list(range(max_index))
+
+
+def open_camera(index, backend, modes=MODES, test_frames=5, min_frames=3):
+    """Open one device and confirm it delivers frames; returns (cap, (width, height)) or (None, None)."""
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened():
+        cap.release()
+        return None, None
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
+    cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)  # 0.75 -> auto exposure on many Windows drivers
+    cap.set(cv2.CAP_PROP_AUTO_WB, 1)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    for width, height in modes:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        frames = 0
+        for _ in range(test_frames):
+            ret, _ = cap.read()
+            if not ret:
+                break
+            frames += 1
+        if frames >= min_frames:
+            return cap, (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+    return None, None
+
+
+def _release_late(future):
+    if future.exception() is None:
+        cap, _ = future.result()
+        if cap is not None:
+            cap.release()
+
+
+class CameraDiscovery:
+    """Finds a working camera: the cached device first, then every candidate in parallel.
+
+    The cached device and the parallel probe each get `timeout` seconds;
+    probes that outlive it are abandoned (their capture is released
+    whenever they finish). The winning index, backend and mode are written
+    to `cache_path` so the next start opens that device directly.
+    """
+
+    def __init__(self, cache_path, timeout=3.0, max_index=10):
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.max_index = max_index
+        self.backend = platform_backend()
+        self.info = {}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not all(
+                type(entry.get(key)) is int for key in CACHE_KEYS):
+            print(f"Ignoring invalid camera cache {self.cache_path}")
+            return None
+        return entry
+
+    def _save_cache(self, entry):
+        try:
+            with open(self.cache_path, 'w') as f:
+                json.dump(entry, f)
+        except OSError as cache_err:
+            print(f"Could not write camera cache: {cache_err}")
+
+    def discover(self):
+        """Return an opened, verified cv2.VideoCapture or None; details land in `info`."""
+        started = time.perf_counter()
+        cached = self._load_cache()
+        if cached is not None:
+            cap, mode = self._open_cached(cached)
+            if cap is not None:
+                self._found(cached['index'], cached['backend'], mode, started, cache_hit=True, probed=1)
+                return cap
+            print(f"Cached camera {cached['index']} is gone; probing all devices")
+
+        candidates = candidate_indices(self.max_index)
+        if not candidates:
+            self.info = {'found': False, 'probed': 0, 'probe_time': round(time.perf_counter() - started, 3)}
+            return None
+        print(f"Probing cameras {candidates} with {backend_name(self.backend)}...")
+        pool = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix='camera-probe')
+        futures = {pool.submit(open_camera, index, self.backend): index for index in candidates}
+        done, pending = self._wait(futures, started + self.timeout)
+        for future in pending:
+            # Stuck driver: don't wait, just release the device if it ever opens
+            future.add_done_callback(_release_late)
+        pool.shutdown(wait=False)
+
+        opened = sorted((futures[f], f.result()) for f in done if f.exception() is None and f.result()[0] is not None)
+        for _, (cap, _) in opened[1:]:
+            cap.release()  # Keep the lowest working index, like the sequential scan did
+        if not opened:
+            self.info = {'found': False, 'probed': len(candidates), 'timed_out': len(pending),
+                         'probe_time': round(time.perf_counter() - started, 3)}
+            return None
+        index, (cap, mode) = opened[0]
+        self._found(index, self.backend, mode, started, cache_hit=False, probed=len(candidates))
+        self._save_cache({'index': index, 'backend': self.backend, 'width': mode[0], 'height': mode[1]})
+        return cap
+
+    def _open_cached(self, cached):
+        """Open the cached device directly, giving up after `timeout` like any other probe."""
+        mode = (cached['width'], cached['height'])
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='camera-probe')
+        future = pool.submit(open_camera, cached['index'], cached['backend'],
+                             modes=[mode] + [m for m in MODES if m != mode])
+        pool.shutdown(wait=False)
+        done, _ = wait([future], timeout=self.timeout)
+        if not done:
+            print(f"Cached camera {cached['index']} did not answer within {self.timeout}s")
+            future.add_done_callback(_release_late)
+            return None, None
+        if future.exception() is not None:
+            print(f"Cached camera {cached['index']} failed: {future.exception()}")
+            return None, None
+        return future.result()
+
+    @staticmethod
+    def _wait(futures, deadline):
+        """Wait until the lowest working index is settled (all lower ones failed) or the deadline."""
+        done, pending = set(), set(futures)
+        while pending:
+            finished, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()),
+                                     return_when=FIRST_COMPLETED)
+            if not finished:
+                break
+            done |= finished
+            working = [futures[f] for f in done if f.exception() is None and f.result()[0] is not None]
+            if working and all(futures[f] > min(working) for f in pending):
+                break
+        return done, pending
+
+    def _found(self, index, backend, mode, started, cache_hit, probed):
+        self.info = {
+            'found': True,
+            'index': index,
+            'backend': backend_name(backend),
+            'frame_size': f"{mode[0]}x{mode[1]}",
+            'cache_hit': cache_hit,
+            'probed': probed,
+            'probe_time': round(time.perf_counter() - started, 3),
+        }
+
+
+class LazyCamera:
+    """Runs `open_fn()` once on demand, either blocking (for at most `timeout` seconds) or in the background."""
+
+    def __init__(self, open_fn, timeout=None):
+        self.open_fn = open_fn
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def probing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def ensure(self, block=True):
+        """Start discovery unless it is already running; with `block`, wait for it.
+
+        Returns False if a blocking wait gave up before discovery finished.
+        """
+        with self._lock:
+            if not self.probing:
+                self._thread = threading.Thread(target=self.open_fn, name='camera-discovery', daemon=True)
+                self._thread.start()
+            thread = self._thread
+        if block:
+            thread.join(self.timeout)
+            return not thread.is_alive()
+        return True
+
+
+def default_cache_path():
+    return os.environ.get('CAMERA_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                       '.camera_cache.json'))
@@ -0,0 +1,264 @@
+"""Preallocated frame buffers and a mirror/convert-once stage shared by tracker and encoder.
+
+Every camera frame used to be flipped and converted on the tracker thread
+(`cv2.flip` + `cv2.cvtColor`) and flipped again for the video stream. Each
+of those calls allocated a new full-resolution array. Here the capture
+thread reads into pooled buffers. Each frame is mirrored at most once and
+converted to RGB at most once, with `dst=` writing into pooled buffers.
+The tracker and the encoder share the results.
+
+A pooled buffer is only reused once nothing refers to it any more: not a
+frame packet, a view, an encoder task or a running MediaPipe call. A slow
+consumer therefore never sees its frame overwritten; the pool allocates
+another buffer instead.
+"""
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# BufferPool tells free buffers from busy ones by `sys.getrefcount`, which is
+# only exact on GIL builds of CPython before 3.14. PyPy has no reference counts,
+# free-threaded builds defer them, and 3.14 borrows references to locals
+# without counting them. Any of these would let take() hand out a frame that is
+# still being encoded or run through MediaPipe, so refuse to run rather than
+# corrupt frames. Check the probe below before widening the range.
+SUPPORTED_PYTHON = ((3, 10), (3, 14))
+
+
+def _free_refcount():
+    """`sys.getrefcount` of a buffer that only the pool list refers to, taken the way `take()` does."""
+    buffers = [np.empty(1)]
+    for buffer in buffers:
+        return sys.getrefcount(buffer)
+
+
+def _check_refcounts(free):
+    """Raise RuntimeError unless holding a buffer or a view of it shows up in its reference count."""
+    low, high = SUPPORTED_PYTHON
+    if (sys.implementation.name != 'cpython' or not low <= sys.version_info[:2] < high
+            or sysconfig.get_config_var('Py_GIL_DISABLED')):
+        raise RuntimeError(f"frame_buffers needs a GIL build of CPython {low[0]}.{low[1]} to "
+                           f"{high[0]}.{high[1] - 1}, not {sys.implementation.name} {sys.version.split()[0]}")
+    buffers = [np.empty(1)]
+    held = buffers[0]
+    view = held[:]
+    del held
+    for buffer in buffers:
+        busy = sys.getrefcount(buffer)
+    del view
+    for buffer in buffers:
+        if busy <= free or sys.getrefcount(buffer) != free:
+            raise RuntimeError("sys.getrefcount does not track buffer holders on this interpreter")
+
+
+FREE_REFCOUNT = _free_refcount()
+_check_refcounts(FREE_REFCOUNT)
+
+
+class BufferPool:
+    """Reusable scratch buffers; `take(shape)` hands out one that nothing else references.
+
+    Ownership is the reference count: a buffer is busy while any array,
+    view or packet holds it (views keep their base array alive) and free
+    again once the last of them is dropped, so there is no release call to
+    forget. That needs exact reference counts, hence SUPPORTED_PYTHON.
+    `take()` reuses a free buffer of the same shape, reallocates a
+    free one of another shape, and allocates a new buffer when all are
+    busy, so the pool grows to the peak number of frames in use at once.
+    """
+
+    def __init__(self, dtype=np.uint8):
+        self.dtype = dtype
+        self._buffers = []
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.exhausted = 0  # take() calls that found every buffer busy
+
+    def take(self, shape):
+        """A C-contiguous array of `shape` that no one else holds (contents undefined)."""
+        shape = tuple(shape)
+        with self._lock:
+            free = None
+            slot = 0
+            for buffer in self._buffers:
+                # Keep this loop shaped like _free_refcount() so the counts compare
+                if sys.getrefcount(buffer) == FREE_REFCOUNT:
+                    if buffer.shape == shape:
+                        buffer.flags.writeable = True  # Consumers may have frozen it
+                        return buffer
+                    if free is None:
+                        free = slot
+                slot += 1
+            if free is None and self._buffers:
+                self.exhausted += 1
+            buffer = np.empty(shape, dtype=self.dtype)
+            self.allocations += 1
+            self.allocated_bytes += buffer.nbytes
+            if free is None:
+                self._buffers.append(buffer)
+            else:
+                self._buffers[free] = buffer
+            return buffer
+
+    def in_use(self):
+        busy = 0
+        with self._lock:
+            for buffer in self._buffers:
+                if sys.getrefcount(buffer) > FREE_REFCOUNT:
+                    busy += 1
+        return busy
+
+    def stats(self):
+        return {
+            'buffers': len(self._buffers),
+            'in_use': self.in_use(),
+            'exhausted': self.exhausted,
+            'allocations': self.allocations,
+            'allocated_bytes': self.allocated_bytes,
+        }
+
+
+class PreparedFrame:
+    """One hub frame plus its mirrored BGR and RGB versions, each computed on first use."""
+
+    __slots__ = ('frame', '_preparer', '_mirrored', '_rgb', '_lock')
+
+    def __init__(self, frame, preparer):
+        self.frame = frame
+        self._preparer = preparer
+        self._mirrored = None
+        self._rgb = None
+        self._lock = threading.Lock()
+
+    @property
+    def mirrored(self):
+        """Horizontally flipped BGR frame (read-only, shared)."""
+        with self._lock:
+            if self._mirrored is None:
+                self._mirrored = self._preparer._mirror(self.frame)
+            else:
+                self._preparer.shared_hits += 1
+            return self._mirrored
+
+    @property
+    def rgb(self):
+        """Mirrored RGB frame for MediaPipe (read-only, shared)."""
+        mirrored = self.mirrored
+        with self._lock:
+            if self._rgb is None:
+                self._rgb = self._preparer._convert(mirrored)
+            return self._rgb
+
+
+class FramePreparer:
+    """Creates PreparedFrames whose mirrored/RGB arrays live in one BufferPool."""
+
+    def __init__(self):
+        self.buffers = BufferPool()
+        self.mirrors = 0
+        self.conversions = 0
+        self.shared_hits = 0
+
+    def prepare(self, frame):
+        return PreparedFrame(frame, self)
+
+    def _mirror(self, frame):
+        mirrored = cv2.flip(frame, 1, dst=self.buffers.take(frame.shape))
+        mirrored.flags.writeable = False
+        self.mirrors += 1
+        return mirrored
+
+    def _convert(self, frame):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.buffers.take(frame.shape))
+        rgb.flags.writeable = False
+        self.conversions += 1
+        return rgb
+
+    def stats(self):
+        stats = self.buffers.stats()
+        stats.update(mirrors=self.mirrors, conversions=self.conversions, shared_hits=self.shared_hits)
+        return stats
+
+
+def measure_allocations(step, frames, warmup=10):
+    """Run `step(frame)` over `frames` under tracemalloc and report Python/NumPy allocations per frame.
+
+    `peak_bytes` is the largest transient allocation of a single step (a
+    temporary full-resolution array shows up here even if it is freed again);
+    `retained_bytes` is what the steady-state steps kept alive in total.
+    """
+    for frame in frames[:warmup]:
+        step(frame)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        peaks = []
+        start_current, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        for frame in frames[warmup:]:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            step(frame)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        elapsed = time.perf_counter() - started
+        end_current, _ = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    count = max(1, len(peaks))
+    return {
+        'frames': len(peaks),
+        'mean_peak_bytes': round(sum(peaks) / count),
+        'max_peak_bytes': max(peaks, default=0),
+        'retained_bytes': end_current - start_current,
+        'mean_time': round(elapsed / count, 6),
+    }
+
+
+def copy_path(frame):
+    """The previous per-frame work: a flip + convert for the tracker and another flip for the stream."""
+    rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+    annotated = cv2.flip(frame, 1)
+    return rgb, annotated
+
+
+def pooled_path(preparer, annotate_buffers):
+    """The shared path: mirror and convert once into pooled buffers, copy for the overlay."""
+    def step(frame):
+        prepared = preparer.prepare(frame)
+        rgb = prepared.rgb
+        annotated = annotate_buffers.take(frame.shape)
+        np.copyto(annotated, prepared.mirrored)
+        return rgb, annotated
+    return step
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Per-frame allocations of the copying vs the pooled frame path")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+    preparer = FramePreparer()
+    annotate_buffers = BufferPool()
+    report = {
+        'copy': measure_allocations(copy_path, frames),
+        'pooled': measure_allocations(pooled_path(preparer, annotate_buffers), frames),
+        'pool': {'prepare': preparer.stats(), 'annotate': annotate_buffers.stats()},
+    }
+    print(json.dumps(report, indent=2))
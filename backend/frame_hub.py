@@ -0,0 +1,259 @@
+"""Single-capture frame hub shared by the game loop and the video stream."""
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+from frame_buffers import BufferPool
+
+# One published camera frame. `frame` is marked read-only so every consumer
+# can share the same array without copying it; `prepared` (a PreparedFrame,
+# when the hub has a preparer) holds its shared mirrored/RGB versions.
+FramePacket = namedtuple('FramePacket', ['seq', 'timestamp', 'frame', 'prepared'], defaults=(None,))
+
+
+class FrameHub:
+    """Owns the only `cap.read()` loop and publishes each frame exactly once.
+
+    Frames land in a small ring buffer tagged with a monotonically increasing
+    sequence number and a capture timestamp. Any number of consumers (hand
+    tracker, MJPEG streams, recorders) can poll `latest()` or block on
+    `wait_next()` without triggering extra camera reads. The capture thread
+    reads into pooled buffers, so steady-state capture allocates nothing.
+
+    Every camera frame is taken off the driver with `grab()`, so its queue
+    never fills with stale frames (many drivers ignore CAP_PROP_BUFFERSIZE),
+    but it is only decoded and prepared with `retrieve()` while a consumer
+    is waiting in `wait_next()`; the others are skipped undecoded. Failed
+    grabs back off exponentially, and after `max_failures` in a row the
+    optional `reopen()` callback (which releases the old source) is asked
+    for a new one, retrying with backoff until it succeeds or the hub stops.
+    `stats()` reports the measured capture FPS, skipped and dropped frames
+    and how old frames are when consumers get them.
+    """
+
+    def __init__(self, capacity=4, preparer=None, max_failures=5, max_backoff=5.0, stale_age=0.1):
+        self._ring = [None] * capacity
+        self.preparer = preparer
+        # Frames in the ring or still held by consumers are never read into
+        self.buffers = BufferPool()
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._source = None
+        self._thread = None
+        self._running = False
+        self._stop_event = threading.Event()
+        self.reopen = None
+        self.max_failures = max_failures
+        self.max_backoff = max_backoff
+        self.stale_age = stale_age  # Frames handed out older than this (seconds) count as stale
+        self.state = 'stopped'
+        self.first_frame_at = None  # Wall-clock time of the first frame ever published
+        self._waiting = 0  # Consumers blocked in wait_next(): frames are only decoded for them
+        self.read_failures = 0
+        self.reconnects = 0
+        self.grabbed = 0
+        self.skipped = 0  # Grabbed while nobody was waiting, never decoded
+        self.dropped = 0  # Estimated from gaps between grabs longer than the camera's frame interval
+        self.stale_frames = 0
+        self._nominal_interval = None
+        self._last_grab = None
+        self._interval = None  # Moving average of the time between grabs
+        self._age = None  # Moving average of frame age when handed to a consumer
+        self._age_max = 0.0
+        self._age_max_last = 0.0
+        self._age_window = 0.0
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def start(self, source, reopen=None):
+        """Start the capture thread reading from `source` (a cv2.VideoCapture)."""
+        self.stop()
+        self._source = source
+        self.reopen = reopen
+        self._running = True
+        self._stop_event.clear()
+        self.state = 'streaming'
+        self._thread = threading.Thread(target=self._run, name='frame-hub', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the capture thread; the source itself is released by the caller."""
+        self._running = False
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+        self._source = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def publish(self, frame, timestamp=None):
+        """Publish a frame to all consumers and return its sequence number."""
+        frame.flags.writeable = False
+        with self._cond:
+            self._seq += 1
+            packet = FramePacket(self._seq, timestamp if timestamp is not None else time.time(), frame,
+                                 self.preparer.prepare(frame) if self.preparer is not None else None)
+            if self.first_frame_at is None:
+                self.first_frame_at = time.time()
+            self._ring[self._seq % len(self._ring)] = packet
+            self._cond.notify_all()
+        return packet.seq
+
+    def latest(self):
+        """Return the newest FramePacket, or None if nothing was published yet."""
+        with self._cond:
+            if self._seq == 0:
+                return None
+            return self._ring[self._seq % len(self._ring)]
+
+    def get(self, seq):
+        """Return the packet with sequence `seq` if it is still in the ring."""
+        with self._cond:
+            packet = self._ring[seq % len(self._ring)]
+            if packet is not None and packet.seq == seq:
+                return packet
+            return None
+
+    def wait_next(self, after_seq, timeout=None):
+        """Block until a frame newer than `after_seq` exists and return the newest one.
+
+        Returns None on timeout or when the hub is stopped.
+        """
+        with self._cond:
+            self._waiting += 1
+            try:
+                if not self._cond.wait_for(lambda: self._seq > after_seq or not self._running, timeout):
+                    return None
+            finally:
+                self._waiting -= 1
+            if self._seq <= after_seq:
+                return None
+            packet = self._ring[self._seq % len(self._ring)]
+            self._record_age(time.time() - packet.timestamp)
+            return packet
+
+    def _record_age(self, age):
+        """Track frame age at hand-out (called with the lock held)."""
+        self._age = age if self._age is None else self._age + 0.1 * (age - self._age)
+        if age > self.stale_age:
+            self.stale_frames += 1
+        now = time.monotonic()
+        if now - self._age_window > 1.0:
+            # Report the worst age of the last full second, not of all time
+            self._age_max_last, self._age_max, self._age_window = self._age_max, 0.0, now
+        self._age_max = max(self._age_max, age)
+
+    def _record_grab(self, grabbed_at):
+        last, self._last_grab = self._last_grab, grabbed_at
+        self.grabbed += 1
+        if last is None:
+            return
+        interval = grabbed_at - last
+        self._interval = interval if self._interval is None else self._interval + 0.1 * (interval - self._interval)
+        nominal = self._nominal_interval
+        if nominal and interval > 1.5 * nominal:
+            self.dropped += int(round(interval / nominal)) - 1
+
+    def _use_source(self, source):
+        self._source = source
+        self._last_grab = None
+        fps = source.get(cv2.CAP_PROP_FPS)
+        self._nominal_interval = 1.0 / fps if fps and fps > 0 else None
+
+    def _reconnect(self):
+        """Ask `reopen()` for a new source until one opens; None once the hub is stopped."""
+        self.state = 'reconnecting'
+        delay = 0.5
+        while self._running:
+            print("Camera lost, reconnecting...")
+            try:
+                source = self.reopen()
+            except Exception as reopen_err:
+                print(f"Camera reconnect failed: {reopen_err}")
+                source = None
+            if source is not None and source.isOpened():
+                if not self._running:
+                    source.release()  # Stopped meanwhile; don't leave the camera on
+                    return None
+                self.reconnects += 1
+                self.state = 'streaming'
+                print("Camera reconnected.")
+                return source
+            self._stop_event.wait(delay)
+            delay = min(self.max_backoff, delay * 2)
+        return None
+
+    def _run(self):
+        source = self._source
+        if source is not None:
+            self._use_source(source)
+        shape = None
+        failures = 0
+        while self._running:
+            opened = source is not None and source.isOpened()
+            if self.reopen is not None and (not opened or failures >= self.max_failures):
+                source = self._reconnect()
+                if source is None:
+                    break
+                self._use_source(source)
+                shape = None
+                failures = 0
+                continue
+            if not opened:
+                break
+            if not source.grab():
+                failures += 1
+                self.read_failures += 1
+                delay = min(self.max_backoff, 0.05 * 2 ** failures)
+                print(f"Failed to grab frame ({failures} in a row). Retrying in {delay:.2f}s...")
+                self._stop_event.wait(delay)
+                continue
+            failures = 0
+            grabbed_at = time.time()
+            self._record_grab(grabbed_at)
+            if not self._waiting:
+                self.skipped += 1
+                continue
+            if shape is None:
+                success, frame = source.retrieve()
+            else:
+                success, frame = source.retrieve(self.buffers.take(shape))
+            if not success:
+                failures += 1
+                self.read_failures += 1
+                continue
+            shape = frame.shape
+            self.publish(frame, grabbed_at)
+        self._running = False
+        self.state = 'stopped'
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self):
+        latest = self.latest()
+        running = self._running
+        return {
+            'state': self.state,
+            'fps': round(1.0 / self._interval, 1) if running and self._interval else None,
+            'nominal_fps': round(1.0 / self._nominal_interval, 1) if self._nominal_interval else None,
+            'grabbed': self.grabbed,
+            'decoded': self._seq,
+            'skipped': self.skipped,
+            'dropped': self.dropped,
+            'read_failures': self.read_failures,
+            'reconnects': self.reconnects,
+            'frame_age': round(time.time() - latest.timestamp, 4) if running and latest is not None else None,
+            'consumed_age_mean': round(self._age, 4) if self._age is not None else None,
+            'consumed_age_max': round(max(self._age_max, self._age_max_last), 4),
+            'stale_frames': self.stale_frames,
+        }
@@ -0,0 +1,512 @@
+"""Append-only binary log of every game tick, for score audits and fast state rebuilds.
+
+Each game (one session between two resets) gets `<dir>/<session>_<start ms>.glog`:
+a padded header, then one fixed-size record per tick, readable with
+np.memmap like a landmark recording:
+
+    tick     uint32      tick number (records hold ticks 1, 2, ... in order)
+    apple    uint16      new apple cell when flags bit 1 is set
+    flags    uint8       bit 0 = game over, bit 1 = apple spawned this tick
+    dirs     uint8 x P   direction applied per player (0 Left, 1 Right, 2 Up, 3 Down)
+    scores   uint32 x P  score per player after the tick
+
+Replaying the directions with the logged apple cells reproduces the game
+exactly. The `<path>.keys` sidecar holds a full keyframe (every body cell)
+at tick 0, every `keyframe_interval` ticks and at game over, so any tick
+is rebuilt from the nearest keyframe instead of from tick zero.
+
+The tick loop only packs a few bytes onto a queue: `GameLogWriter` runs a
+background thread that buffers them in memory and appends them to the
+files about once per `flush_interval`. Files are only open while being
+appended to, so thousands of sessions don't hold thousands of file
+descriptors, and nothing is written until a game's first tick. The
+writer keeps at most `max_logs` logs in its directory, deleting the oldest.
+"""
+import glob
+import bisect
+import os
+import queue
+import re
+import struct
+import threading
+import time
+
+import numpy as np
+
+from snake_engine import MultiSnakeEngine, SnakeEngine
+
+MAGIC = b'SNKGLOG1'
+# magic, players, cols, rows, cell_size, keyframe_interval, started_at (unix seconds)
+HEADER = struct.Struct('<8sBHHHId')
+HEADER_SIZE = 32  # header padded so records start on an aligned offset
+# keyframe: tick, apple cell (NO_APPLE = none), flags; then per player
+KEYFRAME = struct.Struct('<IHB')
+# direction, alive, score, length n; then n uint16 body cells, head first
+KEY_PLAYER = struct.Struct('<BBIH')
+CELL = np.dtype('<u2')
+NO_APPLE = 0xFFFF
+MAX_CELLS = NO_APPLE  # Cell indices must fit a uint16 below the no-apple marker
+
+FLAG_GAME_OVER = 1
+FLAG_APPLE = 2
+
+_STOP = object()  # Queued by GameLogWriter.stop()
+
+
+def record_dtype(players):
+    return np.dtype([
+        ('tick', '<u4'),
+        ('apple', '<u2'),
+        ('flags', 'u1'),
+        ('directions', 'u1', (players,)),
+        ('scores', '<u4', (players,)),
+    ])
+
+
+def engine_snakes(engine):
+    """(body, direction, alive, score) per player of a SnakeEngine or MultiSnakeEngine."""
+    if isinstance(engine, MultiSnakeEngine):
+        return [(snake.body, snake.direction, snake.alive, snake.score) for snake in engine.snakes]
+    return [(engine.body, engine.direction, not engine.game_over, engine.score)]
+
+
+def apple_cell(engine, body):
+    return body.index(*engine.apple) if engine.apple is not None else NO_APPLE
+
+
+class GameLog:
+    """Write handle for one game's log; its methods are called from the tick thread.
+
+    `tick()` packs the record on the caller's thread and hands the bytes to
+    the writer; nothing here touches the file. The log closes itself at
+    game over.
+    """
+
+    def __init__(self, writer, path, players, engine):
+        self.writer = writer
+        self.path = path
+        self.players = players
+        self.keyframe_interval = writer.keyframe_interval
+        self.ticks = 0
+        self._record = struct.Struct(f'<IHB{players}B{players}I')
+        # Header and tick-0 keyframe, queued with the first tick so unplayed games leave no files
+        self._start = (self.header(engine), self.keyframe(engine))
+        self.created = False  # Set by the writer thread once the files exist
+        self.closed = False
+
+    def header(self, engine):
+        body = engine_snakes(engine)[0][0]
+        return HEADER.pack(MAGIC, self.players, body.cols, body.rows, body.cell_size,
+                           self.keyframe_interval, time.time()).ljust(HEADER_SIZE, b'\0')
+
+    def keyframe(self, engine):
+        """Pack a full keyframe of `engine` (every body cell of every snake)."""
+        snakes = engine_snakes(engine)
+        flags = FLAG_GAME_OVER if engine.game_over else 0
+        parts = [KEYFRAME.pack(engine.tick, apple_cell(engine, snakes[0][0]), flags)]
+        for body, direction, alive, score in snakes:
+            parts.append(KEY_PLAYER.pack(direction, alive, score, len(body)))
+            parts.append(np.fromiter(body.cells(), CELL, len(body)).tobytes())
+        return b''.join(parts)
+
+    def tick(self, engine, spawned):
+        """Log the tick `engine` just took; `spawned` = an apple was eaten and a new one placed."""
+        if self.closed:
+            return
+        if self._start is not None:
+            self.writer.submit(self, *self._start)
+            self._start = None
+        snakes = engine_snakes(engine)
+        # A full board leaves no cell for the next apple: nothing to log
+        spawned = spawned and engine.apple is not None
+        flags = (FLAG_GAME_OVER if engine.game_over else 0) | (FLAG_APPLE if spawned else 0)
+        record = self._record.pack(engine.tick, apple_cell(engine, snakes[0][0]) if spawned else NO_APPLE, flags,
+                                   *[snake[1] for snake in snakes], *[snake[3] for snake in snakes])
+        keyframe = None
+        if engine.tick % self.keyframe_interval == 0 or engine.game_over:
+            keyframe = self.keyframe(engine)
+        self.ticks += 1
+        self.writer.submit(self, record, keyframe)
+        if engine.game_over:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            if self._start is None:
+                self.writer.submit(self, None, None)
+
+
+class GameLogWriter:
+    """Background thread that buffers queued records and appends them to the game logs.
+
+    `open()` prepares a log for a fresh game; its files are created with the
+    first tick. Buffers are appended every `flush_interval` seconds, once
+    they reach `buffer_size`, on `sync()` and on `stop()`. Logs without a
+    tick for `idle_timeout` seconds are dropped until they tick again, and
+    only the newest `max_logs` logs are kept (0 = no limit).
+    """
+
+    def __init__(self, directory, keyframe_interval=256, flush_interval=1.0, buffer_size=64 * 1024,
+                 max_logs=500, idle_timeout=60.0):
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.max_logs = max_logs
+        self.idle_timeout = idle_timeout
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._buffers = {}  # GameLog -> [records, keyframes, last write time] (writer thread only)
+        self._last_stamp = 0
+        self.records = 0
+        self.keyframes = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.pruned = 0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def open(self, session_id, engine, players):
+        """Start the log of a new game of `session_id`; returns None if the board is too large."""
+        body = engine_snakes(engine)[0][0]
+        if body.cols * body.rows > MAX_CELLS:
+            print(f"Game log disabled for {session_id}: board too large for uint16 cells")
+            return None
+        name = re.sub(r'[^A-Za-z0-9_-]', '_', session_id)
+        with self._lock:
+            # Unique per process even for two resets within the same millisecond
+            self._last_stamp = max(int(time.time() * 1000), self._last_stamp + 1)
+            path = os.path.join(self.directory, f'{name}_{self._last_stamp}.glog')
+        return GameLog(self, path, players, engine)
+
+    def submit(self, log, record, keyframe):
+        self._queue.put((log, record, keyframe))
+        if not self.running:
+            self._start()
+
+    def sync(self, timeout=2.0):
+        """Block until everything queued so far is written and flushed."""
+        done = threading.Event()
+        self.submit(None, done, None)
+        return done.wait(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self.running:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='game-log-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Write and flush everything queued, then end the thread (it restarts on the next submit)."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put((None, _STOP, None))
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def _write(self, log, record, keyframe):
+        buffers = self._buffers.get(log)
+        if record is None:
+            # Close marker
+            if buffers is not None:
+                del self._buffers[log]
+                self._append(log, buffers)
+            return
+        header = not log.created and buffers is None
+        if buffers is None:
+            buffers = self._buffers[log] = [bytearray(), bytearray(), 0.0]
+        buffers[0] += record  # The header for a new log
+        buffers[2] = time.monotonic()
+        self.bytes_written += len(record)
+        self.records += not header
+        if keyframe is not None:
+            buffers[1] += keyframe
+            self.bytes_written += len(keyframe)
+            self.keyframes += 1
+        if len(buffers[0]) + len(buffers[1]) >= self.buffer_size:
+            self._append(log, buffers)
+
+    def _append(self, log, buffers):
+        records, keyframes = buffers[0], buffers[1]
+        if not records and not keyframes:
+            return
+        mode = 'ab' if log.created else 'wb'
+        with open(log.path, mode) as f:
+            f.write(records)
+        with open(log.path + '.keys', mode) as f:
+            f.write(keyframes)
+        records.clear()
+        keyframes.clear()
+        if not log.created:
+            log.created = True
+            self._prune()
+
+    def _prune(self):
+        """Delete the oldest logs beyond `max_logs`, never one still being written."""
+        if not self.max_logs:
+            return
+        paths = sorted(glob.glob(os.path.join(self.directory, '*.glog')), key=os.path.getmtime)
+        active = {log.path for log in self._buffers}
+        for path in paths[:max(0, len(paths) - self.max_logs)]:
+            if path in active:
+                continue
+            for name in (path, path + '.keys'):
+                try:
+                    os.remove(name)
+                except FileNotFoundError:
+                    pass
+            self.pruned += 1
+
+    def _flush(self):
+        now = time.monotonic()
+        for log, buffers in list(self._buffers.items()):
+            try:
+                self._append(log, buffers)
+            except OSError as write_err:
+                self._failed(log, write_err)
+                continue
+            if now - buffers[2] > self.idle_timeout:
+                del self._buffers[log]  # Recreated (appending) if the game ticks again
+        self.flushes += 1
+
+    def _failed(self, log, error):
+        self.errors += 1
+        log.closed = True
+        self._buffers.pop(log, None)
+        print(f"Game log write failed ({log.path}): {error}")
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                log, record, keyframe = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                log = record = None
+            if log is not None:
+                try:
+                    self._write(log, record, keyframe)
+                except OSError as write_err:
+                    self._failed(log, write_err)
+                if time.monotonic() < next_flush:
+                    continue
+            # Flush interval elapsed, sync() or stop()
+            self._flush()
+            next_flush = time.monotonic() + self.flush_interval
+            if record is _STOP:
+                return
+            if isinstance(record, threading.Event):
+                record.set()
+
+    def stats(self):
+        return {
+            'directory': self.directory,
+            'running': self.running,
+            'queued': self._queue.qsize(),
+            'records': self.records,
+            'keyframes': self.keyframes,
+            'bytes_written': self.bytes_written,
+            'flushes': self.flushes,
+            'errors': self.errors,
+            'open_logs': len(self._buffers),
+            'pruned': self.pruned,
+        }
+
+
+class GameLogReader:
+    """Memory-mapped view over a game log, with keyframe seeking."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"Not a game log: {path}")
+        magic, players, cols, rows, cell_size, keyframe_interval, started_at = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"Not a game log: {path}")
+        self.players = players
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.keyframe_interval = keyframe_interval
+        self.started_at = started_at
+        dtype = record_dtype(players)
+        # Ignore a trailing partial record from a log still being written
+        count = max(0, (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize)
+        if count > 0:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+        self._keys = np.fromfile(path + '.keys', dtype=np.uint8) if os.path.exists(path + '.keys') else b''
+        self._index_keyframes()
+
+    def _index_keyframes(self):
+        """Tick -> offset of every complete keyframe in the sidecar."""
+        self.keyframe_ticks = []
+        self._keyframe_offsets = []
+        data = memoryview(self._keys)
+        offset = 0
+        while offset + KEYFRAME.size <= len(data):
+            tick = KEYFRAME.unpack_from(data, offset)[0]
+            end = offset + KEYFRAME.size
+            for _ in range(self.players):
+                if end + KEY_PLAYER.size > len(data):
+                    return
+                end += KEY_PLAYER.size + 2 * KEY_PLAYER.unpack_from(data, end)[3]
+            if end > len(data):
+                return
+            self.keyframe_ticks.append(tick)
+            self._keyframe_offsets.append(offset)
+            offset = end
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def last_tick(self):
+        return int(self.records['tick'][-1]) if len(self.records) else 0
+
+    @property
+    def game_over(self):
+        return bool(len(self.records) and self.records['flags'][-1] & FLAG_GAME_OVER)
+
+    @property
+    def scores(self):
+        return self.records['scores'][-1].tolist() if len(self.records) else [0] * self.players
+
+    def keyframe(self, position):
+        """Engine restored from the keyframe at `position` in the index."""
+        data = self._keys
+        offset = self._keyframe_offsets[position]
+        tick, apple, flags = KEYFRAME.unpack_from(data, offset)
+        offset += KEYFRAME.size
+        snakes = []
+        for _ in range(self.players):
+            direction, alive, score, length = KEY_PLAYER.unpack_from(data, offset)
+            offset += KEY_PLAYER.size
+            cells = np.frombuffer(data, CELL, length, offset).tolist()
+            offset += 2 * length
+            snakes.append((cells, direction, bool(alive), score))
+        apple = None if apple == NO_APPLE else apple
+        game_over = bool(flags & FLAG_GAME_OVER)
+        if self.players == 1:
+            cells, direction, _, score = snakes[0]
+            return SnakeEngine.restore(self.cols, self.rows, self.cell_size, cells, direction, apple,
+                                       score=score, tick=tick, game_over=game_over)
+        return MultiSnakeEngine.restore(self.cols, self.rows, self.cell_size, snakes, apple,
+                                        tick=tick, game_over=game_over)
+
+    def replay(self, engine, tick):
+        """Step `engine` forward through the logged records up to `tick`."""
+        records = self.records[engine.tick:tick]
+        # Older logs flag a spawn with NO_APPLE when the board was full: no apple then
+        spawned = ((records['flags'] & FLAG_APPLE) != 0) & (records['apple'] != NO_APPLE)
+        apples = records['apple'].tolist()
+        if self.players == 1:
+            for direction, has_apple, apple in zip(records['directions'][:, 0].tolist(), spawned.tolist(), apples):
+                engine.step(direction, apple=apple if has_apple else None)
+        else:
+            for directions, has_apple, apple in zip(records['directions'].tolist(), spawned.tolist(), apples):
+                engine.step(directions, apple=apple if has_apple else None)
+        return engine
+
+    def engine_at(self, tick, use_keyframes=True):
+        """The game's engine as it was after `tick` (0 = start)."""
+        if not 0 <= tick <= len(self.records):
+            raise ValueError(f"Tick {tick} is outside the log (0-{len(self.records)})")
+        if not self.keyframe_ticks:
+            raise ValueError(f"Game log has no keyframe: {self.path}")
+        position = bisect.bisect_right(self.keyframe_ticks, tick) - 1 if use_keyframes else 0
+        return self.replay(self.keyframe(position), tick)
+
+    def snapshot_at(self, tick):
+        """Board state after `tick`, in the shape of the /game_state snapshot."""
+        engine = self.engine_at(tick)
+        snakes = engine_snakes(engine)
+        snapshot = {
+            'tick': engine.tick,
+            'snake': snakes[0][0].positions(),
+            'apple': engine.apple,
+            'score': engine.score,
+            'game_over': engine.game_over,
+            'button_direction': engine.direction,
+            'board': {'width': self.cols * self.cell_size, 'height': self.rows * self.cell_size,
+                      'cell_size': self.cell_size},
+        }
+        if self.players > 1:
+            snapshot['snakes'] = [{'snake': body.positions(), 'score': score, 'alive': alive, 'direction': direction}
+                                  for body, direction, alive, score in snakes]
+        return snapshot
+
+    def audit(self):
+        """Replay the whole game from tick 0, checking every logged score and keyframe.
+
+        `verified` is True when the replay reproduces each record's scores and
+        game-over flag, and each keyframe's bodies; otherwise `mismatch`
+        names the first tick that disagrees.
+        """
+        engine = self.keyframe(0)
+        keyframes = dict(zip(self.keyframe_ticks, range(len(self.keyframe_ticks))))
+        mismatch = None
+        for record in self.records:
+            tick = int(record['tick'])
+            if tick != engine.tick + 1:
+                mismatch = tick
+                break
+            self.replay(engine, tick)
+            snakes = engine_snakes(engine)
+            if ([snake[3] for snake in snakes] != record['scores'].tolist()
+                    or engine.game_over != bool(record['flags'] & FLAG_GAME_OVER)):
+                mismatch = tick
+                break
+            if tick in keyframes:
+                expected = engine_snakes(self.keyframe(keyframes[tick]))
+                if [list(snake[0].cells()) for snake in snakes] != [list(snake[0].cells()) for snake in expected]:
+                    mismatch = tick
+                    break
+        return {
+            'ticks': len(self.records),
+            'scores': self.scores,
+            'game_over': self.game_over,
+            'verified': mismatch is None,
+            'mismatch': mismatch,
+        }
+
+    def info(self):
+        return {
+            'path': self.path,
+            'players': self.players,
+            'board': {'cols': self.cols, 'rows': self.rows, 'cell_size': self.cell_size},
+            'started_at': self.started_at,
+            'ticks': len(self.records),
+            'keyframes': len(self.keyframe_ticks),
+            'scores': self.scores,
+            'game_over': self.game_over,
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Inspect, seek and audit a game log")
+    parser.add_argument('log', help="path to a .glog file")
+    parser.add_argument('--tick', type=int, help="print the board state after this tick")
+    parser.add_argument('--audit', action='store_true', help="replay from tick 0 and verify scores")
+    args = parser.parse_args()
+    reader = GameLogReader(args.log)
+    output = reader.info()
+    if args.tick is not None:
+        output['state'] = reader.snapshot_at(args.tick)
+    if args.audit:
+        output['audit'] = reader.audit()
+    print(json.dumps(output, indent=2))
@@ -0,0 +1,173 @@
+"""Board geometry, snake body storage and apple placement for the game loop."""
+import random
+from collections import deque
+
+
+# 0: Left, 1: Right, 2: Up, 3: Down -> (dx, dy) in cells
+DIRECTION_STEPS = {0: (-1, 0), 1: (1, 0), 2: (0, -1), 3: (0, 1)}
+
+
+def initial_snake(cols, rows, cell_size):
+    """Three-cell snake in the middle of the board, heading right ([x, y] pixels)."""
+    x = cols // 2 * cell_size
+    y = rows // 2 * cell_size
+    return [[x, y], [x - cell_size, y], [x - 2 * cell_size, y]]
+
+
+def starting_snakes(players, cols, rows, cell_size):
+    """One three-cell snake per player on evenly spaced rows, all heading right.
+
+    A single player gets the same snake as `initial_snake`.
+    """
+    if players == 1:
+        return [initial_snake(cols, rows, cell_size)]
+    if players > rows or cols < 3:
+        raise ValueError(f"A {cols}x{rows} board has no room for {players} snakes")
+    x = cols // 2 * cell_size
+    return [[[x - k * cell_size, rows * (player + 1) // (players + 1) * cell_size] for k in range(3)]
+            for player in range(players)]
+
+
+class FreeCells:
+    """Indexed set of free board cells with O(1) add, remove and uniform sampling.
+
+    `_cells` holds the free indices densely; `_where[i]` is the slot of cell
+    `i` in `_cells` (or -1). Removal swaps the last entry into the hole.
+    """
+
+    def __init__(self, size):
+        self._cells = list(range(size))
+        self._where = list(range(size))
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, index):
+        return self._where[index] >= 0
+
+    def add(self, index):
+        if self._where[index] < 0:
+            self._where[index] = len(self._cells)
+            self._cells.append(index)
+
+    def discard(self, index):
+        slot = self._where[index]
+        if slot < 0:
+            return
+        last = self._cells.pop()
+        if last != index:
+            self._cells[slot] = last
+            self._where[last] = slot
+        self._where[index] = -1
+
+    def sample(self, rng):
+        """Uniformly random free cell, or None when the board is full."""
+        if not self._cells:
+            return None
+        return self._cells[rng.randrange(len(self._cells))]
+
+
+class AppleSpawner:
+    """Places apples uniformly on cells the snake doesn't occupy.
+
+    Pass the spawner's `free_cells` to SnakeBody so the set is updated
+    incrementally as the snake moves. `seed` makes placement reproducible.
+    """
+
+    def __init__(self, cols, rows, seed=None):
+        self.cols = cols
+        self.rows = rows
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.free_cells = FreeCells(cols * rows)
+
+    def spawn(self):
+        """Return a free cell index for the next apple, or None if the board is full."""
+        return self.free_cells.sample(self.rng)
+
+
+class SnakeBody:
+    """Snake stored as a deque of packed cell indices plus an occupancy bitmap.
+
+    Cells are packed as `row * cols + col`, head first. Advancing, growing,
+    popping the tail and the self-collision check are all O(1); only
+    `positions()` (used for the JSON output) walks the body.
+    """
+
+    def __init__(self, positions, cols, rows, cell_size, free_cells=None, occupied=None):
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.free_cells = free_cells
+        self._cells = deque()
+        # Several snakes on one board share this count map (and free_cells)
+        self._occupied = occupied if occupied is not None else bytearray(cols * rows)
+        self.collided = False
+        for x, y in positions:
+            index = self.index(x, y)
+            self._cells.append(index)
+            self._occupy(index)
+
+    def _occupy(self, index):
+        self._occupied[index] += 1
+        if self.free_cells is not None:
+            self.free_cells.discard(index)
+
+    def _vacate(self, index):
+        self._occupied[index] -= 1
+        if self.free_cells is not None and not self._occupied[index]:
+            self.free_cells.add(index)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def index(self, x, y):
+        """Pack pixel coordinates into a cell index."""
+        return (y // self.cell_size) * self.cols + (x // self.cell_size)
+
+    def position(self, index):
+        """Unpack a cell index into [x, y] pixel coordinates."""
+        row, col = divmod(index, self.cols)
+        return [col * self.cell_size, row * self.cell_size]
+
+    @property
+    def head(self):
+        return self._cells[0]
+
+    @property
+    def tail(self):
+        return self._cells[-1]
+
+    def occupied(self, index):
+        return self._occupied[index] > 0
+
+    def advance(self, head_index, grow=False):
+        """Move the head to `head_index`, popping the tail unless growing.
+
+        The tail is vacated before the collision check, so following your own
+        tail is legal (matching the original list-based rules). Sets
+        `collided` when the new head lands on the body and returns the popped
+        tail index (None when growing).
+        """
+        popped = None
+        if not grow:
+            popped = self._cells.pop()
+            self._vacate(popped)
+        self.collided = self._occupied[head_index] > 0
+        self._cells.appendleft(head_index)
+        self._occupy(head_index)
+        return popped
+
+    def release(self):
+        """Take the whole body off the board (a dead snake in a multi-snake game)."""
+        while self._cells:
+            self._vacate(self._cells.pop())
+
+    def cells(self):
+        """Iterator over the packed cell indices, head first (the binary /game_state format)."""
+        return iter(self._cells)
+
+    def positions(self):
+        """Body as a list of [x, y] pairs, head first (the /game_state format)."""
+        cols, cell_size = self.cols, self.cell_size
+        return [[(i % cols) * cell_size, (i // cols) * cell_size] for i in self._cells]
@@ -0,0 +1,370 @@
+"""Per-session game state, a session registry and the shared tick scheduler."""
+import math
+import threading
+import time
+import uuid
+
+from game_logic import DIRECTION_STEPS
+from snake_engine import MultiSnakeEngine, SnakeEngine
+from state_codec import pack_state
+from state_stream import StateBroadcaster
+from tick_clock import TickClock
+
+
+class GameSession:
+    """One independent snake game: a SnakeEngine plus its own SSE stream.
+
+    With `players > 1` the session runs a MultiSnakeEngine instead. Snapshots
+    and deltas then also carry a per-player `snakes` list. The top-level
+    fields keep describing player 0, so single-snake clients still work.
+
+    Every mutation happens under `lock`, so `/reset` or input routes can run
+    while the scheduler thread is stepping the session. Deltas and reset
+    snapshots are published before the lock is released, so the stream's
+    order always matches the order of the changes. `state_tag()` changes
+    whenever the snapshot would: the tick moves on every step, and
+    `revision` counts resets and direction changes in between.
+
+    With a `GameLogWriter` as `logs`, each game (reset to game over) is
+    appended tick by tick to its own log (see game_log.py).
+    """
+
+    def __init__(self, session_id, cols, rows, cell_size, seed=None, on_deliver=None, players=1, logs=None):
+        self.id = session_id
+        self.players = players
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.lock = threading.Lock()
+        self.broadcaster = StateBroadcaster(self._stream_snapshot, on_deliver=on_deliver, lock=self.lock)
+        self.clock = TickClock(0.03)
+        self.created_at = time.time()
+        self.active = False  # Whether the scheduler advances this session
+        self.tick_interval = None  # None -> use the global calibration setting
+        self.epoch = uuid.uuid4().hex[:8]  # Tags never repeat across recreated sessions or restarts
+        self.revision = 0
+        self.games = 0  # Bumped per reset; stream messages carry it as `game`
+        self.gestures = ["None"] * players  # Last gesture label per player
+        self.logs = logs
+        self.log = None  # GameLog of the current game
+        self.reset(seed)
+
+    @property
+    def board(self):
+        return {'width': self.cols * self.cell_size, 'height': self.rows * self.cell_size,
+                'cell_size': self.cell_size}
+
+    @property
+    def score(self):
+        return self.engine.score
+
+    @property
+    def game_over(self):
+        return self.engine.game_over
+
+    @property
+    def tick(self):
+        return self.engine.tick
+
+    @property
+    def button_direction(self):
+        return self.engine.direction
+
+    @property
+    def current_direction(self):
+        return self.gestures[0]
+
+    @current_direction.setter
+    def current_direction(self, name):
+        self.set_gesture(0, name)
+
+    def set_gesture(self, player, name):
+        """Record the gesture label shown for `player` (camera input)."""
+        if name != self.gestures[player]:
+            self.gestures[player] = name
+            self.revision += 1
+
+    def state_tag(self):
+        """ETag of the current snapshot, without building it."""
+        return f'{self.epoch}.{self.engine.tick}.{self.revision}'
+
+    def reset(self, seed=None, players=None):
+        """Start a fresh game (optionally with a new player count) and push a snapshot."""
+        with self.lock:
+            players = players or self.players
+            if players == 1:
+                self.engine = SnakeEngine(self.cols, self.rows, self.cell_size, seed=seed)
+            else:
+                self.engine = MultiSnakeEngine(players, self.cols, self.rows, self.cell_size, seed=seed)
+            self.players = players
+            if self.logs is not None:
+                if self.log is not None:
+                    self.log.close()
+                self.log = self.logs.open(self.id, self.engine, players)
+            self.revision += 1  # The tick starts over at 0
+            self.gestures = ["None"] * players
+            self.last_gesture_time = 0
+            self.clock.reset()
+            self.games += 1
+            self.broadcaster.publish('snapshot', self._stream_snapshot())
+
+    def set_direction(self, direction, player=0):
+        """Steer a player's snake (keyboard, replayed or camera gestures)."""
+        if direction not in DIRECTION_STEPS:
+            raise ValueError(f"Invalid direction: {direction}")
+        with self.lock:
+            if not 0 <= player < self.players:
+                raise ValueError(f"Invalid player: {player}")
+            snake = self.engine.snakes[player] if self.players > 1 else self.engine
+            if direction != snake.direction:
+                snake.direction = direction
+                self.revision += 1
+
+    def _multi_step(self, engine):
+        was_alive = [snake.alive for snake in engine.snakes]
+        eaten = engine.step()
+        if self.log is not None:
+            self.log.tick(engine, any(eaten))
+        snakes = []
+        for player, snake in enumerate(engine.snakes):
+            if snake.alive:
+                snakes.append({'head': list(snake.head), 'pop': 0 if eaten[player] else 1,
+                               'direction': snake.direction, 'gesture': self.gestures[player]})
+            else:
+                # Died this tick: clients drop its body; None once it is gone
+                snakes.append({'alive': False} if was_alive[player] else None)
+        delta = {'tick': engine.tick, 'snakes': snakes}
+        if snakes[0] is not None and 'head' in snakes[0]:
+            delta['head'], delta['pop'] = snakes[0]['head'], snakes[0]['pop']
+        if any(eaten):
+            delta['apple'] = engine.apple
+            delta['score'] = engine.score
+            delta['scores'] = [snake.score for snake in engine.snakes]
+        return delta
+
+    def step(self):
+        """Advance one tick and publish the delta; returns False once the game is over."""
+        with self.lock:
+            engine = self.engine
+            if engine.game_over:
+                return False
+            if self.players > 1:
+                delta = self._multi_step(engine)
+            else:
+                ate_apple = engine.step()
+                if self.log is not None:
+                    self.log.tick(engine, ate_apple)
+                delta = {'tick': engine.tick, 'head': list(engine.head), 'pop': 0 if ate_apple else 1}
+                if ate_apple:
+                    delta['apple'] = engine.apple
+                    delta['score'] = engine.score
+            delta.update(game_over=engine.game_over, current_direction=self.current_direction,
+                         button_direction=engine.direction, game=self.games)
+            self.broadcaster.publish('delta', delta)
+        return True
+
+    def snapshot(self):
+        """Full game state as served by /game_state and the stream's snapshot event."""
+        with self.lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        """`snapshot()` for callers already holding the lock."""
+        engine = self.engine
+        snapshot = {
+            'tick': engine.tick,
+            'snake': engine.body.positions() if self.players == 1 else engine.snakes[0].body.positions(),
+            'apple': engine.apple,
+            'score': engine.score,
+            'game_over': engine.game_over,
+            'current_direction': self.current_direction,
+            'button_direction': engine.direction,
+            'board': self.board
+        }
+        if self.players > 1:
+            snapshot['snakes'] = [{'snake': snake.body.positions(), 'score': snake.score, 'alive': snake.alive,
+                                   'direction': snake.direction, 'gesture': self.gestures[player]}
+                                  for player, snake in enumerate(engine.snakes)]
+        return snapshot
+
+    def _stream_snapshot(self):
+        """Snapshot for the SSE stream, tagged with the game it belongs to (caller holds the lock)."""
+        snapshot = self._snapshot()
+        snapshot['game'] = self.games
+        return snapshot
+
+    def packed(self):
+        """The snapshot in the binary format of `state_codec`."""
+        with self.lock:
+            if self.players > 1:
+                raise ValueError("The binary format covers single-snake sessions only")
+            engine = self.engine
+            body = engine.body
+            return pack_state(engine.tick, body.cells(), len(body),
+                              body.index(*engine.apple) if engine.apple is not None else None,
+                              engine.score, engine.game_over, engine.direction, self.current_direction,
+                              self.cols, self.rows, self.cell_size)
+
+    def close(self):
+        """Finish the current game log (the session is being removed)."""
+        with self.lock:
+            if self.log is not None:
+                self.log.close()
+                self.log = None
+
+    def info(self):
+        return {
+            'id': self.id,
+            'active': self.active,
+            'game_over': self.game_over,
+            'score': self.score,
+            'tick': self.tick,
+            'players': self.players,
+            'clients': self.broadcaster.subscribers,
+            'created_at': self.created_at,
+        }
+
+
+class SessionRegistry:
+    """Thread-safe map of session ID -> GameSession with a size cap."""
+
+    def __init__(self, factory, max_sessions=1000):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, session_id=None, **kwargs):
+        """Create and register a session; raises ValueError when full or the ID is taken."""
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise ValueError(f"Session limit reached ({self.max_sessions})")
+            session_id = session_id or uuid.uuid4().hex[:12]
+            if session_id in self._sessions:
+                raise ValueError(f"Session already exists: {session_id}")
+            session = self.factory(session_id, **kwargs)
+            self._sessions[session_id] = session
+            return session
+
+    def get(self, session_id):
+        return self._sessions.get(session_id)
+
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def sessions(self):
+        """Snapshot list, safe to iterate while sessions are added or removed."""
+        with self._lock:
+            return list(self._sessions.values())
+
+
+class SessionScheduler:
+    """Single thread that advances every active session on its own fixed-rate clock.
+
+    `interval_for(session)` returns the session's tick interval and the
+    optional `before_step(session)` hook runs right before each step (used to
+    apply camera gestures to the camera-bound session); `after_step(session)`
+    runs right after it. An exception from one session's step or hooks is
+    logged and counted; the other sessions keep running.
+    """
+
+    def __init__(self, registry, interval_for, before_step=None, after_step=None, idle_wait=0.05):
+        self.registry = registry
+        self.interval_for = interval_for
+        self.before_step = before_step
+        self.after_step = after_step
+        self.idle_wait = idle_wait
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = False
+        self.steps = 0
+        self.step_errors = 0
+        # Welford running mean/variance of a single session step (seconds)
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='session-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def wake(self):
+        """Re-plan immediately (a session was activated or its interval changed)."""
+        self._wake.set()
+
+    def _record_step(self, duration):
+        self.steps += 1
+        self._count += 1
+        delta = duration - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (duration - self._mean)
+
+    def _run(self):
+        while self._running:
+            # Cleared before planning, so a wake() arriving during this pass isn't lost
+            self._wake.clear()
+            now = time.perf_counter()
+            next_due = now + self.idle_wait
+            for session in self.registry.sessions():
+                if not session.active or session.game_over:
+                    session.clock.reset()
+                    continue
+                interval = self.interval_for(session)
+                due = session.clock.due(now, interval)
+                if due <= now:
+                    self._step(session)
+                    session.clock.tick(now)
+                    due = session.clock.due(now)
+                next_due = min(next_due, due)
+            delay = next_due - time.perf_counter()
+            if delay > 0:
+                self._wake.wait(delay)
+
+    def _step(self, session):
+        started = time.perf_counter()
+        try:
+            if self.before_step is not None:
+                self.before_step(session)
+            session.step()
+            self._record_step(time.perf_counter() - started)
+            if self.after_step is not None:
+                self.after_step(session)
+        except Exception as step_err:
+            self.step_errors += 1
+            print(f"Session {session.id} step failed: {step_err!r}")
+
+    def stats(self):
+        sessions = self.registry.sessions()
+        active = [s for s in sessions if s.active and not s.game_over]
+        step_std = math.sqrt(self._m2 / self._count) if self._count > 1 else 0.0
+        intervals = [self.interval_for(s) for s in active] or [0.0]
+        # How many sessions one core could step at the shortest active interval
+        capacity = int(min(intervals) / self._mean) if self._mean > 0 and active else None
+        return {
+            'sessions': len(sessions),
+            'active_sessions': len(active),
+            'steps': self.steps,
+            'step_errors': self.step_errors,
+            'mean_step_time': round(self._mean, 9),
+            'step_time_std': round(step_std, 9),
+            'sessions_per_core_estimate': capacity,
+        }
@@ -0,0 +1,124 @@
+"""Vectorized hand-landmark features and direction classification.
+
+Landmarks are handled as NumPy arrays: (21, 3) for one hand or (T, 21, 3)
+for a buffered sequence, so fingertip distances, extension masks and
+centroids come out of a single vectorized pass. `classify_hand` drives the
+live game; `classify_sequence` applies the same rules to a whole recording
+and returns identical decisions frame by frame.
+"""
+import numpy as np
+
+WRIST = 0
+FINGERTIPS = np.array([4, 8, 12, 16, 20])  # thumb, index, middle, ring, pinky
+INDEX = 1  # position of the index finger within FINGERTIPS
+
+# Direction codes used by the game (-1 = no clear gesture)
+DIRECTION_NAMES = {-1: "None", 0: "Left", 1: "Right", 2: "Up", 3: "Down"}
+
+
+def landmarks_to_array(landmarks, out=None):
+    """Copy MediaPipe landmarks (objects with .x/.y/.z) into a (21, 3) float64 array."""
+    if out is None:
+        out = np.empty((len(landmarks), 3), dtype=np.float64)
+    for i, landmark in enumerate(landmarks):
+        out[i, 0] = landmark.x
+        out[i, 1] = landmark.y
+        out[i, 2] = landmark.z
+    return out
+
+
+def hand_features(points, finger_threshold):
+    """Per-frame features for (..., 21, 3) landmarks.
+
+    Returns (extended, vector, index_xy): the (..., 5) finger-extension mask,
+    the (..., 2) wrist-to-extended-fingertip-centroid vector, and the (..., 2)
+    index fingertip position.
+    """
+    wrist = points[..., WRIST, :2]
+    tips = points[..., FINGERTIPS, :2]
+    offsets = tips - wrist[..., None, :]
+    distances = np.sqrt((offsets ** 2).sum(axis=-1))
+    extended = distances > finger_threshold
+    count = extended.sum(axis=-1)
+    centroid = (tips * extended[..., None]).sum(axis=-2) / np.maximum(count, 1)[..., None]
+    vector = centroid - wrist
+    return extended, vector, tips[..., INDEX, :]
+
+
+def vector_direction(dx, dy, threshold):
+    """Map movement vectors to direction codes along the dominant axis (vectorized)."""
+    dx = np.asarray(dx)
+    dy = np.asarray(dy)
+    horizontal = np.abs(dx) > np.abs(dy)
+    return np.select(
+        [horizontal & (dx > threshold), horizontal & (dx < -threshold),
+         ~horizontal & (dy > threshold), ~horizontal & (dy < -threshold)],
+        [1, 0, 3, 2],
+        -1
+    )
+
+
+def scalar_direction(dx, dy, threshold):
+    """Same mapping as vector_direction for one vector, without NumPy call overhead."""
+    if abs(dx) > abs(dy):
+        if dx > threshold:
+            return 1
+        if dx < -threshold:
+            return 0
+    else:
+        if dy > threshold:
+            return 3
+        if dy < -threshold:
+            return 2
+    return -1
+
+
+def gesture_modes(extended):
+    """Boolean masks for multi-finger (3+ extended) and index-only frames."""
+    multi = extended.sum(axis=-1) >= 3
+    others = np.delete(extended, INDEX, axis=-1).any(axis=-1)
+    single = ~multi & extended[..., INDEX] & ~others
+    return multi, single
+
+
+def classify_hand(points, prev_index, finger_threshold, gesture_threshold):
+    """Classify one (21, 3) hand; returns (direction, prev_index) for the next frame.
+
+    Multiple extended fingers steer by the wrist-to-fingertip-centroid
+    vector. A lone index finger steers by its movement since `prev_index`,
+    which is only updated on index-only frames that produced no direction.
+    """
+    extended, vector, index_xy = hand_features(points, finger_threshold)
+    # One hand: finish on Python scalars, which is cheaper than more tiny array ops
+    extended = extended.tolist()
+    if sum(extended) >= 3:
+        return scalar_direction(float(vector[0]), float(vector[1]), gesture_threshold), prev_index
+    if extended[INDEX] and sum(extended) == 1:
+        index_x, index_y = float(index_xy[0]), float(index_xy[1])
+        if prev_index is not None:
+            direction = scalar_direction(index_x - prev_index[0], index_y - prev_index[1], gesture_threshold)
+            if direction != -1:
+                return direction, prev_index
+        return -1, (index_x, index_y)
+    return -1, prev_index
+
+
+def classify_sequence(points, finger_threshold, gesture_threshold, prev_index=None):
+    """Offline batch classifier over (T, 21, 3) landmarks; same decisions as classify_hand.
+
+    Features and the multi-finger directions are computed for all frames at
+    once; only the index-only frames need a short scan because each depends
+    on the previous index position.
+    """
+    extended, vector, index_xy = hand_features(points, finger_threshold)
+    multi, single = gesture_modes(extended)
+    directions = np.where(multi, vector_direction(vector[:, 0], vector[:, 1], gesture_threshold), -1)
+    for t in np.flatnonzero(single).tolist():
+        index_x, index_y = index_xy[t].tolist()
+        if prev_index is not None:
+            direction = scalar_direction(index_x - prev_index[0], index_y - prev_index[1], gesture_threshold)
+            if direction != -1:
+                directions[t] = direction
+                continue
+        prev_index = (index_x, index_y)
+    return directions, prev_index
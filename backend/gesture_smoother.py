@@ -0,0 +1,268 @@
+"""Streaming gesture filter: time-based EMA with hysteresis over recent frames.
+
+The per-frame classifier plus a fixed cooldown applies the first frame of
+any gesture (noise included) and then ignores everything for the cooldown
+period. `GestureSmoother` instead keeps an exponential moving average of the
+per-frame decisions (four directions plus "none") and emits a direction
+change as soon as its share reaches `confidence`. A direction has to fade
+below half that share before it can be emitted again. The EMA weight comes
+from the time between frames, so dropped frames don't change how fast it
+reacts. Index-finger pointing is measured as the fingertip's displacement
+over the last `index_window` seconds of a short ring buffer, not against
+whichever frame happened to be processed before.
+"""
+import math
+from collections import deque
+
+from gesture_features import hand_features, scalar_direction, INDEX
+
+NONE = 4  # Index of the "no gesture" bin in the EMA
+
+
+class GestureSmoother:
+    """Feed `update(timestamp, points)` once per processed frame (points=None: no hand)."""
+
+    def __init__(self, finger_threshold, gesture_threshold, tau=0.08, confidence=0.6,
+                 index_window=0.15, buffer_size=16):
+        self.finger_threshold = finger_threshold
+        self.gesture_threshold = gesture_threshold
+        self.tau = tau
+        self.confidence = confidence
+        self.index_window = index_window
+        self._index = deque(maxlen=buffer_size)  # Ring buffer of (t, index_x, index_y)
+        self.reset()
+
+    def configure(self, finger_threshold=None, gesture_threshold=None, tau=None, confidence=None,
+                  index_window=None):
+        if finger_threshold is not None:
+            self.finger_threshold = finger_threshold
+        if gesture_threshold is not None:
+            self.gesture_threshold = gesture_threshold
+        if tau is not None:
+            self.tau = tau
+        if confidence is not None:
+            self.confidence = confidence
+        if index_window is not None:
+            self.index_window = index_window
+
+    def reset(self):
+        self.probabilities = [0.0, 0.0, 0.0, 0.0, 1.0]
+        self.stable = -1
+        self.raw = -1
+        self._last_time = None
+        self._index.clear()
+
+    @property
+    def score(self):
+        """Confidence of the current stable direction (or of "no gesture")."""
+        return self.probabilities[self.stable if self.stable != -1 else NONE]
+
+    def _index_direction(self, timestamp, index_x, index_y):
+        samples = self._index
+        while samples and timestamp - samples[0][0] > 2 * self.index_window:
+            samples.popleft()
+        anchor = None
+        for sample in samples:
+            if timestamp - sample[0] >= self.index_window:
+                anchor = sample  # Newest sample at least one window old
+            else:
+                break
+        if anchor is None and samples:
+            anchor = samples[0]
+        samples.append((timestamp, index_x, index_y))
+        if anchor is None:
+            return -1
+        return scalar_direction(index_x - anchor[1], index_y - anchor[2], self.gesture_threshold)
+
+    def classify(self, timestamp, points):
+        """Per-frame decision, before smoothing."""
+        if points is None:
+            self._index.clear()
+            return -1
+        extended, vector, index_xy = hand_features(points, self.finger_threshold)
+        extended = extended.tolist()
+        count = sum(extended)
+        if count >= 3:
+            self._index.clear()
+            return scalar_direction(float(vector[0]), float(vector[1]), self.gesture_threshold)
+        if extended[INDEX] and count == 1:
+            return self._index_direction(timestamp, float(index_xy[0]), float(index_xy[1]))
+        self._index.clear()
+        return -1
+
+    def update(self, timestamp, points):
+        """Add one frame; returns the newly stable direction, or -1 if nothing changed."""
+        raw = self.raw = self.classify(timestamp, points)
+        dt = timestamp - self._last_time if self._last_time is not None else self.tau
+        self._last_time = timestamp
+        alpha = 1.0 - math.exp(-max(dt, 0.0) / self.tau) if self.tau > 0 else 1.0
+        probabilities = self.probabilities
+        for i in range(5):
+            probabilities[i] *= 1.0 - alpha
+        probabilities[raw if raw != -1 else NONE] += alpha
+
+        if self.stable != -1 and probabilities[self.stable] < self.confidence / 2:
+            self.stable = -1  # Released: the same direction may be emitted again
+        best = max(range(4), key=probabilities.__getitem__)
+        if best != self.stable and probabilities[best] >= self.confidence:
+            self.stable = best
+            return best
+        return -1
+
+
+def cooldown_decisions(frames, settings):
+    """Original behaviour: apply any per-frame direction once the cooldown has passed."""
+    from gesture_features import classify_hand
+
+    prev_index = None
+    last_change = 0.0
+    current = 1
+    changes = []
+    for timestamp, points in frames:
+        if points is None:
+            continue
+        direction, prev_index = classify_hand(points, prev_index, settings['finger_threshold'],
+                                              settings['gesture_threshold'])
+        if timestamp - last_change > settings['gesture_cooldown'] and direction not in (-1, current):
+            current = direction
+            last_change = timestamp
+            changes.append((timestamp, direction))
+    return changes
+
+
+def smoothed_decisions(frames, settings):
+    smoother = GestureSmoother(settings['finger_threshold'], settings['gesture_threshold'],
+                               tau=settings['smoothing_tau'], confidence=settings['smoothing_confidence'],
+                               index_window=settings['index_window'])
+    current = 1
+    changes = []
+    for timestamp, points in frames:
+        direction = smoother.update(timestamp, points)
+        if direction not in (-1, current):
+            current = direction
+            changes.append((timestamp, direction))
+    return changes
+
+
+def score_changes(changes, truth, grace=0.1):
+    """Latency and false turns of direction changes against labelled segments.
+
+    `truth` is a list of (start_time, direction). A change is correct if it
+    matches the direction of the segment it falls in (or, within `grace`
+    seconds of a boundary, the previous one). Latency is measured from a
+    segment's start to its first correct change.
+    """
+    latencies = []
+    false_turns = 0
+    for t, direction in changes:
+        segment = max((i for i, (start, _) in enumerate(truth) if start <= t), default=None)
+        if segment is None:
+            false_turns += 1
+            continue
+        allowed = {truth[segment][1]}
+        if segment and t - truth[segment][0] < grace:
+            allowed.add(truth[segment - 1][1])
+        if direction not in allowed:
+            false_turns += 1
+    for i, (start, direction) in enumerate(truth):
+        end = truth[i + 1][0] if i + 1 < len(truth) else float('inf')
+        hits = [t for t, d in changes if start <= t < end and d == direction]
+        if hits and (not i or truth[i - 1][1] != direction):
+            latencies.append(hits[0] - start)
+    missed = sum(1 for i, (_, d) in enumerate(truth) if (not i or truth[i - 1][1] != d)) - len(latencies)
+    latencies.sort()
+    return {
+        'changes': len(changes),
+        'false_turns': false_turns,
+        'missed': missed,
+        'mean_latency': round(sum(latencies) / len(latencies), 4) if latencies else None,
+        'median_latency': round(latencies[len(latencies) // 2], 4) if latencies else None,
+        'p95_latency': round(latencies[int(len(latencies) * 0.95)], 4) if latencies else None,
+    }
+
+
+def synthetic_session(seed=0, segments=60, fps=30.0, drop_rate=0.1, spurious_rate=0.05, no_hand_rate=0.05,
+                      noise=0.02):
+    """Labelled hand stream: (frames, truth) with noisy open-hand poses pointing each way.
+
+    Frames are randomly dropped (time gaps), replaced by a spurious pose
+    pointing elsewhere, or have no hand at all.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    vectors = {0: (-0.25, 0.0), 1: (0.25, 0.0), 2: (0.0, -0.25), 3: (0.0, 0.25)}
+
+    def pose(direction):
+        dx, dy = vectors[direction]
+        points = np.full((21, 3), [0.5, 0.5, 0.0])
+        for finger, tip in enumerate((4, 8, 12, 16, 20)):
+            spread = (finger - 2) * 0.03
+            points[tip, :2] = 0.5 + dx - spread * dy, 0.5 + dy + spread * dx
+        points[:, :2] += rng.normal(0, noise, (21, 2))
+        return points
+
+    frames = []
+    truth = []
+    t = 0.0
+    direction = 1
+    for _ in range(segments):
+        direction = int(rng.choice([d for d in range(4) if d != direction]))
+        truth.append((t, direction))
+        end = t + rng.uniform(0.6, 1.5)
+        while t < end:
+            t += 1.0 / fps * rng.uniform(0.9, 1.1)
+            roll = rng.random()
+            if roll < drop_rate:
+                continue
+            if roll < drop_rate + no_hand_rate:
+                frames.append((t, None))
+            elif roll < drop_rate + no_hand_rate + spurious_rate:
+                frames.append((t, pose(int(rng.integers(4)))))
+            else:
+                frames.append((t, pose(direction)))
+    return frames, truth
+
+
+DEFAULT_SETTINGS = {
+    'finger_threshold': 0.08,
+    'gesture_threshold': 0.1,
+    'gesture_cooldown': 0.3,
+    'smoothing_tau': 0.08,
+    'smoothing_confidence': 0.6,
+    'index_window': 0.15,
+}
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Fixed cooldown vs streaming smoother on gesture streams")
+    parser.add_argument('recording', nargs='?', help="landmark recording; omit for a labelled synthetic session")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.recording:
+        from recording import LandmarkRecording
+
+        recording = LandmarkRecording(args.recording)
+        frames = [(float(t), recording.landmarks[i, 0].astype(float) if recording.hand_counts[i] else None)
+                  for i, t in enumerate(recording.timestamps)]
+
+        def reversals(changes):
+            # Proxy for false turns without labels: a turn undone within 0.5 s
+            opposite = {0: 1, 1: 0, 2: 3, 3: 2}
+            return sum(1 for (t0, d0), (t1, d1) in zip(changes, changes[1:])
+                       if t1 - t0 < 0.5 and opposite[d0] == d1)
+
+        report = {}
+        for name, decide in (('cooldown', cooldown_decisions), ('smoothed', smoothed_decisions)):
+            changes = decide(frames, DEFAULT_SETTINGS)
+            report[name] = {'changes': len(changes), 'quick_reversals': reversals(changes)}
+    else:
+        frames, truth = synthetic_session(args.seed)
+        report = {name: score_changes(decide(frames, DEFAULT_SETTINGS), truth)
+                  for name, decide in (('cooldown', cooldown_decisions), ('smoothed', smoothed_decisions))}
+        report['segments'] = len(truth)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,85 @@
+"""Hand inference stage running on its own thread, decoupled from the game tick."""
+import threading
+import time
+from collections import namedtuple
+
+# Latest classification: direction (-1 when no clear gesture), the hub frame
+# it came from and when that frame was captured/processed.
+GestureResult = namedtuple('GestureResult', ['seq', 'direction', 'frame_seq', 'captured_at', 'processed_at'])
+
+
+class HandTracker:
+    """Runs `infer(packet)` on the newest hub FramePacket and publishes the result.
+
+    Frames that arrive while inference is busy are skipped, never queued, so
+    results always describe the most recent camera image. The game loop picks
+    up results with `poll()` and never blocks on vision.
+    """
+
+    def __init__(self, hub, infer):
+        self.hub = hub
+        self.infer = infer
+        self._lock = threading.Lock()
+        self._result = None
+        self._seq = 0
+        self._thread = None
+        self._running = False
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.last_inference_time = 0.0
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='hand-tracker', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def poll(self, after_seq):
+        """Return the newest result if it is newer than `after_seq`, else None."""
+        with self._lock:
+            if self._result is not None and self._result.seq > after_seq:
+                return self._result
+            return None
+
+    def stats(self):
+        return {
+            'running': self._running,
+            'frames_processed': self.frames_processed,
+            'frames_skipped': self.frames_skipped,
+            'last_inference_time': round(self.last_inference_time, 6),
+        }
+
+    def _run(self):
+        last_frame_seq = 0
+        while self._running:
+            packet = self.hub.wait_next(last_frame_seq, timeout=0.5)
+            if packet is None:
+                if not self.hub.running:
+                    time.sleep(0.05)
+                continue
+            if last_frame_seq:
+                self.frames_skipped += packet.seq - last_frame_seq - 1
+            last_frame_seq = packet.seq
+            started = time.perf_counter()
+            try:
+                direction = self.infer(packet)
+            except Exception as infer_err:
+                print(f"Hand tracker inference error: {infer_err}")
+                continue
+            self.last_inference_time = time.perf_counter() - started
+            self.frames_processed += 1
+            with self._lock:
+                self._seq += 1
+                self._result = GestureResult(self._seq, direction, packet.seq, packet.timestamp, time.time())
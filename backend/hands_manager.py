@@ -0,0 +1,138 @@
+"""Owns the MediaPipe Hands instance and swaps it safely when settings change."""
+import threading
+import time
+
+
+class HandsManager:
+    """Wraps `factory(detection_confidence, tracking_confidence, max_hands)` instances.
+
+    `configure()` only rebuilds when a confidence value or the number of
+    tracked hands actually changes and builds the new graph on a background
+    thread. The finished instance is swapped in by `process()` on the
+    tracker thread, i.e. between two frames, so an in-flight `process` never
+    sees its graph replaced or closed. The replaced instance is closed right
+    after the swap. `config` is the configuration of the running instance;
+    a failed rebuild leaves it unchanged so the same request can be retried.
+    """
+
+    def __init__(self, factory, detection_confidence, tracking_confidence, max_hands=1):
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._config = (detection_confidence, tracking_confidence, max_hands)
+        self._hands = factory(*self._config)
+        self._pending = None  # (hands, config) built but not yet swapped in
+        self._requested = None  # Config of the build in flight or pending, if any
+        self._generation = 0  # Bumped per requested rebuild; stale builds are discarded
+        self._building = False
+        self.rebuilds = 0
+        self.rebuild_failures = 0
+        self.last_rebuild_time = 0.0
+        self.total_rebuild_time = 0.0
+        self.last_swap_at = None
+
+    @property
+    def config(self):
+        return self._config
+
+    def configure(self, detection_confidence, tracking_confidence, max_hands=None):
+        """Request new confidences (and hand count); returns True if a background rebuild was started."""
+        with self._lock:
+            target = self._requested or self._config
+            config = (float(detection_confidence), float(tracking_confidence),
+                      int(max_hands) if max_hands is not None else target[2])
+            if config == target:
+                return False
+            self._generation += 1
+            generation = self._generation
+            rebuild = config != self._config
+            if rebuild:
+                stale = None
+                self._requested = config
+                self._building = True
+            else:
+                # Back to the running settings: drop the build in flight or waiting
+                stale, self._pending = self._pending, None
+                self._requested = None
+                self._building = False
+        if not rebuild:
+            if stale is not None:
+                self._close(stale[0])
+            return False
+        threading.Thread(target=self._build, args=(config, generation),
+                         name='hands-rebuild', daemon=True).start()
+        return True
+
+    def _build(self, config, generation):
+        started = time.perf_counter()
+        try:
+            hands = self.factory(*config)
+        except Exception as build_err:
+            print(f"MediaPipe Hands rebuild failed: {build_err}")
+            with self._lock:
+                self.rebuild_failures += 1
+                if generation == self._generation:
+                    self._building = False
+                    self._requested = None
+            return
+        duration = time.perf_counter() - started
+        with self._lock:
+            if generation != self._generation:
+                stale = hands  # A newer configure() superseded this build
+            else:
+                stale = self._pending[0] if self._pending is not None else None
+                self._pending = (hands, config)
+                self._building = False
+                self.rebuilds += 1
+                self.last_rebuild_time = duration
+                self.total_rebuild_time += duration
+        self._close(stale)
+
+    def _swap(self):
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is None:
+                return
+            hands, self._config = pending
+            if self._requested == self._config:
+                self._requested = None
+            old, self._hands = self._hands, hands
+            self.last_swap_at = time.time()
+        if old is not hands:
+            self._close(old)
+
+    def _close(self, hands):
+        if hands is None or hands is self._hands:
+            return
+        try:
+            hands.close()
+        except Exception as close_err:
+            print(f"Error closing MediaPipe Hands: {close_err}")
+
+    def process(self, image):
+        """Run hand detection on the current instance (tracker thread only)."""
+        if self._pending is not None:
+            self._swap()
+        return self._hands.process(image)
+
+    def close(self):
+        with self._lock:
+            self._generation += 1
+            hands, pending = self._hands, self._pending
+            self._pending = None
+        if pending is not None and pending[0] is not hands:
+            pending[0].close()
+        hands.close()
+
+    def stats(self):
+        return {
+            'detection_confidence': self._config[0],
+            'tracking_confidence': self._config[1],
+            'max_hands': self._config[2],
+            'rebuilding': self._building or self._pending is not None,
+            'requested': self._requested,
+            'rebuilds': self.rebuilds,
+            'rebuild_failures': self.rebuild_failures,
+            'last_rebuild_time': round(self.last_rebuild_time, 6),
+            'mean_rebuild_time': round(self.total_rebuild_time / self.rebuilds, 6) if self.rebuilds else 0.0,
+            'last_swap_at': self.last_swap_at,
+        }
@@ -0,0 +1,91 @@
+"""Per-stage latency histograms exported in the Prometheus text format."""
+import bisect
+import threading
+
+# Upper bounds (seconds) shared by every stage; +Inf is implicit
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Fixed-bucket histogram; `observe()` is a bisect plus three additions."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket (like histogram_quantile)."""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # Beyond the last bound: report the bound
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+class LatencyMetrics:
+    """A labelled histogram per pipeline stage plus Prometheus exposition."""
+
+    def __init__(self, name, stages, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.stages = {stage: Histogram(buckets) for stage in stages}
+
+    def observe(self, stage, seconds):
+        self.stages[stage].observe(seconds)
+
+    def summary(self):
+        """JSON-friendly p50/p95/p99 (milliseconds) and counts per stage."""
+        result = {}
+        for stage, histogram in self.stages.items():
+            values = {f"p{int(q * 100)}": histogram.quantile(q) for q in QUANTILES}
+            result[stage] = {key: round(value * 1000, 3) if value is not None else None
+                             for key, value in values.items()}
+            result[stage]['count'] = histogram.count
+        return result
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for stage, histogram in self.stages.items():
+            with histogram._lock:
+                counts = list(histogram.counts)
+                total_sum = histogram.sum
+                total = histogram.count
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {total_sum!r}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {total}')
+        # Pre-computed quantiles for scrapers/dashboards that don't run histogram_quantile
+        quantile_name = f"{self.name.rsplit('_seconds', 1)[0]}_quantile_seconds"
+        lines.append(f"# HELP {quantile_name} Estimated p50/p95/p99 of {self.name} per stage")
+        lines.append(f"# TYPE {quantile_name} gauge")
+        for stage, histogram in self.stages.items():
+            for q in QUANTILES:
+                value = histogram.quantile(q)
+                if value is not None:
+                    lines.append(f'{quantile_name}{{stage="{stage}",quantile="{q}"}} {round(value, 9)!r}')
+        return '\n'.join(lines) + '\n'
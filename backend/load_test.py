@@ -0,0 +1,134 @@
+"""Concurrent /video_feed and /game_stream clients against a running server.
+
+Each step opens `video[i]` MJPEG clients and `state[i]` SSE clients at once,
+keeps them reading for `--duration` seconds and reports per-client frame and
+event rates, failed connections, and the server's thread count:
+
+    python load_test.py http://localhost:5000 --video 8,32,128 --state 64,256,1024
+
+State clients follow a dedicated session that ticks every `--tick` seconds,
+so the camera game is left alone. Uses only the standard library.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+FRAME_MARKER = b'Content-Type: image/jpeg'
+EVENT_MARKER = b'event: '
+
+
+async def request_json(host, port, method, path, body=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    payload = json.dumps(body).encode() if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    try:
+        return json.loads(content)
+    except ValueError:
+        return {'status_line': head.split(b'\r\n', 1)[0].decode(errors='replace')}
+
+
+async def stream_client(host, port, path, marker, deadline, counts, index):
+    """Read one stream until `deadline`, counting `marker` occurrences (split-safe)."""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 10)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readline(), 10)
+        if b' 200 ' not in status:
+            raise ConnectionError(status.decode(errors='replace').strip())
+    except (OSError, asyncio.TimeoutError, ConnectionError):
+        counts[index] = None
+        return
+    started = time.perf_counter()
+    tail = b''
+    found = 0
+    received = 0
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                chunk = await asyncio.wait_for(reader.read(65536), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                break
+            received += len(chunk)
+            data = tail + chunk
+            found += data.count(marker) - tail.count(marker)
+            tail = data[-(len(marker) - 1):]
+    except OSError:
+        pass
+    finally:
+        writer.close()
+    counts[index] = (found, received, time.perf_counter() - started)
+
+
+def summarize(results):
+    connected = [r for r in results if r is not None]
+    rates = sorted(found / elapsed for found, _, elapsed in connected if elapsed > 0)
+    return {
+        'clients': len(results),
+        'failed': len(results) - len(connected),
+        'min_rate': round(rates[0], 1) if rates else None,
+        'median_rate': round(statistics.median(rates), 1) if rates else None,
+        'mbytes_per_s': round(sum(received / elapsed for _, received, elapsed in connected if elapsed > 0) / 1e6, 2),
+    }
+
+
+async def main(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    videos = [int(v) for v in args.video.split(',')]
+    states = [int(v) for v in args.state.split(',')]
+    if len(videos) != len(states):
+        raise SystemExit("--video and --state need the same number of steps")
+
+    await request_json(host, port, 'POST', '/sessions', {'id': args.session, 'tick_interval': args.tick})
+    await request_json(host, port, 'POST', f'/start?session={args.session}')
+    rows = []
+    try:
+        for video, state in zip(videos, states):
+            deadline = time.perf_counter() + args.duration
+            video_counts = [None] * video
+            state_counts = [None] * state
+            clients = [stream_client(host, port, '/video_feed', FRAME_MARKER, deadline, video_counts, i)
+                       for i in range(video)]
+            clients += [stream_client(host, port, f'/game_stream?session={args.session}', EVENT_MARKER, deadline,
+                                      state_counts, i) for i in range(state)]
+            running = asyncio.gather(*clients)
+            # Sample the server mid-step, while every client is connected
+            await asyncio.sleep(args.duration / 2)
+            stats = await request_json(host, port, 'GET', '/stream_stats')
+            await running
+            rows.append({
+                'video': summarize(video_counts),
+                'state': summarize(state_counts),
+                'server_threads': stats.get('threads'),
+                'encoded_frames': stats.get('encoded_frames'),
+            })
+            print(json.dumps(rows[-1]))
+            await asyncio.sleep(1.0)  # Let the server notice the disconnects
+    finally:
+        await request_json(host, port, 'DELETE', f'/sessions/{args.session}')
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Concurrent MJPEG and SSE clients against one server")
+    parser.add_argument('url', nargs='?', default='http://localhost:5000')
+    parser.add_argument('--video', default='8,32,128', help="comma-separated MJPEG client counts per step")
+    parser.add_argument('--state', default='64,256,1024', help="comma-separated SSE client counts per step")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per step")
+    parser.add_argument('--tick', type=float, default=0.03, help="tick interval of the load-test session")
+    parser.add_argument('--session', default='load-test')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""Pre-rendered HUD overlay for the video stream.
+
+The original overlay copied the whole frame, blended a black box over it
+with `cv2.addWeighted` and drew eight `putText` calls per frame. Here the
+text layers are rendered once into small ROI-sized images plus masks. The
+static instructions are rendered once per frame size and the status panel
+is re-rendered only when direction, score or game status change. Per frame,
+only the panel ROI is darkened and the text pixels are copied in. The
+output is pixel-identical to the original drawing.
+"""
+import time
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+PANEL = (10, 10, 300, 120)  # x0, y0, x1, y1 of the darkened status box
+PANEL_ALPHA = 0.3  # Share of the camera image kept under the box
+
+# (text, origin offset from the bottom-left, scale, color, thickness)
+INSTRUCTIONS = [
+    ("Gestures:", (20, 80), 0.6, (255, 255, 255), 2),
+    ("Multiple fingers = Direction", (20, 60), 0.5, (255, 255, 255), 1),
+    ("Index finger = Point direction", (20, 40), 0.5, (255, 255, 255), 1),
+    ("Make clear gestures!", (20, 20), 0.5, (0, 255, 255), 1),
+]
+
+
+class TextLayer:
+    """Text drawn once into an ROI-sized image with a mask of the drawn pixels."""
+
+    def __init__(self, x0, y0, x1, y1, items):
+        self.x0, self.y0 = x0, y0
+        height, width = y1 - y0, x1 - x0
+        self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+        for text, (x, y), scale, color, thickness in items:
+            origin = (x - x0, y - y0)
+            cv2.putText(self.image, text, origin, FONT, scale, color, thickness)
+            cv2.putText(self.mask, text, origin, FONT, scale, 255, thickness)
+
+    def blit(self, frame):
+        # Clip to the frame in case the text runs past a small frame's edge
+        height = min(self.image.shape[0], frame.shape[0] - self.y0)
+        width = min(self.image.shape[1], frame.shape[1] - self.x0)
+        if height <= 0 or width <= 0:
+            return
+        roi = frame[self.y0:self.y0 + height, self.x0:self.x0 + width]
+        cv2.copyTo(self.image[:height, :width], self.mask[:height, :width], roi)
+
+
+def _bounds(items, frame_height):
+    """ROI covering every text item (origins are baseline-left, as in putText)."""
+    x0 = y0 = float('inf')
+    x1 = y1 = 0
+    for text, (x, y), scale, _, thickness in items:
+        (width, height), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+        y = frame_height - y if frame_height is not None else y
+        x0 = min(x0, x - thickness)
+        y0 = min(y0, y - height - thickness)
+        x1 = max(x1, x + width + thickness)
+        y1 = max(y1, y + baseline + thickness)
+    return int(max(0, x0)), int(max(0, y0)), int(x1), int(y1)
+
+
+class OverlayRenderer:
+    """Composites the HUD onto a frame in place, re-rendering text only when it changes."""
+
+    def __init__(self):
+        self._status_key = None
+        self._status = None
+        self._instructions_height = None
+        self._instructions = None
+        self.frames = 0
+        self.rerenders = 0
+        self.last_time = 0.0
+        self._total_time = 0.0
+
+    def _status_layer(self, direction, score, game_over):
+        key = (direction, score, game_over)
+        if key != self._status_key:
+            items = [
+                (f"Direction: {direction}", (20, 35), 0.7, (0, 255, 0), 2),
+                (f"Score: {score}", (20, 60), 0.7, (255, 255, 0), 2),
+                (f"Game Status: {'OVER' if game_over else 'PLAYING'}", (20, 85), 0.7,
+                 (0, 0, 255) if game_over else (0, 255, 0), 2),
+            ]
+            # Text may run past the box, so the layer covers both
+            x0, y0, x1, y1 = _bounds(items, None)
+            self._status = TextLayer(min(x0, PANEL[0]), min(y0, PANEL[1]), max(x1, PANEL[2]),
+                                     max(y1, PANEL[3]), items)
+            self._status_key = key
+            self.rerenders += 1
+        return self._status
+
+    def _instruction_layer(self, frame_height):
+        if frame_height != self._instructions_height:
+            items = [(text, (x, frame_height - y), scale, color, thickness)
+                     for text, (x, y), scale, color, thickness in INSTRUCTIONS]
+            self._instructions = TextLayer(*_bounds(INSTRUCTIONS, frame_height), items)
+            self._instructions_height = frame_height
+            self.rerenders += 1
+        return self._instructions
+
+    def draw(self, frame, direction, score, game_over):
+        """Draw the HUD onto `frame` (modified in place and returned)."""
+        started = time.perf_counter()
+        x0, y0, x1, y1 = PANEL
+        # Darken only the box: same as blending a black rectangle at 0.7
+        box = frame[y0:y1 + 1, x0:x1 + 1]
+        cv2.convertScaleAbs(box, dst=box, alpha=PANEL_ALPHA)
+        self._status_layer(direction, score, game_over).blit(frame)
+        self._instruction_layer(frame.shape[0]).blit(frame)
+        self.last_time = time.perf_counter() - started
+        self._total_time += self.last_time
+        self.frames += 1
+        return frame
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'rerenders': self.rerenders,
+            'last_time': round(self.last_time, 6),
+            'mean_time': round(self._total_time / self.frames, 6) if self.frames else 0.0,
+        }
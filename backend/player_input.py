@@ -0,0 +1,213 @@
+"""Several players on one camera: one MediaPipe pass per frame, one snake per hand.
+
+MediaPipe Hands runs once per frame with `max_num_hands` set to the player
+count and returns every hand in a single result. `HandAssigner` maps those
+hands to players, either by handedness (two players: left hand -> player 0)
+or by screen region (N vertical strips of the mirrored frame, by wrist
+position). Each `PlayerInput` keeps its own smoother, index-finger anchor,
+cooldown and label, so one player's gestures never gate another's.
+"""
+import time
+
+import numpy as np
+
+from gesture_features import DIRECTION_NAMES, WRIST, classify_hand, landmarks_to_array
+from gesture_smoother import GestureSmoother
+
+ASSIGNMENTS = ('region', 'handedness')
+# MediaPipe labels hands as seen in a mirrored (selfie) image, which is what the tracker feeds it
+HANDEDNESS_PLAYERS = {'Left': 0, 'Right': 1}
+
+
+class HandAssigner:
+    """Maps the hands of one `hands.process` result to player slots."""
+
+    def __init__(self, players, mode='region'):
+        if mode not in ASSIGNMENTS:
+            raise ValueError(f"Unknown hand assignment: {mode} (use {' or '.join(ASSIGNMENTS)})")
+        if mode == 'handedness' and players > 2:
+            raise ValueError("Handedness only tells two players apart; use region assignment")
+        self.players = players
+        self.mode = mode
+        self.conflicts = 0  # Hands dropped because their slot was already taken this frame
+
+    def player_for(self, landmarks, label):
+        if self.players == 1:
+            return 0
+        if self.mode == 'handedness':
+            return HANDEDNESS_PLAYERS.get(label)
+        return min(self.players - 1, max(0, int(landmarks[WRIST].x * self.players)))
+
+    def assign(self, result):
+        """Per player, the landmarks of its hand in `result` (None when it isn't visible)."""
+        hands = [None] * self.players
+        if not result.multi_hand_landmarks:
+            return hands
+        handedness = result.multi_handedness or []
+        for i, hand in enumerate(result.multi_hand_landmarks):
+            label = handedness[i].classification[0].label if i < len(handedness) else None
+            player = self.player_for(hand.landmark, label)
+            if player is None:
+                continue
+            if hands[player] is not None:
+                self.conflicts += 1  # MediaPipe lists hands by confidence; keep the first
+                continue
+            hands[player] = hand.landmark
+        return hands
+
+
+class PlayerInput:
+    """Gesture state of one player: smoother, index-finger anchor, cooldown and label."""
+
+    def __init__(self, settings):
+        self.smoother = GestureSmoother(settings['finger_threshold'], settings['gesture_threshold'],
+                                        tau=settings['smoothing_tau'], confidence=settings['smoothing_confidence'],
+                                        index_window=settings['index_window'])
+        self.points = np.empty((21, 3), dtype=np.float64)  # Reused landmark buffer
+        self.reset()
+
+    def reset(self):
+        self.smoother.reset()
+        self.prev_index_pos = None
+        self.last_gesture_time = 0.0
+        self.current_direction = "None"
+
+    def update(self, timestamp, landmarks, settings):
+        """Classify this player's hand for one frame (None: not visible); returns a direction or -1."""
+        points = landmarks_to_array(landmarks, out=self.points) if landmarks is not None else None
+        if settings['smoothing_tau'] > 0:
+            # The stable direction on every frame, so a turn survives results the scheduler never polls
+            self.smoother.update(timestamp, points)
+            self.current_direction = DIRECTION_NAMES[self.smoother.stable]
+            return self.smoother.stable
+        direction = -1
+        if points is not None:
+            direction, self.prev_index_pos = classify_hand(points, self.prev_index_pos,
+                                                           settings['finger_threshold'],
+                                                           settings['gesture_threshold'])
+        self.current_direction = DIRECTION_NAMES[direction]
+        return direction
+
+    def accept(self, now, cooldown):
+        """Per-player cooldown: True (and restart it) if this player may turn now."""
+        if now - self.last_gesture_time > cooldown:
+            self.last_gesture_time = now
+            return True
+        return False
+
+
+class MultiPlayerInput:
+    """Classifies every player's hand from one MediaPipe result per frame.
+
+    `settings` is the live calibration dict; call `configure()` after it
+    changes so the smoothers pick up new thresholds.
+    """
+
+    def __init__(self, players, mode, settings):
+        self.assigner = HandAssigner(players, mode)
+        self.settings = settings
+        self.inputs = [PlayerInput(settings) for _ in range(players)]
+        self.last_time = 0.0
+
+    @property
+    def players(self):
+        return len(self.inputs)
+
+    @property
+    def mode(self):
+        return self.assigner.mode
+
+    def configure(self):
+        settings = self.settings
+        for player in self.inputs:
+            player.smoother.configure(finger_threshold=settings['finger_threshold'],
+                                      gesture_threshold=settings['gesture_threshold'],
+                                      tau=settings['smoothing_tau'], confidence=settings['smoothing_confidence'],
+                                      index_window=settings['index_window'])
+
+    def reset(self):
+        for player in self.inputs:
+            player.reset()
+
+    def update(self, timestamp, result):
+        """Per-player directions for one frame (-1: no new gesture for that player)."""
+        started = time.perf_counter()
+        hands = self.assigner.assign(result)
+        directions = tuple(player.update(timestamp, hand, self.settings)
+                           for player, hand in zip(self.inputs, hands))
+        self.last_time = time.perf_counter() - started
+        return directions
+
+    def labels(self):
+        return [player.current_direction for player in self.inputs]
+
+    def summary(self):
+        """Short HUD text, e.g. "1:L 2:- 3:U" for Left / no gesture / Up."""
+        return ' '.join(f"{i + 1}:{label[0] if label != 'None' else '-'}" for i, label in enumerate(self.labels()))
+
+    def stats(self):
+        return {
+            'players': self.players,
+            'assign': self.mode,
+            'gestures': self.labels(),
+            'conflicts': self.assigner.conflicts,
+            'last_classification_time': round(self.last_time, 6),
+        }
+
+
+def benchmark(recording, build_hands, players_list, settings):
+    """Per-frame cost of one MediaPipe pass plus per-player classification, by player count.
+
+    `build_hands(max_hands)` returns a fresh MediaPipe Hands. Frames come
+    from a recording made with frames enabled; `hands_per_frame` shows how
+    many hands MediaPipe actually found in them.
+    """
+    from frame_buffers import FramePreparer
+    from recording import LandmarkRecording
+
+    if isinstance(recording, str):
+        recording = LandmarkRecording(recording)
+    if recording.frames is None:
+        raise ValueError("Recording has no raw frames; record with frames enabled")
+    timestamps = recording.timestamps
+    report = {'frames': len(recording), 'frame_shape': list(recording.frame_shape)}
+    for players in players_list:
+        hands = build_hands(players)
+        preparer = FramePreparer()
+        player_input = MultiPlayerInput(players, 'region', settings)
+        inference = classification = 0.0
+        found = 0
+        for timestamp, frame in zip(timestamps, recording.frames):
+            rgb = preparer.prepare(frame.copy()).rgb
+            started = time.perf_counter()
+            result = hands.process(rgb)
+            inference += time.perf_counter() - started
+            found += len(result.multi_hand_landmarks or ())
+            started = time.perf_counter()
+            player_input.update(float(timestamp), result)
+            classification += time.perf_counter() - started
+        hands.close()
+        count = max(len(recording), 1)
+        report[players] = {
+            'inference_per_frame': round(inference / count, 6),
+            'classification_per_frame': round(classification / count, 6),
+            'hands_per_frame': round(found / count, 2),
+        }
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    import mediapipe as mp
+
+    parser = argparse.ArgumentParser(description="Per-frame multi-player cost (one MediaPipe pass + N classifiers)")
+    parser.add_argument('recording', help="landmark recording made with frames enabled")
+    parser.add_argument('--players', default='1,2,4', help="comma-separated player counts")
+    args = parser.parse_args()
+    settings = {'finger_threshold': 0.08, 'gesture_threshold': 0.1, 'smoothing_tau': 0.08,
+                'smoothing_confidence': 0.6, 'index_window': 0.15}
+    print(json.dumps(benchmark(args.recording, lambda max_hands: mp.solutions.hands.Hands(
+        static_image_mode=False, max_num_hands=max_hands, min_detection_confidence=0.7,
+        min_tracking_confidence=0.5), [int(p) for p in args.players.split(',')], settings), indent=2))
@@ -0,0 +1,314 @@
+"""Record and replay landmark streams for deterministic offline runs.
+
+A recording is a fixed-size-record binary file (readable with np.memmap)
+holding per-frame timestamps, hand counts, handedness and MediaPipe
+landmarks, plus an optional `<path>.frames` file of raw BGR frames.
+
+`ReplayCapture` stands in for `cv2.VideoCapture` and `ReplayHands` for the
+MediaPipe `hands.process` output, so the gesture path, the cooldown logic
+and the game loop can run on a headless box at full speed.
+"""
+import os
+import struct
+import threading
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from gesture_features import landmarks_to_array, classify_hand
+from gesture_smoother import GestureSmoother
+from snake_engine import SnakeEngine
+
+MAGIC = b'SNKLMK01'
+# magic, max_hands, has_frames, frame height, width, channels
+HEADER = struct.Struct('<8sBBHHH')
+HEADER_SIZE = 32  # header padded so records start on an aligned offset
+
+HANDEDNESS = {'Left': 1, 'Right': 2}
+HANDEDNESS_NAMES = {1: 'Left', 2: 'Right'}
+
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('hands', 'u1'),
+        ('handedness', 'u1', (max_hands,)),
+        ('landmarks', '<f4', (max_hands, 21, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    """Appends one record per processed frame (and optionally the raw frame).
+
+    `write` (tracker thread) and `close` (request thread) share a lock, so a
+    recording stopped mid-frame never writes to a closed file; later writes
+    are dropped.
+    """
+
+    def __init__(self, path, max_hands=1, frame_shape=None):
+        self.path = path
+        self.max_hands = max_hands
+        self.frame_shape = tuple(frame_shape) if frame_shape is not None else None
+        self.frames_written = 0
+        self.closed = False
+        self._lock = threading.Lock()
+        self._record = np.zeros(1, dtype=record_dtype(max_hands))
+        self._points = np.empty((21, 3), dtype=np.float64)
+        self._file = open(path, 'wb')
+        height, width, channels = self.frame_shape or (0, 0, 0)
+        header = HEADER.pack(MAGIC, max_hands, int(self.frame_shape is not None), height, width, channels)
+        self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+        self._frames = open(path + '.frames', 'wb') if self.frame_shape is not None else None
+
+    def write(self, timestamp, result, frame=None):
+        """Record one `hands.process` result (None or empty means no hands); False once closed."""
+        with self._lock:
+            if self.closed:
+                return False
+            self._write(timestamp, result, frame)
+            return True
+
+    def _write(self, timestamp, result, frame):
+        record = self._record[0]
+        record['timestamp'] = timestamp
+        landmarks = getattr(result, 'multi_hand_landmarks', None) or []
+        handedness = getattr(result, 'multi_handedness', None) or []
+        count = min(len(landmarks), self.max_hands)
+        record['hands'] = count
+        record['handedness'] = 0
+        record['landmarks'] = 0
+        for i in range(count):
+            record['landmarks'][i] = landmarks_to_array(landmarks[i].landmark, out=self._points)
+            if i < len(handedness):
+                record['handedness'][i] = HANDEDNESS.get(handedness[i].classification[0].label, 0)
+        self._file.write(self._record.tobytes())
+        if self._frames is not None:
+            if frame is None or frame.shape != self.frame_shape:
+                frame = np.zeros(self.frame_shape, dtype=np.uint8)
+            self._frames.write(np.ascontiguousarray(frame).tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._file.close()
+            if self._frames is not None:
+                self._frames.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped view over a recording file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, max_hands, has_frames, height, width, channels = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a landmark recording: {path}")
+        self.max_hands = max_hands
+        dtype = record_dtype(max_hands)
+        # Ignore a trailing partial record from a recording still being written
+        count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+        self.frame_shape = (height, width, channels) if has_frames else None
+        self.frames = None
+        if has_frames and count > 0:
+            self.frames = np.memmap(path + '.frames', dtype=np.uint8, mode='r',
+                                    shape=(count,) + self.frame_shape)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records['timestamp']
+
+    @property
+    def landmarks(self):
+        """(N, max_hands, 21, 3) float32 landmarks; slots past `hands` are zero."""
+        return self.records['landmarks']
+
+    @property
+    def hand_counts(self):
+        return self.records['hands']
+
+    def primary_hand(self):
+        """(T, 21, 3) landmarks and timestamps of frames with at least one hand."""
+        mask = self.hand_counts > 0
+        return self.landmarks[mask, 0].astype(np.float64), self.timestamps[mask]
+
+
+class ReplayCapture:
+    """Drop-in for cv2.VideoCapture that serves recorded raw frames.
+
+    `realtime=True` paces reads by the recorded timestamps; otherwise frames
+    come back as fast as they are read. With `loop=True` playback restarts
+    at the end instead of failing reads. Landmark-only recordings yield
+    black frames of `frame_shape` so the capture pipeline still ticks.
+    """
+
+    def __init__(self, recording, realtime=False, loop=False, frame_shape=(480, 640, 3)):
+        if isinstance(recording, str):
+            recording = LandmarkRecording(recording)
+        self.recording = recording
+        self.frame_shape = recording.frame_shape or tuple(frame_shape)
+        self._blank = np.zeros(self.frame_shape, dtype=np.uint8) if recording.frames is None else None
+        self.realtime = realtime
+        self.loop = loop
+        self.position = 0
+        self._opened = True
+        self._started = None
+
+    def isOpened(self):
+        return self._opened
+
+    def grab(self):
+        """Advance to the next recorded frame (paced when realtime) without copying it."""
+        if not self._opened:
+            return False
+        if self.position >= len(self.recording):
+            if not self.loop:
+                return False
+            self.position = 0
+            self._started = None
+        if self.realtime:
+            stamps = self.recording.timestamps
+            if self._started is None:
+                self._started = time.perf_counter() - (stamps[self.position] - stamps[0])
+            delay = self._started + (stamps[self.position] - stamps[0]) - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.position += 1
+        return True
+
+    def retrieve(self, image=None):
+        """The frame taken by the last `grab()`."""
+        if not self._opened or self.position == 0:
+            return False, None
+        frames = self.recording.frames
+        frame = frames[self.position - 1] if frames is not None else self._blank
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, np.array(frame)
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop):
+        height, width = self.frame_shape[:2]
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(height)
+        if prop == cv2.CAP_PROP_FPS:
+            stamps = self.recording.timestamps
+            span = stamps[-1] - stamps[0] if len(stamps) > 1 else 0
+            return float((len(stamps) - 1) / span) if span > 0 else 0.0
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self._opened = False
+
+
+class _Landmark:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class ReplayHands:
+    """Drop-in for `mp_hands.Hands`: each process() call returns the next recorded result."""
+
+    def __init__(self, recording, loop=False):
+        if isinstance(recording, str):
+            recording = LandmarkRecording(recording)
+        self.recording = recording
+        self.loop = loop
+        self.position = 0
+
+    def process(self, image=None):
+        if self.position >= len(self.recording):
+            if not self.loop:
+                return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+            self.position = 0
+        record = self.recording.records[self.position]
+        self.position += 1
+        count = int(record['hands'])
+        if not count:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        hands = []
+        handedness = []
+        for i in range(count):
+            points = record['landmarks'][i].tolist()
+            hands.append(SimpleNamespace(landmark=[_Landmark(x, y, z) for x, y, z in points]))
+            label = HANDEDNESS_NAMES.get(int(record['handedness'][i]), 'Unknown')
+            handedness.append(SimpleNamespace(classification=[SimpleNamespace(label=label, score=1.0)]))
+        return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+    def close(self):
+        pass
+
+
+def replay_game(recording, settings, seed=0):
+    """Run gesture classification, cooldown gating and the game on recorded time.
+
+    `settings` uses the calibration keys (finger_threshold, gesture_threshold,
+    gesture_cooldown, tick_interval, and smoothing_tau / smoothing_confidence /
+    index_window for the streaming smoother, used when smoothing_tau > 0). Ticks are scheduled on the recording's
+    timestamps, so the whole session replays with no sleeps. Returns the
+    final SnakeEngine (with a replay record) and the applied direction changes
+    as (timestamp, direction) pairs.
+    """
+    if isinstance(recording, str):
+        recording = LandmarkRecording(recording)
+    engine = SnakeEngine(seed=seed, record=True)
+    stamps = recording.timestamps
+    if not len(stamps):
+        return engine, []
+    interval = float(settings.get('tick_interval', 0.03))
+    next_tick = stamps[0]
+    prev_index = None
+    last_gesture_time = 0.0
+    changes = []
+    smoother = None
+    if settings.get('smoothing_tau', 0) > 0:
+        smoother = GestureSmoother(settings['finger_threshold'], settings['gesture_threshold'],
+                                   tau=settings['smoothing_tau'],
+                                   confidence=settings.get('smoothing_confidence', 0.6),
+                                   index_window=settings.get('index_window', 0.15))
+    cooldown = 0 if smoother is not None else settings['gesture_cooldown']
+    for i in range(len(recording)):
+        now = float(stamps[i])
+        while next_tick <= now and not engine.game_over:
+            engine.step()
+            next_tick += interval
+        points = recording.landmarks[i, 0].astype(np.float64) if recording.hand_counts[i] else None
+        if smoother is not None:
+            direction = smoother.update(now, points)
+        elif points is None:
+            continue
+        else:
+            direction, prev_index = classify_hand(points, prev_index, settings['finger_threshold'],
+                                                  settings['gesture_threshold'])
+        if now - last_gesture_time > cooldown:
+            if direction != -1 and direction != engine.direction:
+                engine.direction = direction
+                last_gesture_time = now
+                changes.append((now, direction))
+    return engine, changes
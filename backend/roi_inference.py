@@ -0,0 +1,218 @@
+"""Downscaled detection and region-of-interest tracking in front of MediaPipe Hands.
+
+The game only needs one of four directions, so full-resolution frames are
+wasted work. With `scale < 1` the frame is shrunk before detection; with
+`padding > 0`, once a hand has been found the next frame is cropped to a
+padded box around it. Landmarks are mapped back to normalized coordinates of
+the full mirrored frame, so classification and recordings don't change.
+`scale=1, padding=0` is the original full-frame path.
+
+Input is a PreparedFrame: the full path uses its shared RGB frame, the other
+paths resize or crop its shared mirrored frame and convert into scratch
+buffers, so no mode allocates per frame.
+"""
+import time
+
+import cv2
+
+from frame_buffers import BufferPool
+
+
+class RoiInference:
+    """Picks full, downscaled or cropped input for each frame and remaps the result."""
+
+    MODES = ('full', 'detect', 'roi')
+
+    def __init__(self, hands, min_crop=64):
+        self.hands = hands
+        self.min_crop = min_crop
+        self.box = None  # Last hand box (x0, y0, x1, y1) in mirrored full-frame pixels
+        self.last_mode = None
+        self.frames = {mode: 0 for mode in self.MODES}
+        self._time = {mode: 0.0 for mode in self.MODES}
+        self.roi_misses = 0
+        # Split of the last call: mirror/convert vs hands.process (seconds)
+        self.last_prepare_time = 0.0
+        self.last_process_time = 0.0
+        # Resized/cropped BGR and its RGB conversion (tracker thread only)
+        self.buffers = BufferPool()
+
+    def reset(self):
+        self.box = None
+
+    def _convert(self, bgr_frame):
+        started = time.perf_counter()
+        rgb_frame = cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2RGB, dst=self.buffers.take(bgr_frame.shape))
+        self.last_prepare_time += time.perf_counter() - started
+        return rgb_frame
+
+    def _run(self, rgb_frame):
+        started = time.perf_counter()
+        result = self.hands.process(rgb_frame)
+        self.last_process_time += time.perf_counter() - started
+        return result
+
+    def _crop_box(self, width, height, padding):
+        """Padded crop around the last hand box, clamped to the frame; None if nothing of it is left."""
+        x0, y0, x1, y1 = self.box
+        side = max(x1 - x0, y1 - y0, self.min_crop) * (1 + 2 * padding)
+        # Landmarks can lie outside the frame; keep the centre on it so the crop never ends up empty
+        cx = min(max((x0 + x1) / 2, 0), width)
+        cy = min(max((y0 + y1) / 2, 0), height)
+        left = int(max(0, cx - side / 2))
+        top = int(max(0, cy - side / 2))
+        right = int(min(width, cx + side / 2))
+        bottom = int(min(height, cy + side / 2))
+        if right - left < 1 or bottom - top < 1:
+            return None
+        return left, top, right, bottom
+
+    @staticmethod
+    def _remap(result, left, top, crop_width, crop_height, width, height):
+        """Convert crop-normalized landmarks to full-frame normalized coordinates in place."""
+        for hand in result.multi_hand_landmarks:
+            for landmark in hand.landmark:
+                landmark.x = (left + landmark.x * crop_width) / width
+                landmark.y = (top + landmark.y * crop_height) / height
+                landmark.z = landmark.z * crop_width / width
+
+    @staticmethod
+    def _bounds(result, width, height):
+        if not result.multi_hand_landmarks:
+            return None
+        landmarks = result.multi_hand_landmarks[0].landmark
+        xs = [landmark.x for landmark in landmarks]
+        ys = [landmark.y for landmark in landmarks]
+        return min(xs) * width, min(ys) * height, max(xs) * width, max(ys) * height
+
+    def process(self, prepared, scale=1.0, padding=0.0):
+        """Run hand detection on a PreparedFrame; returns a `hands.process` result."""
+        started = time.perf_counter()
+        height, width = prepared.frame.shape[:2]
+        result = None
+        self.last_prepare_time = 0.0
+        self.last_process_time = 0.0
+        if padding > 0 and self.box is not None:
+            box = self._crop_box(width, height, padding)
+            self.box = None  # Set again from this frame's result, so a failed crop isn't retried
+            if box is not None:
+                left, top, right, bottom = box
+                crop = self._mirrored(prepared)[top:bottom, left:right]
+                try:
+                    result = self._run(self._convert(crop))
+                except Exception as roi_err:
+                    print(f"ROI inference failed, detecting on the full frame: {roi_err}")
+            if result is not None and result.multi_hand_landmarks:
+                self._remap(result, left, top, right - left, bottom - top, width, height)
+                mode = 'roi'
+            else:
+                # Lost the hand inside the crop (or no crop was left); detect on the whole frame instead
+                self.roi_misses += 1
+                result = None
+        if result is None:
+            if scale < 1.0:
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                small = cv2.resize(self._mirrored(prepared), size, dst=self.buffers.take(size[::-1] + (3,)),
+                                   interpolation=cv2.INTER_AREA)
+                rgb_frame = self._convert(small)
+                mode = 'detect'
+            else:
+                prepare_started = time.perf_counter()
+                rgb_frame = prepared.rgb  # Free if the video stream already mirrored this frame
+                self.last_prepare_time += time.perf_counter() - prepare_started
+                mode = 'full'
+            result = self._run(rgb_frame)
+        self.box = self._bounds(result, width, height)
+        self.last_mode = mode
+        self.frames[mode] += 1
+        self._time[mode] += time.perf_counter() - started
+        return result
+
+    def _mirrored(self, prepared):
+        started = time.perf_counter()
+        mirrored = prepared.mirrored
+        self.last_prepare_time += time.perf_counter() - started
+        return mirrored
+
+    def stats(self):
+        return {
+            'last_mode': self.last_mode,
+            'frames': dict(self.frames),
+            'mean_time': {mode: round(self._time[mode] / self.frames[mode], 6) if self.frames[mode] else 0.0
+                          for mode in self.MODES},
+            'roi_misses': self.roi_misses,
+        }
+
+
+def benchmark(recording, build_hands, settings):
+    """Per-frame CPU time and latency of the full-frame vs the adaptive path on recorded frames.
+
+    `build_hands()` returns a fresh MediaPipe Hands for each run. Directions
+    are classified on both paths so the agreement rate can be checked too.
+    """
+    from frame_buffers import FramePreparer
+    from gesture_features import classify_hand, landmarks_to_array
+    from recording import LandmarkRecording
+
+    if isinstance(recording, str):
+        recording = LandmarkRecording(recording)
+    if recording.frames is None:
+        raise ValueError("Recording has no raw frames; record with frames enabled")
+
+    def run(scale, padding):
+        hands = build_hands()
+        inference = RoiInference(hands)
+        preparer = FramePreparer()
+        directions = []
+        prev_index = None
+        cpu = wall = 0.0
+        for frame in recording.frames:
+            frame = frame.copy()
+            cpu_started = time.process_time()
+            wall_started = time.perf_counter()
+            result = inference.process(preparer.prepare(frame), scale, padding)
+            direction = -1
+            if result.multi_hand_landmarks:
+                points = landmarks_to_array(result.multi_hand_landmarks[0].landmark)
+                direction, prev_index = classify_hand(points, prev_index, settings['finger_threshold'],
+                                                      settings['gesture_threshold'])
+            wall += time.perf_counter() - wall_started
+            cpu += time.process_time() - cpu_started
+            directions.append(direction)
+        hands.close()
+        count = max(len(directions), 1)
+        return directions, {
+            'cpu_per_frame': round(cpu / count, 6),
+            'latency_per_frame': round(wall / count, 6),
+            'frames': inference.stats()['frames'],
+            'roi_misses': inference.roi_misses,
+        }
+
+    full_directions, full = run(1.0, 0.0)
+    adaptive_directions, adaptive = run(settings['inference_scale'], settings['roi_padding'])
+    agree = sum(a == b for a, b in zip(full_directions, adaptive_directions))
+    return {
+        'frames': len(recording),
+        'frame_shape': list(recording.frame_shape),
+        'full': full,
+        'adaptive': adaptive,
+        'direction_agreement': round(agree / max(len(full_directions), 1), 4),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    import mediapipe as mp
+
+    parser = argparse.ArgumentParser(description="Full-frame vs downscaled/ROI hand inference on a recording")
+    parser.add_argument('recording', help="landmark recording made with frames enabled")
+    parser.add_argument('--scale', type=float, default=0.5)
+    parser.add_argument('--padding', type=float, default=0.25)
+    args = parser.parse_args()
+    settings = {'finger_threshold': 0.08, 'gesture_threshold': 0.1,
+                'inference_scale': args.scale, 'roi_padding': args.padding}
+    print(json.dumps(benchmark(args.recording, lambda: mp.solutions.hands.Hands(
+        static_image_mode=False, max_num_hands=1, min_detection_confidence=0.7,
+        min_tracking_confidence=0.5), settings), indent=2))
@@ -0,0 +1,386 @@
+"""Headless snake rules: a single-board engine, a multi-snake board and a NumPy batch engine.
+
+Neither engine sleeps or touches the camera, so games can be simulated far
+faster than real time (bots, gesture-threshold sweeps, regression tests).
+Both record replays in the same format, which `replay()` re-runs on the
+single-board engine:
+
+    {'board': {'cols', 'rows', 'cell_size'}, 'seed': ...,
+     'directions': [d0, d1, ...],          # direction applied at each tick
+     'apples': [[tick, cell_index], ...],  # apple placements (tick 0 = initial)
+     'ticks': n, 'score': s, 'game_over': bool}
+"""
+import time
+
+import numpy as np
+
+from game_logic import SnakeBody, AppleSpawner, DIRECTION_STEPS, initial_snake, starting_snakes
+
+
+class SnakeEngine:
+    """Movement, wrap-around, apple and self-collision rules for one board.
+
+    `step()` advances one tick. When `record` is set the applied directions
+    and apple placements are kept so the run can be exported with
+    `to_replay()`.
+    """
+
+    def __init__(self, cols=50, rows=50, cell_size=10, seed=None, record=False, apple=None):
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.seed = seed
+        self.spawner = AppleSpawner(cols, rows, seed=seed)
+        self.body = SnakeBody(initial_snake(cols, rows, cell_size), cols, rows, cell_size,
+                              free_cells=self.spawner.free_cells)
+        self.head = self.body.position(self.body.head)
+        self.direction = 1  # 0: Left, 1: Right, 2: Up, 3: Down
+        self.score = 0
+        self.game_over = False
+        self.tick = 0
+        self.record = record
+        self.directions = []
+        self.apples = []
+        self.apple = self._place_apple(apple)
+
+    def _place_apple(self, cell=None):
+        # Drawn from the free-cell set, so the apple never lands on the snake
+        if cell is None:
+            cell = self.spawner.spawn()
+        if self.record and cell is not None:
+            self.apples.append([self.tick, cell])
+        return self.body.position(cell) if cell is not None else None
+
+    def step(self, direction=None, apple=None):
+        """Advance one tick, optionally steering first.
+
+        `apple` forces the next apple cell if one is eaten (used by replays).
+        Returns True when an apple was eaten; a finished game doesn't move.
+        """
+        if self.game_over:
+            return False
+        if direction is not None:
+            self.direction = direction
+        if self.record:
+            self.directions.append(self.direction)
+        dx, dy = DIRECTION_STEPS[self.direction]
+        # Wrap around edges so opposite edges are connected (toroidal board)
+        self.head[0] = (self.head[0] + dx * self.cell_size) % (self.cols * self.cell_size)
+        self.head[1] = (self.head[1] + dy * self.cell_size) % (self.rows * self.cell_size)
+        self.tick += 1
+
+        ate_apple = self.head == self.apple
+        self.body.advance(self.body.index(*self.head), grow=ate_apple)
+        if ate_apple:
+            self.score += 1
+            self.apple = self._place_apple(apple)
+
+        # Only self-collision ends the game; boundaries wrap
+        if self.body.collided:
+            self.game_over = True
+        return ate_apple
+
+    @classmethod
+    def restore(cls, cols, rows, cell_size, cells, direction, apple_cell, score=0, tick=0, game_over=False):
+        """Engine in a saved state: body `cells` (packed indices, head first), apple cell or None."""
+        engine = cls(cols, rows, cell_size)
+        engine.spawner = AppleSpawner(cols, rows)
+        engine.body = SnakeBody([engine.body.position(cell) for cell in cells], cols, rows, cell_size,
+                                free_cells=engine.spawner.free_cells)
+        engine.head = engine.body.position(engine.body.head)
+        engine.apple = engine.body.position(apple_cell) if apple_cell is not None else None
+        engine.direction = direction
+        engine.score = score
+        engine.tick = tick
+        engine.game_over = game_over
+        return engine
+
+    def to_replay(self):
+        return {
+            'board': {'cols': self.cols, 'rows': self.rows, 'cell_size': self.cell_size},
+            'seed': self.seed,
+            'directions': list(self.directions),
+            'apples': [list(a) for a in self.apples],
+            'ticks': self.tick,
+            'score': self.score,
+            'game_over': self.game_over,
+        }
+
+
+def replay(record):
+    """Re-run a recorded game on SnakeEngine and return the final engine."""
+    board = record['board']
+    apples = {tick: cell for tick, cell in record['apples']}
+    engine = SnakeEngine(board['cols'], board['rows'], board['cell_size'], seed=record.get('seed'),
+                         record=True, apple=apples.get(0))
+    for tick, direction in enumerate(record['directions'], start=1):
+        engine.step(direction, apple=apples.get(tick))
+    return engine
+
+
+class PlayerSnake:
+    """One player's snake on a shared board."""
+
+    __slots__ = ('body', 'head', 'direction', 'score', 'alive')
+
+    def __init__(self, body):
+        self.body = body
+        self.head = body.position(body.head) if len(body) else [0, 0]
+        self.direction = 1
+        self.score = 0
+        self.alive = True
+
+
+class MultiSnakeEngine:
+    """N snakes on one board, steered independently (one camera, several hands).
+
+    Every tick the live snakes move one after another in player order on a
+    shared occupancy map. A snake whose head lands on any body (its own,
+    another snake's, or a head that already moved this tick) dies and is
+    taken off the board. All snakes chase one shared apple; once eaten, the
+    next one appears after every snake has moved, so there is at most one
+    spawn per tick. The game is over once every snake is dead. `direction`
+    and `score` refer to player 0 and the total, so single-snake callers
+    keep working.
+    """
+
+    def __init__(self, players, cols=50, rows=50, cell_size=10, seed=None):
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.seed = seed
+        self.spawner = AppleSpawner(cols, rows, seed=seed)
+        occupied = bytearray(cols * rows)
+        self.snakes = [PlayerSnake(SnakeBody(positions, cols, rows, cell_size,
+                                             free_cells=self.spawner.free_cells, occupied=occupied))
+                       for positions in starting_snakes(players, cols, rows, cell_size)]
+        self.game_over = False
+        self.tick = 0
+        cell = self.spawner.spawn()
+        self.apple = self.snakes[0].body.position(cell) if cell is not None else None
+
+    @classmethod
+    def restore(cls, cols, rows, cell_size, snakes, apple_cell, tick=0, game_over=False):
+        """Engine in a saved state; `snakes` holds (cells, direction, alive, score) per player."""
+        engine = cls(len(snakes), cols, rows, cell_size)
+        engine.spawner = AppleSpawner(cols, rows)
+        occupied = bytearray(cols * rows)
+        engine.snakes = []
+        for cells, direction, alive, score in snakes:
+            positions = [[cell % cols * cell_size, cell // cols * cell_size] for cell in cells]
+            body = SnakeBody(positions, cols, rows, cell_size, free_cells=engine.spawner.free_cells,
+                             occupied=occupied)
+            snake = PlayerSnake(body)
+            snake.direction, snake.alive, snake.score = direction, alive, score
+            engine.snakes.append(snake)
+        engine.apple = engine.snakes[0].body.position(apple_cell) if apple_cell is not None else None
+        engine.tick = tick
+        engine.game_over = game_over
+        return engine
+
+    @property
+    def players(self):
+        return len(self.snakes)
+
+    @property
+    def direction(self):
+        return self.snakes[0].direction
+
+    @direction.setter
+    def direction(self, direction):
+        self.snakes[0].direction = direction
+
+    @property
+    def score(self):
+        return sum(snake.score for snake in self.snakes)
+
+    def step(self, directions=None, apple=None):
+        """Advance one tick; `directions` optionally steers each player first (None = keep).
+
+        `apple` forces the next apple cell if one is eaten (used by replays).
+        Returns, per player, whether that snake ate the apple this tick.
+        """
+        eaten = [False] * len(self.snakes)
+        if self.game_over:
+            return eaten
+        width = self.cols * self.cell_size
+        height = self.rows * self.cell_size
+        self.tick += 1
+        for player, snake in enumerate(self.snakes):
+            if not snake.alive:
+                continue
+            if directions is not None and directions[player] is not None:
+                snake.direction = directions[player]
+            dx, dy = DIRECTION_STEPS[snake.direction]
+            head = snake.head
+            head[0] = (head[0] + dx * self.cell_size) % width
+            head[1] = (head[1] + dy * self.cell_size) % height
+            ate_apple = head == self.apple
+            body = snake.body
+            body.advance(body.index(*head), grow=ate_apple)
+            if body.collided:
+                snake.alive = False
+                body.release()
+                continue
+            if ate_apple:
+                eaten[player] = True
+                snake.score += 1
+                self.apple = None
+        if any(eaten):
+            cell = apple if apple is not None else self.spawner.spawn()
+            self.apple = self.snakes[0].body.position(cell) if cell is not None else None
+        self.game_over = not any(snake.alive for snake in self.snakes)
+        return eaten
+
+
+# Direction -> cell delta lookup tables for the vectorized engine
+_STEP_X = np.array([DIRECTION_STEPS[d][0] for d in range(4)], dtype=np.int32)
+_STEP_Y = np.array([DIRECTION_STEPS[d][1] for d in range(4)], dtype=np.int32)
+
+
+class BatchSnakeEngine:
+    """Steps B independent boards at once with NumPy.
+
+    Per-board state lives in arrays: head column/row, direction, apple cell,
+    score, game-over flag, an occupancy count map of shape (B, cells) and
+    the body as a ring buffer of cell indices (head pointer + length), so a
+    tick is a handful of vectorized operations regardless of B. Rules match
+    SnakeEngine exactly; only the apple RNG differs, which is why replays
+    record apple placements.
+    """
+
+    def __init__(self, boards, cols=50, rows=50, cell_size=10, seed=None, record=False):
+        self.boards = boards
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.cells = cols * rows
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.record = record
+
+        capacity = self.cells + 1
+        self._capacity = capacity
+        self.body = np.zeros((boards, capacity), dtype=np.int32)
+        self.occupancy = np.zeros((boards, self.cells), dtype=np.uint8)
+        self.head_ptr = np.zeros(boards, dtype=np.int64)
+        self.length = np.zeros(boards, dtype=np.int64)
+
+        start = [(y // cell_size) * cols + x // cell_size for x, y in initial_snake(cols, rows, cell_size)]
+        self.body[:, :len(start)] = start
+        self.length[:] = len(start)
+        self.occupancy[:, start] = 1
+        self.head_x = np.full(boards, start[0] % cols, dtype=np.int32)
+        self.head_y = np.full(boards, start[0] // cols, dtype=np.int32)
+        self.direction = np.ones(boards, dtype=np.int8)
+        self.score = np.zeros(boards, dtype=np.int64)
+        self.game_over = np.zeros(boards, dtype=bool)
+        self.ticks = np.zeros(boards, dtype=np.int64)
+        self.apple = np.full(boards, -1, dtype=np.int64)
+
+        self._directions = []
+        self._apples = [[] for _ in range(boards)]
+        self._spawn(np.arange(boards))
+
+    def _spawn(self, boards):
+        """Place a uniform free-cell apple on each listed board (-1 when full)."""
+        for b in boards:
+            free = np.flatnonzero(self.occupancy[b] == 0)
+            cell = int(free[self.rng.integers(len(free))]) if len(free) else -1
+            self.apple[b] = cell
+            if self.record and cell >= 0:
+                self._apples[b].append([int(self.ticks[b]), cell])
+
+    def step(self, directions=None):
+        """Advance every live board one tick; `directions` is an optional (B,) array."""
+        if directions is not None:
+            self.direction = np.where(self.game_over, self.direction, directions).astype(np.int8)
+        if self.record:
+            self._directions.append(self.direction.copy())
+        live = np.flatnonzero(~self.game_over)
+        if not len(live):
+            return live
+
+        d = self.direction[live]
+        self.head_x[live] = (self.head_x[live] + _STEP_X[d]) % self.cols
+        self.head_y[live] = (self.head_y[live] + _STEP_Y[d]) % self.rows
+        new_head = self.head_y[live] * self.cols + self.head_x[live]
+        self.ticks[live] += 1
+
+        ate = new_head == self.apple[live]
+        # Vacate the tail first so following your own tail stays legal
+        movers = live[~ate]
+        tail = self.body[movers, (self.head_ptr[movers] + self.length[movers] - 1) % self._capacity]
+        self.occupancy[movers, tail] -= 1
+        self.length[movers] -= 1
+
+        self.game_over[live] = self.occupancy[live, new_head] > 0
+        self.head_ptr[live] = (self.head_ptr[live] - 1) % self._capacity
+        self.body[live, self.head_ptr[live]] = new_head
+        self.occupancy[live, new_head] += 1
+        self.length[live] += 1
+
+        eaters = live[ate]
+        self.score[eaters] += 1
+        self._spawn(eaters)
+        return live
+
+    def positions(self, board):
+        """Body of one board as [x, y] pixel pairs, head first (the /game_state format)."""
+        idx = (self.head_ptr[board] + np.arange(self.length[board])) % self._capacity
+        cells = self.body[board, idx]
+        return [[int(c % self.cols) * self.cell_size, int(c // self.cols) * self.cell_size] for c in cells]
+
+    def to_replays(self):
+        """One replay record per board (directions are trimmed at game over)."""
+        directions = np.stack(self._directions, axis=1) if self._directions else np.zeros((self.boards, 0))
+        return [{
+            'board': {'cols': self.cols, 'rows': self.rows, 'cell_size': self.cell_size},
+            'seed': self.seed,
+            'directions': directions[b, :self.ticks[b]].astype(int).tolist(),
+            'apples': [list(a) for a in self._apples[b]],
+            'ticks': int(self.ticks[b]),
+            'score': int(self.score[b]),
+            'game_over': bool(self.game_over[b]),
+        } for b in range(self.boards)]
+
+
+def random_turns(rng, direction, turn_probability=0.1):
+    """Simple bot policy: keep going, occasionally pick a random direction."""
+    turn = rng.random(direction.shape) < turn_probability
+    return np.where(turn, rng.integers(0, 4, direction.shape), direction)
+
+
+def benchmark(boards=1024, steps=1000, seed=0):
+    """Steps/second for the scalar and batch engines under the random-turn bot."""
+    rng = np.random.default_rng(seed)
+    engine = SnakeEngine(seed=seed)
+    started = time.perf_counter()
+    scalar_steps = 0
+    for _ in range(steps):
+        if engine.game_over:
+            engine = SnakeEngine(seed=seed)
+        engine.step(int(random_turns(rng, np.array([engine.direction]))[0]))
+        scalar_steps += 1
+    scalar_rate = scalar_steps / (time.perf_counter() - started)
+
+    batch = BatchSnakeEngine(boards, seed=seed)
+    started = time.perf_counter()
+    board_steps = 0
+    for _ in range(steps):
+        board_steps += len(batch.step(random_turns(rng, batch.direction)))
+    batch_rate = board_steps / (time.perf_counter() - started)
+    return {'scalar_steps_per_sec': round(scalar_rate), 'batch_board_steps_per_sec': round(batch_rate),
+            'boards': boards, 'steps': steps}
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Headless snake engine throughput")
+    parser.add_argument('--boards', type=int, default=1024)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.boards, args.steps, args.seed), indent=2))
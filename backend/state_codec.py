@@ -0,0 +1,74 @@
+"""Compact binary encoding of the /game_state snapshot.
+
+`/game_state?format=binary` answers with `application/octet-stream`; all
+integers are little-endian:
+
+    offset  type          field
+    0       uint8         format version (1)
+    1       uint8         flags: bit 0 = game over, bit 1 = apple present
+    2       int8          button_direction (0 Left, 1 Right, 2 Up, 3 Down)
+    3       int8          current_direction (gesture; -1 = None)
+    4       uint32        tick
+    8       uint16 x 3    board cols, rows, cell_size
+    14      uint16        snake length n
+    16      uint16 x n    body cells, head first, packed as row * cols + col
+    16+2n   uint16        apple cell (0xFFFF when there is none)
+    18+2n   uint32        score
+
+That is 22 + 2n bytes against ~10n for the JSON `[[x, y], ...]` list.
+Pixel coordinates are `(cell % cols * cell_size, cell // cols * cell_size)`.
+"""
+import struct
+
+import numpy as np
+
+from gesture_features import DIRECTION_NAMES
+
+VERSION = 1
+CONTENT_TYPE = 'application/octet-stream'
+NO_APPLE = 0xFFFF
+MAX_CELLS = NO_APPLE  # Cell indices must fit a uint16 below the no-apple marker
+
+FLAG_GAME_OVER = 1
+FLAG_APPLE = 2
+
+HEADER = struct.Struct('<BBbbIHHHH')
+TRAILER = struct.Struct('<HI')
+CELL = np.dtype('<u2')
+DIRECTION_CODES = {name: code for code, name in DIRECTION_NAMES.items()}
+
+
+def pack_state(tick, cells, length, apple_cell, score, game_over, button_direction, current_direction,
+               cols, rows, cell_size):
+    """Encode one snapshot; `cells` iterates over `length` packed body cell indices, head first."""
+    if cols * rows > MAX_CELLS:
+        raise ValueError(f"Board of {cols}x{rows} cells is too large for the binary format")
+    body = np.fromiter(cells, CELL, length)
+    flags = (FLAG_GAME_OVER if game_over else 0) | (FLAG_APPLE if apple_cell is not None else 0)
+    header = HEADER.pack(VERSION, flags, button_direction, DIRECTION_CODES.get(current_direction, -1),
+                         tick, cols, rows, cell_size, length)
+    trailer = TRAILER.pack(NO_APPLE if apple_cell is None else apple_cell, score)
+    return b''.join((header, body.tobytes(), trailer))
+
+
+def unpack_state(payload):
+    """Decode a binary snapshot into the same dict shape as the JSON /game_state."""
+    version, flags, button_direction, current, tick, cols, rows, cell_size, length = HEADER.unpack_from(payload)
+    if version != VERSION:
+        raise ValueError(f"Unsupported game state format version {version}")
+    body = np.frombuffer(payload, CELL, length, HEADER.size).tolist()
+    apple_cell, score = TRAILER.unpack_from(payload, HEADER.size + 2 * length)
+
+    def position(cell):
+        return [cell % cols * cell_size, cell // cols * cell_size]
+
+    return {
+        'tick': tick,
+        'snake': [position(cell) for cell in body],
+        'apple': position(apple_cell) if flags & FLAG_APPLE else None,
+        'score': score,
+        'game_over': bool(flags & FLAG_GAME_OVER),
+        'current_direction': DIRECTION_NAMES.get(current, "None"),
+        'button_direction': button_direction,
+        'board': {'width': cols * cell_size, 'height': rows * cell_size, 'cell_size': cell_size},
+    }
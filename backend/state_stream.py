@@ -0,0 +1,135 @@
+"""Server-Sent Events fan-out for per-tick game state updates."""
+import json
+import threading
+import time
+from collections import deque
+
+from async_notify import ThreadNotifier
+
+
+def format_sse(event, data):
+    """Serialize one SSE message; `data` is JSON-encoded once for all clients."""
+    payload = json.dumps(data, separators=(',', ':'))
+    return f"event: {event}\ndata: {payload}\n\n".encode('utf-8')
+
+
+class StateBroadcaster:
+    """Keeps a short backlog of pre-encoded SSE messages for every client.
+
+    The game loop publishes one `delta` per tick (or a `snapshot` after a
+    reset). Each client keeps its own cursor; a client that falls further
+    behind than the backlog is resynchronised with a fresh snapshot instead
+    of receiving a partial delta history.
+
+    The optional `on_deliver(seq, published_at)` hook is called once a
+    client's generator resumes after a message was yielded, i.e. after the
+    server has written it out.
+
+    `stream()` blocks a thread per client; `stream_async()` is the same
+    stream for an asyncio server and only holds a coroutine.
+
+    Publishers must hold `lock` while they change the state and publish it
+    (the session lock), and `snapshot()` is called under it. A snapshot and
+    the sequence number it is current at are thus taken atomically: a client
+    never gets a delta already contained in its snapshot, or an old delta
+    after a newer reset snapshot.
+    """
+
+    def __init__(self, snapshot, backlog=256, on_deliver=None, lock=None):
+        self.snapshot = snapshot
+        self.lock = lock or threading.Lock()
+        self.on_deliver = on_deliver
+        self._cond = threading.Condition()
+        self._messages = deque(maxlen=backlog)
+        self._seq = 0
+        self.subscribers = 0
+        self.published = 0
+        self.notifier = ThreadNotifier()
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def publish(self, event, data):
+        message = format_sse(event, data)
+        with self._cond:
+            self._seq += 1
+            self._messages.append((self._seq, message, time.time()))
+            self.published += 1
+            self._cond.notify_all()
+        self.notifier.notify()
+
+    def _snapshot(self):
+        """A snapshot message and the sequence number it is current at.
+
+        Taken under the publishers' lock but outside the condition, so
+        publishers (which hold the lock, then the condition) never deadlock.
+        """
+        with self.lock:
+            snapshot = self.snapshot()
+            with self._cond:
+                seq = self._seq
+        return [(seq, format_sse('snapshot', snapshot), None)], seq
+
+    def _collect(self, last_seq):
+        """Messages after `last_seq`, or None if they fell out of the backlog; caller holds the condition."""
+        if not self._messages or self._messages[0][0] > last_seq + 1:
+            return None
+        return [entry for entry in self._messages if entry[0] > last_seq]
+
+    def _delivered(self, pending):
+        if self.on_deliver is not None:
+            for seq, _, published_at in pending:
+                if published_at is not None:
+                    self.on_deliver(seq, published_at)
+
+    def stream(self, keepalive=15.0):
+        """Generator yielding SSE bytes for one client, starting with a snapshot."""
+        with self._cond:
+            self.subscribers += 1
+        try:
+            pending, last_seq = self._snapshot()
+            yield pending[0][1]
+            while True:
+                with self._cond:
+                    ready = self._cond.wait_for(lambda: self._seq > last_seq, keepalive)
+                    pending = self._collect(last_seq) if ready else None
+                    if pending is not None:
+                        last_seq = pending[-1][0]
+                if not ready:
+                    yield b": keepalive\n\n"
+                    continue
+                if pending is None:
+                    pending, last_seq = self._snapshot()  # Fell behind the backlog: resync
+                yield b''.join(message for _, message, _ in pending)
+                self._delivered(pending)
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+    async def stream_async(self, send, keepalive=15.0):
+        """Write the SSE stream for one client with `await send(bytes)` until cancelled."""
+        with self._cond:
+            self.subscribers += 1
+        try:
+            pending, last_seq = self._snapshot()
+            await send(pending[0][1])
+            while True:
+                waiter = self.notifier.waiter()
+                with self._cond:
+                    ready = self._seq > last_seq
+                    pending = self._collect(last_seq) if ready else None
+                    if pending is not None:
+                        last_seq = pending[-1][0]
+                if not ready:
+                    if not await self.notifier.wait(waiter, keepalive):
+                        await send(b": keepalive\n\n")
+                    continue
+                self.notifier.discard(waiter)
+                if pending is None:
+                    pending, last_seq = self._snapshot()  # Fell behind the backlog: resync
+                await send(b''.join(message for _, message, _ in pending))
+                self._delivered(pending)
+        finally:
+            with self._cond:
+                self.subscribers -= 1
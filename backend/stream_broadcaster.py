@@ -0,0 +1,288 @@
+"""Encode-once MJPEG broadcaster fanned out to every /video_feed client."""
+import asyncio
+import itertools
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from async_notify import ThreadNotifier
+
+QUALITY_STEP = 10  # Adaptive qualities move in steps so clients land on shared variants
+MIN_QUALITY = 30
+
+
+class StreamSubscriber:
+    """Per-client cursor, stream profile and quality controller.
+
+    A subscriber only ever receives the newest JPEG; frames produced while
+    the client was still busy sending the previous one are counted as drops
+    instead of being queued. `width`, `quality` and `max_fps` are the
+    client's requested profile. The controller compares how long each frame
+    takes to drain into the socket (`record_send`) with the camera frame
+    interval: a client that can't keep up first gets a lower JPEG quality
+    (down to MIN_QUALITY), then is paced to the rate it actually drains at.
+    Once sends are quick again, quality climbs back and pacing eases off.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, width=None, quality=85, max_fps=None):
+        self.id = next(self._ids)
+        self.connected_at = time.time()
+        self.last_seq = 0
+        self.sent = 0
+        self.dropped = 0
+        self.width = width
+        self.target_quality = quality
+        self.quality = quality
+        self.max_fps = max_fps
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.pace_interval = 0.0  # Extra spacing imposed on a client that can't drain fast enough
+        self.send_time = 0.0  # EMA of how long a frame takes to drain into the socket
+        self.next_due = 0.0
+
+    @property
+    def profile(self):
+        return self.width, self.quality
+
+    def record_send(self, duration, frame_interval):
+        """Feed one measured send time into the quality/pacing controller."""
+        self.send_time = duration if not self.send_time else 0.8 * self.send_time + 0.2 * duration
+        budget = frame_interval or 1 / 30
+        if self.send_time > 0.8 * budget:
+            if self.quality > MIN_QUALITY:
+                self.quality = max(MIN_QUALITY, self.quality - QUALITY_STEP)
+                self.send_time *= 0.5  # Give the new quality a few frames before judging it
+            else:
+                self.pace_interval = 1.2 * self.send_time
+        elif self.send_time < 0.3 * budget:
+            if self.pace_interval:
+                self.pace_interval = max(0.0, self.pace_interval - 0.1 * budget)
+            elif self.quality < self.target_quality:
+                self.quality = min(self.target_quality, self.quality + QUALITY_STEP)
+        self.next_due = time.perf_counter() + max(self.min_interval, self.pace_interval) - duration
+
+    def stats(self):
+        return {
+            'id': self.id,
+            'connected_for': round(time.time() - self.connected_at, 1),
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'width': self.width,
+            'quality': self.quality,
+            'target_quality': self.target_quality,
+            'max_fps': self.max_fps,
+            'send_time': round(self.send_time, 6),
+            'paced_fps': round(1 / self.pace_interval, 1) if self.pace_interval else None,
+        }
+
+
+class MjpegBroadcaster:
+    """Turns hub frames into shared JPEG variants for all subscribers.
+
+    `annotate(packet)` returns the frame to encode (mirroring, overlay) and
+    `placeholder()` supplies a frame while the camera is unavailable. The
+    annotation thread only runs while at least one client is subscribed.
+    Encoding happens on demand per (width, quality) variant: the first
+    client that needs a variant of the newest frame encodes it and every
+    other client with the same profile reuses those bytes. `next_frame()`
+    blocks a thread per client; `next_frame_async()` waits on the event loop
+    and only borrows an executor thread to encode a cache miss.
+    """
+
+    def __init__(self, hub, annotate, placeholder, quality=85, placeholder_interval=0.1):
+        self.hub = hub
+        self.annotate = annotate
+        self.placeholder = placeholder
+        self.quality = quality
+        self.placeholder_interval = placeholder_interval
+        self._cond = threading.Condition()
+        self._subscribers = {}
+        self._seq = 0
+        self._frame = None
+        self._published_at = None
+        self._variants = {}  # (width, quality) -> (seq, jpeg bytes)
+        self._variant_locks = {}  # (width, quality) -> lock serializing that variant's encode
+        self._scaled = {}  # (width, quality) -> reused resize buffer, guarded by that variant's lock
+        self._thread = None
+        self.frame_interval = 0.0  # EMA of the time between annotated frames
+        self.annotated_frames = 0
+        self.encoded_frames = 0
+        self.cache_hits = 0
+        self.encode_errors = 0
+        self.notifier = ThreadNotifier()
+
+    @property
+    def subscriber_count(self):
+        with self._cond:
+            return len(self._subscribers)
+
+    def subscribe(self, width=None, quality=None, max_fps=None):
+        subscriber = StreamSubscriber(width, quality or self.quality, max_fps)
+        with self._cond:
+            self._subscribers[subscriber.id] = subscriber
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='mjpeg-encoder', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._cond:
+            self._subscribers.pop(subscriber.id, None)
+            # Forget variants, their locks and resize buffers no remaining client asks for
+            profiles = {s.profile for s in self._subscribers.values()}
+            for key in (self._variants.keys() | self._variant_locks.keys() | self._scaled.keys()) - profiles:
+                self._variants.pop(key, None)
+                self._variant_locks.pop(key, None)
+                self._scaled.pop(key, None)
+            self._cond.notify_all()
+
+    def next_frame(self, subscriber, timeout=1.0):
+        """Block until a frame newer than the subscriber's last one exists; return its JPEG.
+
+        The frame is encoded for the subscriber's current profile, or taken
+        from the variant cache if another client already encoded it.
+        """
+        wait = subscriber.next_due - time.perf_counter()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > subscriber.last_seq, timeout):
+                return None
+            seq, frame = self._claim(subscriber)
+        jpeg = self._variant(seq, frame, subscriber.width, subscriber.quality)
+        if jpeg is not None:
+            subscriber.sent += 1
+        return jpeg
+
+    async def next_frame_async(self, subscriber, timeout=1.0, executor=None):
+        """`next_frame()` for asyncio servers; returns None on timeout."""
+        wait = subscriber.next_due - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(min(wait, timeout))
+        waiter = self.notifier.waiter()
+        with self._cond:
+            claimed = self._claim(subscriber) if self._seq > subscriber.last_seq else None
+        if claimed is None:
+            if not await self.notifier.wait(waiter, timeout):
+                return None
+            with self._cond:
+                if self._seq <= subscriber.last_seq:
+                    return None
+                claimed = self._claim(subscriber)
+        else:
+            self.notifier.discard(waiter)
+        seq, frame = claimed
+        jpeg = self._cached(seq, subscriber.profile)
+        if jpeg is None:
+            jpeg = await asyncio.get_running_loop().run_in_executor(
+                executor, self._variant, seq, frame, subscriber.width, subscriber.quality)
+        if jpeg is not None:
+            subscriber.sent += 1
+        return jpeg
+
+    def _claim(self, subscriber):
+        """Hand the newest frame to a subscriber, counting skipped ones; caller holds the condition."""
+        if subscriber.last_seq:
+            subscriber.dropped += self._seq - subscriber.last_seq - 1
+        subscriber.last_seq = self._seq
+        return self._seq, self._frame
+
+    def record_send(self, subscriber, duration):
+        subscriber.record_send(duration, self.frame_interval)
+
+    def _cached(self, seq, key):
+        """JPEG of frame `seq` (or newer) for profile `key` if already encoded."""
+        with self._cond:
+            cached = self._variants.get(key)
+            if cached is not None and cached[0] >= seq:
+                self.cache_hits += 1
+                return cached[1]
+            return None
+
+    def _variant(self, seq, frame, width, quality):
+        key = (width, quality)
+        jpeg = self._cached(seq, key)
+        if jpeg is not None:
+            return jpeg
+        with self._cond:
+            lock = self._variant_locks.setdefault(key, threading.Lock())
+        with lock:
+            # Another client with this profile may have encoded it meanwhile
+            jpeg = self._cached(seq, key)
+            if jpeg is not None:
+                return jpeg
+            jpeg = self._encode(self._resize(key, frame, width), quality)
+            if jpeg is not None:
+                with self._cond:
+                    self._variants[key] = (seq, jpeg)
+            return jpeg
+
+    def _resize(self, key, frame, width):
+        if not width or width >= frame.shape[1]:
+            return frame
+        height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+        shape = (height, width) + frame.shape[2:]
+        scaled = self._scaled.get(key)
+        if scaled is None or scaled.shape != shape:
+            scaled = self._scaled[key] = np.empty(shape, dtype=frame.dtype)
+        return cv2.resize(frame, (width, height), dst=scaled, interpolation=cv2.INTER_AREA)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'subscribers': len(self._subscribers),
+                'annotated_frames': self.annotated_frames,
+                'encoded_frames': self.encoded_frames,
+                'cache_hits': self.cache_hits,
+                'encode_errors': self.encode_errors,
+                'variants': [{'width': w, 'quality': q} for w, q in self._variants],
+                'frame_interval': round(self.frame_interval, 6),
+                'clients': [s.stats() for s in self._subscribers.values()],
+            }
+
+    def _publish(self, frame):
+        now = time.perf_counter()
+        with self._cond:
+            if self._published_at is not None:
+                interval = now - self._published_at
+                self.frame_interval = interval if not self.frame_interval else \
+                    0.9 * self.frame_interval + 0.1 * interval
+            self._published_at = now
+            self._seq += 1
+            self._frame = frame
+            self.annotated_frames += 1
+            self._cond.notify_all()
+        self.notifier.notify()
+
+    def _encode(self, frame, quality=None):
+        try:
+            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality or self.quality])
+        except Exception as encode_err:
+            print(f"Video stream encode error: {encode_err}")
+            ret = False
+        if not ret:
+            self.encode_errors += 1
+            return None
+        self.encoded_frames += 1
+        return buffer.tobytes()
+
+    def _run(self):
+        last_seq = 0
+        while True:
+            with self._cond:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            if self.hub.running:
+                packet = self.hub.wait_next(last_seq, timeout=1.0)
+                if packet is None:
+                    continue
+                last_seq = packet.seq
+                frame = self.annotate(packet)
+            else:
+                frame = self.placeholder()
+                time.sleep(self.placeholder_interval)
+            self._publish(frame)
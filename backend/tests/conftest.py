@@ -0,0 +1,67 @@
+"""Shared helpers for the backend unit tests (run with `python -m pytest backend/tests`).
+
+Like the benchmarks, `app_module` imports the app against a synthetic
+landmark recording (REPLAY_PATH) and stops its scheduler and capture
+pipeline, so no webcam or background threads are involved.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from recording import LandmarkRecorder  # noqa: E402
+
+FRAME_SHAPE = (480, 640, 3)
+
+
+def synthetic_frame(shape=FRAME_SHAPE, seed=0):
+    """Smooth noise: compresses roughly like a camera image, unlike flat or white-noise frames."""
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, shape, dtype=np.uint8), (31, 31), 0)
+
+
+def open_hand(dx=0.25, dy=0.0):
+    """(21, 3) landmarks of an open hand pointing along (dx, dy) from a centred wrist."""
+    points = np.full((21, 3), [0.5, 0.5, 0.0])
+    for finger, tip in enumerate((4, 8, 12, 16, 20)):
+        spread = (finger - 2) * 0.03
+        points[tip, :2] = 0.5 + dx - spread * dy, 0.5 + dy + spread * dx
+    return points
+
+
+def as_landmarks(points):
+    """MediaPipe-style landmark objects (.x/.y/.z) for a (21, 3) array."""
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points]
+
+
+def hands_result(count):
+    """A `hands.process`-style result with `count` open hands pointing right, side by side."""
+    hands = []
+    for i in range(count):
+        points = open_hand()
+        points[:, 0] += (i + 0.5) / count - 0.5
+        hands.append(SimpleNamespace(landmark=as_landmarks(points)))
+    labels = [SimpleNamespace(classification=[SimpleNamespace(label=('Left', 'Right')[i % 2], score=1.0)])
+              for i in range(count)]
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=labels)
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('recordings') / 'frames.lmk')
+    recorder = LandmarkRecorder(path, frame_shape=FRAME_SHAPE)
+    for i in range(30):
+        recorder.write(i / 30, None, synthetic_frame(seed=i))
+    recorder.close()
+    os.environ['REPLAY_PATH'] = path
+    os.environ['GAME_LOG_DIR'] = str(tmp_path_factory.mktemp('game_logs'))
+    import app
+    app.scheduler.stop()
+    app.stop_capture_pipeline()
+    return app
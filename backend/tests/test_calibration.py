@@ -0,0 +1,31 @@
+"""POST /calibration rejects non-numeric values with 400 and leaves the settings untouched."""
+import pytest
+
+
+@pytest.fixture
+def client(app_module):
+    saved = dict(app_module.calibration_settings)
+    yield app_module.app.test_client()
+    app_module.calibration_settings.update(saved)
+
+
+@pytest.mark.parametrize('key', ['tick_interval', 'inference_scale', 'roi_padding', 'gesture_threshold',
+                                 'smoothing_tau', 'smoothing_confidence', 'index_window'])
+@pytest.mark.parametrize('value', ['x', None, [1], 'nan'])
+def test_bad_value_is_rejected(app_module, client, key, value):
+    before = dict(app_module.calibration_settings)
+    response = client.post('/calibration', json={'gesture_cooldown': 0.5, key: value})
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+    assert app_module.calibration_settings == before
+
+
+def test_values_are_clamped(app_module, client):
+    response = client.post('/calibration', json={'inference_scale': '5', 'tick_interval': 0})
+    assert response.status_code == 200
+    assert app_module.calibration_settings['inference_scale'] == 1.0
+    assert app_module.calibration_settings['tick_interval'] == 0.005
+
+
+def test_non_object_body_is_rejected(client):
+    assert client.post('/calibration', data='x', content_type='application/json').status_code == 400
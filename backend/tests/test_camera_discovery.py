@@ -0,0 +1,70 @@
+"""Camera discovery never blocks past its timeout and survives a bad cache file."""
+import json
+import threading
+import time
+
+import camera_discovery
+from camera_discovery import CameraDiscovery, LazyCamera
+
+
+class FakeCap:
+    def __init__(self, index):
+        self.index = index
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+def fake_devices(monkeypatch, hang=(), working=(0,)):
+    """Devices in `working` open at 640x480; devices in `hang` block until the returned event is set."""
+    unblock = threading.Event()
+    opened = []
+
+    def open_camera(index, backend, modes=camera_discovery.MODES):
+        if index in hang:
+            unblock.wait(5.0)
+        if index not in working:
+            return None, None
+        cap = FakeCap(index)
+        opened.append(cap)
+        return cap, (640, 480)
+
+    monkeypatch.setattr(camera_discovery, 'open_camera', open_camera)
+    monkeypatch.setattr(camera_discovery, 'candidate_indices', lambda max_index: [0, 1])
+    return unblock, opened
+
+
+def test_invalid_cache_falls_back_to_probe(tmp_path, monkeypatch):
+    fake_devices(monkeypatch)
+    cache = tmp_path / 'camera.json'
+    cache.write_text(json.dumps({'index': 1, 'backend': 200}))
+    discovery = CameraDiscovery(str(cache), timeout=1.0)
+    cap = discovery.discover()
+    assert cap.index == 0
+    assert not discovery.info['cache_hit']
+    assert json.loads(cache.read_text())['width'] == 640  # Rewritten with every key
+
+
+def test_hanging_cached_device_times_out(tmp_path, monkeypatch):
+    unblock, opened = fake_devices(monkeypatch, hang=(1,), working=(0, 1))
+    cache = tmp_path / 'camera.json'
+    cache.write_text(json.dumps({'index': 1, 'backend': 200, 'width': 640, 'height': 480}))
+    started = time.perf_counter()
+    cap = CameraDiscovery(str(cache), timeout=0.2).discover()
+    assert time.perf_counter() - started < 1.0
+    assert cap.index == 0
+    unblock.set()
+    deadline = time.monotonic() + 2.0
+    while len(opened) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert all(c.released for c in opened if c is not cap)  # Late opens are released
+
+
+def test_blocking_ensure_gives_up_after_timeout():
+    release = threading.Event()
+    lazy = LazyCamera(lambda: release.wait(5.0), timeout=0.1)
+    assert not lazy.ensure(block=True)
+    assert lazy.probing
+    release.set()
+    assert lazy.ensure(block=True)
@@ -0,0 +1,58 @@
+"""Pooled frame buffers are never handed out while a consumer still holds them."""
+import numpy as np
+import pytest
+
+from conftest import FRAME_SHAPE, synthetic_frame
+import frame_buffers
+from frame_buffers import BufferPool, FramePreparer
+
+
+def test_held_buffer_is_not_reused():
+    pool = BufferPool()
+    held = pool.take((4, 4))
+    assert pool.take((4, 4)) is not held
+    assert pool.in_use() == 1
+
+
+def test_view_keeps_buffer_busy():
+    pool = BufferPool()
+    view = pool.take((4, 4))[1:3]
+    first = id(view.base)
+    assert id(pool.take((4, 4))) != first
+    del view
+    assert id(pool.take((4, 4))) == first
+
+
+def test_released_buffers_are_reused_without_allocating():
+    pool = BufferPool()
+    for _ in range(10):
+        pool.take((4, 4))
+    assert pool.allocations == 1
+    pool.take((8, 8))
+    assert pool.stats()['buffers'] == 1  # A free buffer of another shape is reallocated, not kept
+
+
+def test_slow_consumer_frame_is_not_overwritten():
+    """A prepared frame held across many newer frames keeps its pixels (e.g. during a slow MediaPipe call)."""
+    preparer = FramePreparer()
+    base = synthetic_frame()
+    held = preparer.prepare(base)
+    rgb = held.rgb
+    expected = rgb.copy()
+    for i in range(1, 20):
+        frame = np.roll(base, i * 4, axis=1)
+        preparer.prepare(frame).rgb
+    assert np.array_equal(rgb, expected)
+    assert rgb.shape == FRAME_SHAPE
+    # Steady state: the frames dropped above were recycled
+    assert preparer.buffers.allocations <= 4
+
+
+def test_unsupported_interpreter_is_refused(monkeypatch):
+    frame_buffers._check_refcounts(frame_buffers.FREE_REFCOUNT)
+    monkeypatch.setattr(frame_buffers, 'SUPPORTED_PYTHON', ((3, 0), (3, 1)))
+    with pytest.raises(RuntimeError, match='GIL build of CPython'):
+        frame_buffers._check_refcounts(frame_buffers.FREE_REFCOUNT)
+    monkeypatch.undo()
+    with pytest.raises(RuntimeError, match='does not track'):
+        frame_buffers._check_refcounts(frame_buffers.FREE_REFCOUNT + 1)
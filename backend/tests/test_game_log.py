@@ -0,0 +1,68 @@
+"""Game log correctness: replay and audit on edge cases, lazy file creation and retention."""
+import os
+
+import numpy as np
+
+from game_log import FLAG_APPLE, HEADER_SIZE, NO_APPLE, GameLogReader, GameLogWriter, record_dtype
+from game_session import GameSession
+from snake_engine import SnakeEngine
+
+
+def full_board_log(tmp_path):
+    """A 4x1 board where the snake eats the last free cell on tick 1."""
+    logs = GameLogWriter(str(tmp_path))
+    engine = SnakeEngine.restore(4, 1, 10, [2, 1, 0], 1, 3)
+    log = logs.open('full', engine, 1)
+    for _ in range(2):
+        ate_apple = engine.step()
+        log.tick(engine, ate_apple)
+    logs.stop()
+    return GameLogReader(log.path)
+
+
+def test_full_board_logs_no_apple(tmp_path):
+    reader = full_board_log(tmp_path)
+    assert not reader.records['flags'][0] & FLAG_APPLE
+    assert reader.engine_at(1).apple is None
+    assert reader.engine_at(1, use_keyframes=False).score == 1
+    assert reader.audit()['verified']
+
+
+def test_full_board_old_format_replays(tmp_path):
+    """Logs written before the fix flag a spawn with NO_APPLE; the reader must not place it."""
+    path = full_board_log(tmp_path).path
+    records = np.memmap(path, dtype=record_dtype(1), mode='r+', offset=HEADER_SIZE)
+    records['flags'][0] |= FLAG_APPLE
+    records['apple'][0] = NO_APPLE
+    records.flush()
+    del records
+    reader = GameLogReader(path)
+    assert reader.engine_at(1).apple is None
+    assert reader.audit()['verified']
+
+
+def test_unplayed_game_leaves_no_files(tmp_path):
+    logs = GameLogWriter(str(tmp_path))
+    session = GameSession('idle', 20, 20, 10, seed=0, logs=logs)
+    session.reset()
+    assert not logs.running
+    session.step()
+    logs.sync()
+    name = os.path.basename(session.log.path)
+    assert sorted(os.listdir(tmp_path)) == [name, name + '.keys']
+    logs.stop()
+
+
+def test_retention_keeps_newest_logs(tmp_path):
+    logs = GameLogWriter(str(tmp_path), max_logs=3)
+    session = GameSession('keep', 20, 20, 10, seed=0, logs=logs)
+    paths = []
+    for _ in range(6):
+        session.reset()
+        session.step()
+        paths.append(session.log.path)
+        logs.sync()
+    logs.stop()
+    kept = sorted(name for name in os.listdir(tmp_path) if name.endswith('.glog'))
+    assert kept == sorted(os.path.basename(path) for path in paths[-3:])
+    assert logs.pruned == 3
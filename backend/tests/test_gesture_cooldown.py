@@ -0,0 +1,34 @@
+"""The default per-frame path gates camera turns with `gesture_cooldown`."""
+import itertools
+from types import SimpleNamespace
+
+
+def test_cooldown_is_the_default(app_module):
+    assert app_module.calibration_settings['smoothing_tau'] == 0
+
+
+def test_cooldown_gates_camera_turns(app_module, monkeypatch):
+    session = app_module.camera_session
+    session.reset()
+    seqs = itertools.count(app_module.last_result_seq + 1)
+    gestures = []
+
+    def poll(last_seq):
+        direction = gestures.pop(0)
+        return SimpleNamespace(seq=next(seqs), direction=direction, captured_at=0.0, processed_at=0.0)
+
+    monkeypatch.setattr(app_module.hand_tracker, 'poll', poll)
+    monkeypatch.setitem(app_module.calibration_settings, 'smoothing_tau', 0.0)
+    monkeypatch.setitem(app_module.calibration_settings, 'gesture_cooldown', 60.0)
+    session.last_gesture_time = 0.0
+
+    gestures[:] = [3, 2]
+    app_module.apply_camera_gesture(session)
+    assert session.button_direction == 3
+    app_module.apply_camera_gesture(session)  # Inside the cooldown: ignored
+    assert session.button_direction == 3
+
+    session.last_gesture_time -= 61.0
+    gestures[:] = [0]
+    app_module.apply_camera_gesture(session)
+    assert session.button_direction == 0
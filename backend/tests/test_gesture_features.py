@@ -0,0 +1,91 @@
+"""Live (`classify_hand`) and batch (`classify_sequence`) gesture decisions match the original per-frame rules."""
+import math
+
+import numpy as np
+import pytest
+
+from conftest import as_landmarks, open_hand
+from gesture_features import classify_hand, classify_sequence
+
+THRESHOLDS = [(0.08, 0.1), (0.12, 0.05)]
+
+
+def reference_direction(landmarks, prev_index, finger_threshold, threshold):
+    """The per-frame rules of app.get_hand_direction before they were vectorized; returns (direction, prev_index)."""
+    wrist = landmarks[0]
+    tips = [landmarks[i] for i in (4, 8, 12, 16, 20)]
+    extended = [math.sqrt((tip.x - wrist.x) ** 2 + (tip.y - wrist.y) ** 2) > finger_threshold for tip in tips]
+    if sum(extended) >= 3:
+        fingers = [tip for tip, out in zip(tips, extended) if out]
+        dx = sum(f.x for f in fingers) / len(fingers) - wrist.x
+        dy = sum(f.y for f in fingers) / len(fingers) - wrist.y
+        if abs(dx) > abs(dy):
+            if dx > threshold:
+                return 1, prev_index
+            elif dx < -threshold:
+                return 0, prev_index
+        else:
+            if dy > threshold:
+                return 3, prev_index
+            elif dy < -threshold:
+                return 2, prev_index
+    elif extended[1] and not any(extended[i] for i in [0, 2, 3, 4]):
+        index_tip = tips[1]
+        if prev_index is not None:
+            dx = index_tip.x - prev_index[0]
+            dy = index_tip.y - prev_index[1]
+            if abs(dx) > threshold or abs(dy) > threshold:
+                if abs(dx) > abs(dy):
+                    if dx > threshold:
+                        return 1, prev_index
+                    elif dx < -threshold:
+                        return 0, prev_index
+                else:
+                    if dy > threshold:
+                        return 3, prev_index
+                    elif dy < -threshold:
+                        return 2, prev_index
+        prev_index = (index_tip.x, index_tip.y)
+    return -1, prev_index
+
+
+def synthetic_hands(frames=1200, seed=0):
+    """Open hands near the thresholds, pointing index fingers on a random walk and fists."""
+    rng = np.random.default_rng(seed)
+    index_tip = np.array([0.5, 0.3])
+    for _ in range(frames):
+        pose = rng.choice(['open', 'index', 'index', 'fist'])
+        if pose == 'open':
+            points = open_hand(*rng.normal(0, 0.15, 2))
+        else:
+            points = np.full((21, 3), [0.5, 0.5, 0.0])
+            points[:, :2] += rng.normal(0, 0.02, (21, 2))  # Curled fingers stay near the wrist
+            if pose == 'index':
+                index_tip = np.clip(index_tip + rng.normal(0, 0.07, 2), 0.0, 1.0)
+                points[8, :2] = index_tip
+        yield points
+
+
+@pytest.fixture(scope='module')
+def landmark_sequence():
+    """(T, 21, 3) landmarks at MediaPipe's float32 precision, as a recording would store them."""
+    return np.stack(list(synthetic_hands())).astype(np.float32).astype(np.float64)
+
+
+@pytest.mark.parametrize('finger_threshold, gesture_threshold', THRESHOLDS)
+def test_live_and_batch_match_reference(landmark_sequence, finger_threshold, gesture_threshold):
+    reference, live = [], []
+    reference_prev = live_prev = None
+    for hand in landmark_sequence:
+        direction, reference_prev = reference_direction(as_landmarks(hand), reference_prev,
+                                                        finger_threshold, gesture_threshold)
+        reference.append(direction)
+        direction, live_prev = classify_hand(hand, live_prev, finger_threshold, gesture_threshold)
+        live.append(direction)
+    batch, batch_prev = classify_sequence(landmark_sequence, finger_threshold, gesture_threshold)
+
+    assert live == reference
+    assert batch.tolist() == reference
+    assert live_prev == batch_prev == reference_prev
+    # The data exercises every outcome, not just "no gesture"
+    assert set(reference) == {-1, 0, 1, 2, 3}
@@ -0,0 +1,39 @@
+"""With smoothing on, a stable direction survives tracker results the scheduler never polls."""
+import itertools
+from types import SimpleNamespace
+
+from conftest import as_landmarks, hands_result, open_hand
+from player_input import MultiPlayerInput
+
+FPS = 30
+POLL_EVERY = 3  # Ticks every 0.1 s see only every third result
+
+
+def test_slow_polling_still_applies_the_turn(app_module, monkeypatch):
+    monkeypatch.setitem(app_module.calibration_settings, 'smoothing_tau', 0.08)
+    app_module.gesture_smoother.configure(tau=0.08)
+    app_module.gesture_smoother.reset()
+    session = app_module.camera_session
+    session.reset()
+    assert session.button_direction == 1
+    down = SimpleNamespace(multi_hand_landmarks=[SimpleNamespace(landmark=as_landmarks(open_hand(0.0, 0.25)))])
+    seqs = itertools.count(app_module.last_result_seq + 1)
+    newest = []
+    monkeypatch.setattr(app_module.hand_tracker, 'poll', lambda last_seq: newest[-1])
+
+    for frame in range(2 * FPS):
+        t = frame / FPS
+        direction = app_module.smooth_direction(down, t)
+        newest.append(SimpleNamespace(seq=next(seqs), direction=direction, captured_at=t, processed_at=t))
+        if frame % POLL_EVERY == POLL_EVERY - 1:
+            app_module.apply_camera_gesture(session)
+    assert session.button_direction == 3
+
+
+def test_players_report_the_stable_direction_every_frame(app_module):
+    settings = dict(app_module.calibration_settings, smoothing_tau=0.08)
+    players = MultiPlayerInput(2, 'region', settings)
+    result = hands_result(2)
+    directions = [players.update(frame / FPS, result) for frame in range(FPS)]
+    first = next(i for i, d in enumerate(directions) if d != (-1, -1))
+    assert all(d == (1, 1) for d in directions[first:])
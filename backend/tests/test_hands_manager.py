@@ -0,0 +1,54 @@
+"""HandsManager reports the running configuration and retries failed rebuilds."""
+import time
+
+from hands_manager import HandsManager
+
+
+class FakeHands:
+    def __init__(self, *config):
+        self.config = config
+        self.closed = False
+
+    def process(self, image):
+        return self.config
+
+    def close(self):
+        self.closed = True
+
+
+def settle(manager, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while manager._building and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_failed_rebuild_keeps_config_and_retries():
+    failing = [True]
+
+    def factory(*config):
+        if failing[0] and config != (0.7, 0.5, 1):
+            raise RuntimeError('no graph')
+        return FakeHands(*config)
+
+    manager = HandsManager(factory, 0.7, 0.5)
+    assert manager.configure(0.8, 0.5)
+    settle(manager)
+    assert manager.config == (0.7, 0.5, 1)
+    assert manager.rebuild_failures == 1
+    failing[0] = False
+    assert manager.configure(0.8, 0.5)  # Same values again: retried, not a no-op
+    settle(manager)
+    assert manager.config == (0.7, 0.5, 1)  # Not swapped in until the next frame
+    assert manager.process(None) == (0.8, 0.5, 1)
+    assert manager.config == (0.8, 0.5, 1)
+    assert not manager.configure(0.8, 0.5)
+
+
+def test_reverting_drops_pending_build():
+    manager = HandsManager(FakeHands, 0.7, 0.5)
+    assert manager.configure(0.9, 0.5)
+    settle(manager)
+    pending = manager._pending[0]
+    assert not manager.configure(0.7, 0.5)
+    assert pending.closed
+    assert manager.process(None) == (0.7, 0.5, 1)
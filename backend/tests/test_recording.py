@@ -0,0 +1,30 @@
+"""A recording can be stopped while the tracker thread is still writing to it."""
+import threading
+
+from conftest import FRAME_SHAPE, hands_result, synthetic_frame
+from recording import LandmarkRecorder, LandmarkRecording
+
+
+def test_close_while_writing(tmp_path):
+    path = str(tmp_path / 'race.lmk')
+    recorder = LandmarkRecorder(path, max_hands=2, frame_shape=FRAME_SHAPE)
+    result, frame = hands_result(2), synthetic_frame()
+    errors = []
+
+    def tracker():
+        try:
+            while recorder.write(0.0, result, frame=frame):
+                pass
+        except Exception as write_err:
+            errors.append(write_err)
+
+    thread = threading.Thread(target=tracker)
+    thread.start()
+    while recorder.frames_written < 20 and thread.is_alive():
+        pass
+    recorder.close()
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert errors == []
+    assert len(LandmarkRecording(path)) == recorder.frames_written
+    assert not recorder.write(0.0, result)
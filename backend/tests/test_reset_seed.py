@@ -0,0 +1,23 @@
+"""`/reset?seed=` takes the same integer seed as a JSON-created session."""
+
+
+def test_query_seed_matches_json_seed(app_module):
+    client = app_module.app.test_client()
+    created = client.post('/sessions', json={'id': 'seeded', 'seed': 7})
+    assert created.status_code == 201
+    try:
+        assert client.get('/reset?session=seeded&seed=7').status_code == 200
+        query_apple = app_module.sessions.get('seeded').engine.apple
+        app_module.sessions.get('seeded').reset(7)
+        assert query_apple == app_module.sessions.get('seeded').engine.apple
+    finally:
+        client.delete('/sessions/seeded')
+
+
+def test_non_integer_seed_is_rejected(app_module):
+    client = app_module.app.test_client()
+    for path in ('/reset?seed=abc', '/reset?seed=1.5'):
+        response = client.get(path)
+        assert response.status_code == 400
+        assert response.get_json()['status'] == 'error'
+    assert client.post('/sessions', json={'seed': '7'}).status_code == 400
@@ -0,0 +1,46 @@
+"""ROI cropping falls back to full-frame detection instead of failing on every frame."""
+from types import SimpleNamespace
+
+from conftest import FRAME_SHAPE, synthetic_frame
+from frame_buffers import FramePreparer
+from roi_inference import RoiInference
+
+
+class FakeHands:
+    """Returns a hand at (x, y) (normalized, possibly off-frame); optionally fails on crops."""
+
+    def __init__(self, x, y, fail_on_crop=False):
+        self.x, self.y = x, y
+        self.fail_on_crop = fail_on_crop
+        self.shapes = []
+
+    def process(self, rgb):
+        self.shapes.append(rgb.shape)
+        if self.fail_on_crop and rgb.shape != FRAME_SHAPE:
+            raise RuntimeError('graph error')
+        landmarks = [SimpleNamespace(x=self.x + i * 0.001, y=self.y, z=0.0) for i in range(21)]
+        return SimpleNamespace(multi_hand_landmarks=[SimpleNamespace(landmark=landmarks)])
+
+
+def test_box_outside_the_frame_is_clamped():
+    preparer = FramePreparer()
+    hands = FakeHands(1.8, -0.7)  # Extrapolated landmarks, far outside the frame
+    inference = RoiInference(hands)
+    for _ in range(3):
+        result = inference.process(preparer.prepare(synthetic_frame()), padding=0.25)
+        assert result.multi_hand_landmarks
+    assert inference.last_mode == 'roi'
+    assert all(0 < shape[0] and 0 < shape[1] for shape in hands.shapes)
+
+
+def test_failing_crop_falls_back_to_full_frame():
+    preparer = FramePreparer()
+    hands = FakeHands(0.5, 0.5, fail_on_crop=True)
+    inference = RoiInference(hands)
+    modes = []
+    for _ in range(4):
+        inference.process(preparer.prepare(synthetic_frame()), padding=0.25)
+        modes.append(inference.last_mode)
+    assert modes == ['full'] * 4
+    assert inference.roi_misses == 3
+
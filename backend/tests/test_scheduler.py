@@ -0,0 +1,27 @@
+"""One failing session doesn't stop the shared scheduler thread."""
+import time
+
+from game_session import GameSession, SessionRegistry, SessionScheduler
+
+
+def test_failing_session_does_not_stop_the_others():
+    registry = SessionRegistry(lambda session_id: GameSession(session_id, 20, 20, 10, seed=0))
+    broken, healthy = registry.create('broken'), registry.create('healthy')
+
+    def explode():
+        raise RuntimeError('corrupt board')
+
+    broken.step = explode
+    for session in (broken, healthy):
+        session.active = True
+    scheduler = SessionScheduler(registry, lambda session: 0.01)
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 2.0
+        while healthy.engine.tick < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.running
+        assert healthy.engine.tick >= 5
+        assert scheduler.stats()['step_errors'] >= 1
+    finally:
+        scheduler.stop()
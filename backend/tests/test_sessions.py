@@ -0,0 +1,29 @@
+"""POST /sessions validates its body before registering anything."""
+import pytest
+
+
+@pytest.mark.parametrize('body', [
+    {'id': 'bad-interval', 'tick_interval': 'abc'},
+    {'id': 'nan-interval', 'tick_interval': 'nan'},
+    {'id': 5},
+    {'id': ['x']},
+    ['not', 'an', 'object'],
+])
+def test_bad_body_is_rejected_without_a_session(app_module, body):
+    client = app_module.app.test_client()
+    before = {s.id for s in app_module.sessions.sessions()}
+    response = client.post('/sessions', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+    assert {s.id for s in app_module.sessions.sessions()} == before
+
+
+def test_valid_session_is_reachable(app_module):
+    client = app_module.app.test_client()
+    response = client.post('/sessions', json={'id': 'reachable', 'tick_interval': '0.05'})
+    assert response.status_code == 201
+    try:
+        assert app_module.sessions.get('reachable').tick_interval == 0.05
+        assert client.get('/game_state?session=reachable').status_code == 200
+    finally:
+        client.delete('/sessions/reachable')
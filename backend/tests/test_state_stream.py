@@ -0,0 +1,83 @@
+"""Stream snapshots and deltas stay in order with concurrent steps and resets."""
+import json
+import threading
+from collections import deque
+
+from game_session import GameSession
+
+
+def parse(chunk):
+    """(event, data) pairs in one chunk of SSE bytes."""
+    events = []
+    for message in chunk.decode().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+        if lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def run_steps(session, stop, resets=False):
+    count = 0
+    while not stop.is_set():
+        if not session.step() or (resets and count % 7 == 6):
+            session.reset()
+        else:
+            session.set_direction((1, 3, 0, 3)[count // 20 % 4])
+        count += 1
+
+
+def test_new_subscriber_never_gets_a_delta_twice():
+    session = GameSession('order', 50, 50, 10, seed=0)
+    stop = threading.Event()
+    stepper = threading.Thread(target=run_steps, args=(session, stop))
+    stepper.start()
+    try:
+        for _ in range(200):
+            stream = session.broadcaster.stream(keepalive=1.0)
+            (event, snapshot), = parse(next(stream))
+            assert event == 'snapshot'
+            event, delta = parse(next(stream))[0]
+            if event == 'delta' and delta['game'] == snapshot['game']:
+                assert delta['tick'] == snapshot['tick'] + 1
+            stream.close()
+    finally:
+        stop.set()
+        stepper.join()
+
+
+def test_deltas_follow_their_reset_snapshot():
+    session = GameSession('resets', 50, 50, 10, seed=0)
+    stream = session.broadcaster.stream(keepalive=1.0)
+    (_, state), = parse(next(stream))
+    stop = threading.Event()
+    stepper = threading.Thread(target=run_steps, args=(session, stop, True))
+    stepper.start()
+    try:
+        seen = 0
+        while seen < 2000:
+            for event, data in parse(next(stream)):
+                seen += 1
+                if event == 'snapshot':
+                    assert data['game'] > state['game']
+                else:
+                    assert (data['game'], data['tick']) == (state['game'], state['tick'] + 1)
+                state = data
+    finally:
+        stop.set()
+        stepper.join()
+        stream.close()
+
+
+def test_lagging_client_resyncs_from_a_snapshot():
+    session = GameSession('lag', 50, 50, 10, seed=0)
+    session.broadcaster._messages = deque(maxlen=4)
+    stream = session.broadcaster.stream(keepalive=1.0)
+    next(stream)
+    for _ in range(10):
+        session.step()
+    (event, snapshot), = parse(next(stream))
+    assert event == 'snapshot' and snapshot['tick'] == 10
+    session.step()
+    (event, delta), = parse(next(stream))
+    assert event == 'delta' and delta['tick'] == 11
+    stream.close()
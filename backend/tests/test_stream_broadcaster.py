@@ -0,0 +1,21 @@
+"""Per-profile encoder state is dropped once no client uses that profile."""
+from types import SimpleNamespace
+
+from conftest import synthetic_frame
+from stream_broadcaster import MjpegBroadcaster
+
+
+def test_unused_profiles_are_pruned():
+    frame = synthetic_frame()
+    broadcaster = MjpegBroadcaster(SimpleNamespace(running=False), None, lambda: frame,
+                                   placeholder_interval=0.01)
+    keep = broadcaster.subscribe(width=320)
+    assert broadcaster.next_frame(keep, timeout=2.0) is not None
+    for width in range(100, 600, 50):
+        subscriber = broadcaster.subscribe(width=width)
+        assert broadcaster.next_frame(subscriber, timeout=2.0) is not None
+        broadcaster.unsubscribe(subscriber)
+    assert set(broadcaster._variants) <= {keep.profile}
+    assert set(broadcaster._variant_locks) == set(broadcaster._scaled) == {keep.profile}
+    broadcaster.unsubscribe(keep)
+    assert not broadcaster._variants and not broadcaster._variant_locks and not broadcaster._scaled
@@ -0,0 +1,69 @@
+"""Fixed-rate tick deadlines with cadence counters."""
+import math
+
+
+class TickClock:
+    """Tracks absolute tick deadlines so work time doesn't add drift.
+
+    The scheduler asks `due(now, interval)` for the next deadline and calls
+    `tick(now)` when it steps. If a tick runs more than a full interval
+    late, it is counted as late and the schedule is re-anchored instead of
+    bursting to catch up.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next = None
+        self._last = None
+        self.ticks = 0
+        self.late_ticks = 0
+        self.max_lateness = 0.0
+        # Welford running mean/variance of the measured tick period
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def reset(self):
+        """Forget the schedule (after idling) so the pause isn't counted as jitter."""
+        self._next = None
+        self._last = None
+
+    def due(self, now, interval=None):
+        """Deadline of the next tick; an unanchored clock is due immediately."""
+        if interval is not None:
+            self.interval = interval
+        if self._next is None:
+            self._next = now
+        return self._next
+
+    def tick(self, now):
+        """Record a tick performed at `now` and schedule the next deadline."""
+        lateness = now - self.due(now)
+        if lateness > 0:
+            self.max_lateness = max(self.max_lateness, lateness)
+            if lateness > self.interval:
+                self.late_ticks += 1
+                self._next = now
+        self._next += self.interval
+        self._record(now)
+
+    def _record(self, now):
+        self.ticks += 1
+        if self._last is not None:
+            period = now - self._last
+            self._count += 1
+            delta = period - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (period - self._mean)
+        self._last = now
+
+    def stats(self):
+        jitter = math.sqrt(self._m2 / self._count) if self._count > 1 else 0.0
+        return {
+            'target_interval': self.interval,
+            'ticks': self.ticks,
+            'late_ticks': self.late_ticks,
+            'mean_interval': round(self._mean, 6),
+            'jitter': round(jitter, 6),
+            'max_lateness': round(self.max_lateness, 6),
+        }
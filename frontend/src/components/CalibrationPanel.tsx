@@ -184,6 +184,16 @@ export const CalibrationPanel = ({ onApplied }: CalibrationPanelProps) => {
                 {calibrationData.camera_initialized ? 'Initialized' : 'Not Ready'}
               </span>
             </div>
+            {calibrationData.hands && (
+              <div className="flex items-center justify-between text-sm mt-1">
+                <span className="text-muted-foreground">Tracker Rebuild:</span>
+                <span className="font-mono">
+                  {calibrationData.hands.rebuilding
+                    ? 'Rebuilding...'
+                    : `${(calibrationData.hands.last_rebuild_time * 1000).toFixed(0)} ms (${calibrationData.hands.rebuilds})`}
+                </span>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1,14 +1,15 @@
 import { useEffect, useRef, useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
 import { Button } from '@/components/ui/button';
 import { Card } from '@/components/ui/card';
-import { getGameState, resetGame } from '@/services/api';
-import type { GameState } from '@/types/api';
+import { resetGame } from '@/services/api';
+import { useGameState } from '@/hooks/use-game-state';
+import type { BoardGeometry } from '@/types/api';
 
-// Logical board size used by the backend (do not change)
-const BASE_BOARD_SIZE = 500; // px
-const CELL_SIZE = 10;        // px per step in backend
-const GRID_SIZE = BASE_BOARD_SIZE / CELL_SIZE; // 50x50 grid
+// Default logical board used by the backend; the live size comes from
+// `board` in the game state (BOARD_WIDTH/BOARD_HEIGHT/CELL_SIZE on the server)
+const DEFAULT_BOARD: BoardGeometry = { width: 500, height: 500, cell_size: 10 };
+// Snake colors by player (player 1 keeps the original green)
+const PLAYER_COLORS: [number, number, number][] = [[34, 255, 34], [0, 200, 255], [255, 170, 0], [255, 60, 200]];
 
 type GameBoardProps = {
   preferredSize?: number;
@@ -17,26 +18,22 @@ type GameBoardProps = {
 export const GameBoard = ({ preferredSize }: GameBoardProps) => {
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
-  const [renderWidth, setRenderWidth] = useState<number>(BASE_BOARD_SIZE);
-  const [renderHeight, setRenderHeight] = useState<number>(BASE_BOARD_SIZE);
+  const [renderWidth, setRenderWidth] = useState<number>(DEFAULT_BOARD.width);
+  const [renderHeight, setRenderHeight] = useState<number>(DEFAULT_BOARD.height);
   
-  const { data: gameState, refetch } = useQuery({
-    queryKey: ['gameState'],
-    queryFn: getGameState,
-    refetchInterval: 100, // 10 Hz
-    refetchIntervalInBackground: true,
-  });
+  // Pushed once per game tick; the reset below arrives as a fresh snapshot
+  const gameState = useGameState();
+  const { width: boardWidth, height: boardHeight, cell_size: cellSize } = gameState?.board ?? DEFAULT_BOARD;
 
   const handleReset = async () => {
     try {
       await resetGame();
-      refetch();
     } catch (error) {
       console.error('Failed to reset game:', error);
     }
   };
 
-  // Resize canvas to fill container while preserving 1:1 aspect
+  // Resize canvas to fill container while preserving the board's aspect
   useEffect(() => {
     const container = containerRef.current;
     if (!container) return;
@@ -45,13 +42,13 @@ export const GameBoard = ({ preferredSize }: GameBoardProps) => {
       // If a preferred size is provided, stick to it; otherwise fill container
       const side = preferredSize ?? containerWidth;
       setRenderWidth(side);
-      setRenderHeight(side); // square
+      setRenderHeight(side * boardHeight / boardWidth);
     };
     resize();
     const ro = new ResizeObserver(resize);
     ro.observe(container);
     return () => ro.disconnect();
-  }, [preferredSize]);
+  }, [preferredSize, boardWidth, boardHeight]);
 
   useEffect(() => {
     if (!canvasRef.current || !gameState) return;
@@ -64,8 +61,8 @@ export const GameBoard = ({ preferredSize }: GameBoardProps) => {
     canvas.width = renderWidth;
     canvas.height = renderHeight;
 
-    const scaleX = renderWidth / BASE_BOARD_SIZE;
-    const scaleY = renderHeight / BASE_BOARD_SIZE;
+    const scaleX = renderWidth / boardWidth;
+    const scaleY = renderHeight / boardHeight;
 
     // Clear canvas
     // Use explicit hex colors to ensure Canvas compatibility across browsers
@@ -75,66 +72,79 @@ export const GameBoard = ({ preferredSize }: GameBoardProps) => {
     // Draw grid (slightly higher contrast and thickness so it's always visible)
     ctx.strokeStyle = '#1a2a1a'; // grid color
     ctx.lineWidth = Math.max(0.8, 0.8 * Math.min(scaleX, scaleY));
-    for (let i = 0; i <= GRID_SIZE; i++) {
+    for (let i = 0; i <= boardWidth / cellSize; i++) {
       ctx.beginPath();
-      ctx.moveTo(i * CELL_SIZE * scaleX, 0);
-      ctx.lineTo(i * CELL_SIZE * scaleX, renderHeight);
+      ctx.moveTo(i * cellSize * scaleX, 0);
+      ctx.lineTo(i * cellSize * scaleX, renderHeight);
       ctx.stroke();
-      
+    }
+    for (let i = 0; i <= boardHeight / cellSize; i++) {
       ctx.beginPath();
-      ctx.moveTo(0, i * CELL_SIZE * scaleY);
-      ctx.lineTo(renderWidth, i * CELL_SIZE * scaleY);
+      ctx.moveTo(0, i * cellSize * scaleY);
+      ctx.lineTo(renderWidth, i * cellSize * scaleY);
       ctx.stroke();
     }
 
-    // Draw apple with glow effect
-    const [appleX, appleY] = gameState.apple ?? [BASE_BOARD_SIZE / 2, BASE_BOARD_SIZE / 2];
-    const ax = Number(appleX);
-    const ay = Number(appleY);
-    ctx.shadowColor = '#ff0000';
-    ctx.shadowBlur = 10 * Math.min(scaleX, scaleY);
-    ctx.fillStyle = '#ff1a1a';
-    ctx.fillRect(
-      (ax + 2) * scaleX,
-      (ay + 2) * scaleY,
-      (CELL_SIZE - 4) * scaleX,
-      (CELL_SIZE - 4) * scaleY
-    );
+    // Draw apple with glow effect (null once the snake fills the board)
+    if (gameState.apple) {
+      const ax = Number(gameState.apple[0]);
+      const ay = Number(gameState.apple[1]);
+      ctx.shadowColor = '#ff0000';
+      ctx.shadowBlur = 10 * Math.min(scaleX, scaleY);
+      ctx.fillStyle = '#ff1a1a';
+      ctx.fillRect(
+        (ax + 2) * scaleX,
+        (ay + 2) * scaleY,
+        (cellSize - 4) * scaleX,
+        (cellSize - 4) * scaleY
+      );
+    }
 
     // Reset shadow for snake
     ctx.shadowBlur = 0;
 
-    // Draw snake with gradient and glow
-    const snakeToDraw = (gameState.snake?.length ? gameState.snake : [[BASE_BOARD_SIZE/2, BASE_BOARD_SIZE/2]]) as [number, number][];
-    snakeToDraw.forEach(([x, y], index) => {
-      const sx = Number(x);
-      const sy = Number(y);
-      const isHead = index === 0;
-      
-      if (isHead) {
-        // Snake head with stronger glow
-        ctx.shadowColor = '#22ff22';
-        ctx.shadowBlur = 15 * Math.min(scaleX, scaleY);
-        ctx.fillStyle = '#22ff22';
-      } else {
-        // Snake body with softer glow
-        ctx.shadowBlur = 5 * Math.min(scaleX, scaleY);
-        const opacity = 0.8 - (index / (gameState.snake?.length || 1)) * 0.3;
-        const alpha = Math.max(0.2, Math.min(1, opacity));
-        ctx.fillStyle = `rgba(34, 255, 34, ${alpha})`;
-      }
-      
-      ctx.fillRect(
-        (sx + 1) * scaleX,
-        (sy + 1) * scaleY,
-        (CELL_SIZE - 2) * scaleX,
-        (CELL_SIZE - 2) * scaleY
-      );
-    });
+    // Draw snake(s) with gradient and glow; multi-player boards color each player
+    const drawSnake = (cells: [number, number][], rgb: [number, number, number]) => {
+      const [r, g, b] = rgb;
+      cells.forEach(([x, y], index) => {
+        const sx = Number(x);
+        const sy = Number(y);
+        const isHead = index === 0;
+
+        if (isHead) {
+          // Snake head with stronger glow
+          ctx.shadowColor = `rgb(${r}, ${g}, ${b})`;
+          ctx.shadowBlur = 15 * Math.min(scaleX, scaleY);
+          ctx.fillStyle = `rgb(${r}, ${g}, ${b})`;
+        } else {
+          // Snake body with softer glow
+          ctx.shadowBlur = 5 * Math.min(scaleX, scaleY);
+          const opacity = 0.8 - (index / (cells.length || 1)) * 0.3;
+          const alpha = Math.max(0.2, Math.min(1, opacity));
+          ctx.fillStyle = `rgba(${r}, ${g}, ${b}, ${alpha})`;
+        }
+
+        ctx.fillRect(
+          (sx + 1) * scaleX,
+          (sy + 1) * scaleY,
+          (cellSize - 2) * scaleX,
+          (cellSize - 2) * scaleY
+        );
+      });
+    };
+
+    if (gameState.snakes?.length) {
+      gameState.snakes.forEach((player, index) => {
+        if (player.alive) drawSnake(player.snake, PLAYER_COLORS[index % PLAYER_COLORS.length]);
+      });
+    } else {
+      const snakeToDraw = (gameState.snake?.length ? gameState.snake : [[boardWidth/2, boardHeight/2]]) as [number, number][];
+      drawSnake(snakeToDraw, PLAYER_COLORS[0]);
+    }
 
     // Reset shadow
     ctx.shadowBlur = 0;
-  }, [gameState, renderWidth, renderHeight]);
+  }, [gameState, renderWidth, renderHeight, boardWidth, boardHeight, cellSize]);
 
   return (
     <Card className="p-6 bg-gradient-to-br from-card to-secondary">
@@ -9,7 +9,8 @@ import {
   Wifi,
   WifiOff 
 } from 'lucide-react';
-import { getCameraStatus, getGameState, getGestureInfo } from '@/services/api';
+import { getCameraStatus, getGestureInfo } from '@/services/api';
+import { useGameState } from '@/hooks/use-game-state';
 
 export const StatusPanel = () => {
   const { data: cameraStatus } = useQuery({
@@ -18,11 +19,7 @@ export const StatusPanel = () => {
     refetchInterval: 5000, // Every 5 seconds
   });
 
-  const { data: gameState } = useQuery({
-    queryKey: ['gameState'],
-    queryFn: getGameState,
-    refetchInterval: 500, // Every 500ms
-  });
+  const gameState = useGameState();
 
   const { data: gestureInfo } = useQuery({
     queryKey: ['gestureInfo'],
@@ -31,12 +28,14 @@ export const StatusPanel = () => {
   });
 
   const getCameraStatusColor = () => {
+    if (cameraStatus?.probing) return 'status-warning';
     if (!cameraStatus?.camera_available) return 'status-disconnected';
     if (cameraStatus?.camera_initialized) return 'status-connected';
     return 'status-warning';
   };
 
   const getCameraStatusText = () => {
+    if (cameraStatus?.probing) return 'Searching';
     if (!cameraStatus?.camera_available) return 'Disconnected';
     if (cameraStatus?.camera_initialized) return 'Connected';
     return 'Initializing';
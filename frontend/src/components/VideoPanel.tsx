@@ -1,8 +1,7 @@
 import { useEffect, useMemo, useRef, useState } from 'react';
 import { Card } from '@/components/ui/card';
 import { AlertCircle, Camera } from 'lucide-react';
-import { useQuery } from '@tanstack/react-query';
-import { getGameState } from '@/services/api';
+import { useGameState } from '@/hooks/use-game-state';
 
 type VideoPanelProps = { active?: boolean };
 
@@ -11,12 +10,7 @@ export const VideoPanel = ({ active = true }: VideoPanelProps) => {
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
-  const { data: gameState } = useQuery({
-    queryKey: ['video-game-state'],
-    queryFn: getGameState,
-    refetchInterval: 300,
-    refetchIntervalInBackground: true,
-  });
+  const gameState = useGameState();
 
   const shouldStream = useMemo(() => {
     if (!active) return false;
@@ -0,0 +1,12 @@
+import { useEffect, useState } from "react";
+import { subscribeGameState } from "@/services/api";
+import type { GameState } from "@/types/api";
+
+// Live game state pushed by the backend once per tick (see /game_stream).
+export function useGameState() {
+  const [gameState, setGameState] = useState<GameState | undefined>(undefined);
+
+  useEffect(() => subscribeGameState(setGameState), []);
+
+  return gameState;
+}
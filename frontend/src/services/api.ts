@@ -1,6 +1,8 @@
 import axios from 'axios';
 import type {
   GameState,
+  GameStateDelta,
+  PlayerState,
   CameraStatus,
   GestureInfo,
   CalibrationResponse,
@@ -21,6 +23,96 @@ export const getGameState = async (): Promise<GameState> => {
   return response.data;
 };
 
+// Game state push (Server-Sent Events on /game_stream).
+// One EventSource is shared by every subscriber; deltas are applied to a
+// locally cached state so components always receive a full GameState.
+type GameStateListener = (state: GameState) => void;
+
+const gameStateListeners = new Set<GameStateListener>();
+let gameStateSource: EventSource | null = null;
+let latestGameState: GameState | null = null;
+
+const notifyGameState = (state: GameState) => {
+  latestGameState = state;
+  gameStateListeners.forEach((listener) => listener(state));
+};
+
+const advanceSnake = (snake: [number, number][], head: [number, number], pop: number) => {
+  const next = [head, ...snake];
+  if (pop > 0) next.splice(next.length - pop, pop);
+  return next;
+};
+
+const applyPlayerDeltas = (players: PlayerState[], delta: GameStateDelta): PlayerState[] =>
+  players.map((player, index) => {
+    const change = delta.snakes?.[index];
+    const score = delta.scores?.[index] ?? player.score;
+    if (!change) return { ...player, score };
+    if ('alive' in change) return { ...player, score, alive: false, snake: [] };
+    return {
+      ...player,
+      score,
+      snake: advanceSnake(player.snake, change.head, change.pop),
+      direction: change.direction,
+      gesture: change.gesture,
+    };
+  });
+
+// A delta applies only to the game it was built for, on top of an older tick;
+// anything else (already in the snapshot, or from before a reset) is dropped.
+export const isDeltaCurrent = (state: GameState, delta: GameStateDelta): boolean =>
+  delta.game === state.game && delta.tick > (state.tick ?? -1);
+
+export const applyGameStateDelta = (state: GameState, delta: GameStateDelta): GameState => {
+  const snakes = state.snakes && delta.snakes ? applyPlayerDeltas(state.snakes, delta) : state.snakes;
+  const snake = snakes
+    ? snakes[0].snake
+    : delta.head
+      ? advanceSnake(state.snake, delta.head, delta.pop ?? 1)
+      : state.snake;
+  return {
+    ...state,
+    tick: delta.tick,
+    snake,
+    snakes,
+    apple: delta.apple !== undefined ? delta.apple : state.apple,
+    score: delta.score ?? state.score,
+    game_over: delta.game_over,
+    current_direction: delta.current_direction,
+    button_direction: delta.button_direction,
+  };
+};
+
+const openGameStateSource = () => {
+  const source = new EventSource('/game_stream');
+  source.addEventListener('snapshot', (event) => {
+    notifyGameState(JSON.parse((event as MessageEvent).data) as GameState);
+  });
+  source.addEventListener('delta', (event) => {
+    if (!latestGameState) return;
+    const delta = JSON.parse((event as MessageEvent).data) as GameStateDelta;
+    if (!isDeltaCurrent(latestGameState, delta)) return;
+    notifyGameState(applyGameStateDelta(latestGameState, delta));
+  });
+  // EventSource reconnects on its own and the server starts every
+  // connection with a fresh snapshot, so errors need no extra handling.
+  return source;
+};
+
+export const subscribeGameState = (listener: GameStateListener): (() => void) => {
+  gameStateListeners.add(listener);
+  if (!gameStateSource) gameStateSource = openGameStateSource();
+  if (latestGameState) listener(latestGameState);
+  return () => {
+    gameStateListeners.delete(listener);
+    if (gameStateListeners.size === 0 && gameStateSource) {
+      gameStateSource.close();
+      gameStateSource = null;
+      latestGameState = null;
+    }
+  };
+};
+
 export const getCameraStatus = async (): Promise<CameraStatus> => {
   const response = await api.get<CameraStatus>('/camera_status');
   return response.data;
@@ -1,20 +1,75 @@
 export type DirectionName = "None" | "Up" | "Down" | "Left" | "Right";
 export type ButtonDirection = 0 | 1 | 2 | 3;
 
+export interface BoardGeometry {
+  width: number;
+  height: number;
+  cell_size: number;
+}
+
 export interface GameState {
+  tick?: number;
+  // Stream only: which game (reset) of the session this state belongs to
+  game?: number;
+  snake: [number, number][];
+  apple: [number, number] | null;
+  score: number;
+  game_over: boolean;
+  current_direction: DirectionName;
+  button_direction: ButtonDirection;
+  board?: BoardGeometry;
+  // Multi-player boards only (POST /players); the fields above describe player 1
+  snakes?: PlayerState[];
+}
+
+export interface PlayerState {
   snake: [number, number][];
-  apple: [number, number];
   score: number;
+  alive: boolean;
+  direction: ButtonDirection;
+  gesture: DirectionName;
+}
+
+// One game tick pushed over /game_stream: the new head, how many tail cells
+// were popped, and apple/score only when they changed.
+export interface GameStateDelta {
+  tick: number;
+  game?: number;
+  head?: [number, number];
+  pop?: number;
+  apple?: [number, number] | null;
+  score?: number;
   game_over: boolean;
   current_direction: DirectionName;
   button_direction: ButtonDirection;
+  // Multi-player boards: one entry per player (null once its snake is gone)
+  snakes?: (PlayerDelta | null)[];
+  scores?: number[];
 }
 
+export type PlayerDelta =
+  | { head: [number, number]; pop: number; direction: ButtonDirection; gesture: DirectionName }
+  | { alive: false };
+
 export interface CameraStatus {
   camera_available: boolean;
   camera_initialized: boolean;
   frame_size: string;
   fps?: number;
+  probing?: boolean;
+  discovery?: CameraDiscovery;
+  import_to_first_frame?: number | null;
+}
+
+export interface CameraDiscovery {
+  found?: boolean;
+  index?: number;
+  backend?: string;
+  frame_size?: string;
+  cache_hit?: boolean;
+  probed?: number;
+  timed_out?: number;
+  probe_time?: number;
 }
 
 export interface CalibrationSettings {
@@ -24,10 +79,28 @@ export interface CalibrationSettings {
   detection_confidence: number;
   tracking_confidence: number;
   tick_interval?: number;
+  inference_scale?: number;
+  roi_padding?: number;
+  smoothing_tau?: number;
+  smoothing_confidence?: number;
+  index_window?: number;
+}
+
+// MediaPipe Hands lifecycle: rebuilt in the background when a confidence changes
+export interface HandsStats {
+  detection_confidence: number;
+  tracking_confidence: number;
+  rebuilding: boolean;
+  rebuilds: number;
+  rebuild_failures: number;
+  last_rebuild_time: number;
+  mean_rebuild_time: number;
+  last_swap_at: number | null;
 }
 
 export interface CalibrationResponse {
   settings: CalibrationSettings;
+  hands?: HandsStats;
   current_direction: DirectionName;
   camera_initialized: boolean;
 }
@@ -39,6 +112,8 @@ export interface GestureInfo {
   gesture_cooldown: number;
   finger_threshold: number;
   last_gesture_time: number;
+  smoothing?: boolean;
+  gesture_confidence?: number;
   camera_initialized: boolean;
 }
 
@@ -46,6 +121,8 @@ export interface CalibrationPostResponse {
   status: string;
   message: string;
   settings: CalibrationSettings;
+  rebuilding?: boolean;
+  hands?: HandsStats;
 }
 
 export interface ResetResponse {
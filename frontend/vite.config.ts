@@ -10,6 +10,7 @@ export default defineConfig(({ mode }) => ({
     port: 8080,
     proxy: {
       '/game_state': 'http://localhost:5000',
+      '/game_stream': 'http://localhost:5000',
       '/camera_status': 'http://localhost:5000',
       '/video_feed': 'http://localhost:5000',
       '/gesture_info': 'http://localhost:5000',